@@ -0,0 +1,158 @@
+"""
+    Microbenchmarks for the construction of data structures from API payloads.
+
+    Usage: python -m benchmarks.bench_data_structures [--n 100000]
+"""
+
+# Standard library imports
+import math
+import time
+import argparse
+import tracemalloc
+from typing import Any
+from typing import Dict
+from typing import List
+from dataclasses import fields
+
+# Third party imports
+
+# Local imports
+from spotify_flows.utils.dates import date_parsing
+from spotify_flows.spotify.data_structures import (
+    AlbumItem,
+    ArtistItem,
+    TrackItem,
+    registry,
+)
+
+# Main body
+def make_payloads(n: int, n_albums: int = 500) -> List[Dict[str, Any]]:
+    """Synthetic track payloads shaped like the API's track objects
+
+    Args:
+        n (int): Number of tracks
+        n_albums (int, optional): Number of distinct albums. Defaults to 500.
+
+    Returns:
+        List[Dict[str, Any]]: Track payloads
+    """
+    payloads = []
+    for i in range(n):
+        i_album = i % n_albums
+        artist = {
+            "id": f"artist{i_album % 100}",
+            "name": f"Artist {i_album % 100}",
+            "popularity": 50,
+            "genres": ["pop", "dance pop"],
+            "type": "artist",
+            "uri": f"spotify:artist:artist{i_album % 100}",
+            "href": "https://api.spotify.com/v1/artists/...",
+        }
+        payloads.append(
+            {
+                "id": f"track{i}",
+                "name": f"Track {i}",
+                "popularity": i % 100,
+                "duration_ms": 180000 + i,
+                "explicit": False,
+                "track_number": i % 12,
+                "disc_number": 1,
+                "type": "track",
+                "uri": f"spotify:track:track{i}",
+                "href": "https://api.spotify.com/v1/tracks/...",
+                "external_urls": {"spotify": "https://open.spotify.com/track/..."},
+                "available_markets": ["FR", "DE", "US"],
+                "album": {
+                    "id": f"album{i_album}",
+                    "name": f"Album {i_album}",
+                    "release_date": "2020-01-02",
+                    "release_date_precision": "day",
+                    "album_type": "album",
+                    "total_tracks": 12,
+                    "type": "album",
+                    "artists": [artist],
+                },
+            }
+        )
+    return payloads
+
+
+def legacy_trim_dict(cls: type, dict_: Dict[str, Any]) -> Dict[str, Any]:
+    # Field lookup as done before fields were cached, kept as a reference point
+    class_fields = [field_.name for field_ in fields(cls)]
+    return {key: dict_[key] for key in class_fields if key in list(dict_.keys())}
+
+
+def legacy_from_dict(dict_: Dict[str, Any]) -> TrackItem:
+    # Construction as done before constructors were precompiled, kept as a reference
+    # point. Inputs are copied instead of being modified in place.
+    album_dict = dict(dict_["album"])
+    album_dict["artists"] = [
+        ArtistItem(**legacy_trim_dict(ArtistItem, artist_dict))
+        for artist_dict in album_dict["artists"]
+    ]
+    if isinstance(album_dict["release_date"], str):
+        album_dict["release_date"] = date_parsing(album_dict["release_date"])
+
+    track_dict = dict(dict_)
+    track_dict["album"] = AlbumItem(**legacy_trim_dict(AlbumItem, album_dict))
+    return TrackItem(**legacy_trim_dict(TrackItem, track_dict))
+
+
+def timed(label: str, n: int, func, repeat: int = 3) -> float:
+    # Best of a few runs, each starting from an empty registry of interned items
+    elapsed = math.inf
+    for _ in range(repeat):
+        registry.clear()
+        start = time.perf_counter()
+        rv = func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+        del rv
+
+    print(f"{label:<40} {1e6 * elapsed / n:8.2f} us/item")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100000)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.n)
+    artist_payloads = [payload["album"]["artists"][0] for payload in payloads]
+
+    print(f"Payloads: {args.n}")
+    timed(
+        "trim_dict (legacy field lookup)",
+        args.n,
+        lambda: [legacy_trim_dict(ArtistItem, d) for d in artist_payloads],
+    )
+    timed(
+        "trim_dict (cached field names)",
+        args.n,
+        lambda: [ArtistItem.trim_dict(d) for d in artist_payloads],
+    )
+    legacy = timed(
+        "TrackItem (legacy from_dict)",
+        args.n,
+        lambda: [legacy_from_dict(d) for d in payloads],
+    )
+    timed(
+        "TrackItem.from_dict",
+        args.n,
+        lambda: [TrackItem.from_dict(d) for d in payloads],
+    )
+    bulk = timed("TrackItem.from_dicts", args.n, lambda: TrackItem.from_dicts(payloads))
+    print(f"{'Speedup of from_dicts over legacy':<40} {legacy / bulk:8.1f} x")
+
+    tracemalloc.start()
+    items = TrackItem.from_dicts(payloads)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'Memory held by the items':<40} {current / len(items):8.0f} bytes/item")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""
+    Benchmarks of database writes and lookups, comparing statements built with
+    f-strings and committed one by one with parameterized statements within a
+    single transaction.
+
+    Usage: python -m benchmarks.bench_database [--n 10000]
+"""
+
+# Standard library imports
+import time
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Third party imports
+import pandas as pd
+
+# Local imports
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.data_structures import TrackItem
+from benchmarks.bench_data_structures import make_payloads
+
+# Main body
+def legacy_record_operations(file_path: str, n: int) -> None:
+    # Operations recorded as before: f-string statements, one commit per call
+    conn = sqlite3.connect(file_path)
+    for i in range(n):
+        c = conn.cursor()
+        date = datetime.now(timezone.utc)
+        c.execute(f"INSERT INTO operations (date, op_type) VALUES ('{date}', 'op_{i}')")
+        conn.commit()
+        c.close()
+    conn.close()
+
+
+def legacy_playlist_exists(file_path: str, ids: list) -> None:
+    # Lookups as before: f-string queries read through pandas
+    conn = sqlite3.connect(file_path)
+    for id_ in ids:
+        len(pd.read_sql(f"SELECT * FROM collections WHERE id = '{id_}'", conn)) > 0
+    conn.close()
+
+
+def timed(label: str, n: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<50} {n / elapsed:12.0f} rows/s")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10000)
+    args = parser.parse_args()
+    n = args.n
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = str(Path(tmp_dir) / "spotify.db")
+        db = SpotifyDatabase(file_path, op_table="operations")
+        db.create_spotify_database("data/db_schemas.yaml")
+
+        print(f"Rows: {n}")
+        timed(
+            "record operations (f-strings, commit per row)",
+            n,
+            lambda: legacy_record_operations(file_path, n),
+        )
+
+        def record_operations():
+            with db.transaction():
+                for i in range(n):
+                    db._record_operation(op_type=f"op_{i}")
+
+        timed("record operations (parameterized, 1 transaction)", n, record_operations)
+
+        track_ids = [f"track{i}" for i in range(n)]
+        db.add_collection_track_ids(id_="collection", track_ids=track_ids)
+
+        ids = [f"playlist'{i}" if i % 2 else "collection" for i in range(n)]
+        try:
+            timed(
+                "playlist lookups (f-strings, pandas)",
+                n,
+                lambda: legacy_playlist_exists(file_path, ids),
+            )
+        except (pd.errors.DatabaseError, sqlite3.Error) as e:
+            # IDs with quotes break the f-string queries
+            print(f"{'playlist lookups (f-strings, pandas)':<50} {'failed':>12} ({e})")
+
+        timed(
+            "playlist lookups (f-strings, pandas, no quotes)",
+            n,
+            lambda: legacy_playlist_exists(
+                file_path, [id_.replace("'", "") for id_ in ids]
+            ),
+        )
+        timed(
+            "playlist lookups (parameterized)",
+            n,
+            lambda: [db.playlist_exists(id_=id_) for id_ in ids],
+        )
+
+        tracks = TrackItem.from_dicts(make_payloads(n))
+        timed(
+            "ingest tracks (normalized, 1 transaction)",
+            n,
+            lambda: db.ingest_tracks(tracks=tracks, collection_id="ingested"),
+        )
+        timed(
+            "ingest tracks again (all rows known)",
+            n,
+            lambda: db.ingest_tracks(tracks=tracks, collection_id="ingested"),
+        )
+
+        db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+    Benchmarks of collections, database and graph operations against a synthetic
+    catalog served offline by FakeSpotify. The number of API calls of each benchmark
+    is reported in its extra info.
+
+    Usage: pytest benchmarks/bench_offline.py [--scale 1000,10000,100000]
+        [--latency 0.01] [--benchmark-json results.json]
+"""
+
+# Standard library imports
+import random
+
+# Third party imports
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+import networkx as nx
+
+# Local imports
+import spotify_flows.spotify.collections as spocol
+from spotify_flows.spotify.predicates import F
+from spotify_flows.spotify.data_structures import ArtistItem
+from spotify_flows.analysis.graphs import artist_popularity_weight_func
+from spotify_flows.scripts.others.build_artists_graph import build_artist_graph
+from spotify_flows.scripts.others.build_genre_graph import build_genre_graph
+
+# Main body
+ROUNDS = 3
+
+
+def run(benchmark, func, sp=None, rounds: int = ROUNDS, setup=None):
+    """Benchmark a function over a few rounds, reporting its API calls per round"""
+    if sp is not None:
+        sp.reset_calls()
+
+    rv = benchmark.pedantic(func, setup=setup, rounds=rounds, iterations=1)
+
+    if sp is not None:
+        benchmark.extra_info["api_calls"] = sp.n_calls / rounds
+        benchmark.extra_info["api_calls_by_method"] = {
+            method: n / rounds for method, n in sp.calls.items()
+        }
+    return rv
+
+
+# Collections
+def test_playlist_hydration(benchmark, sp, scale):
+    items = run(benchmark, lambda: list(spocol.Playlist.from_id("playlist0").items), sp)
+    assert len(items) == sp.catalog.playlist_size
+
+
+def test_playlist_filter_before_hydration(benchmark, sp, scale):
+    items = run(
+        benchmark,
+        lambda: list(
+            spocol.Playlist.from_id("playlist0").filter(F.popularity >= 90).items
+        ),
+        sp,
+    )
+    assert all(item.popularity >= 90 for item in items)
+
+
+def test_playlist_sync(benchmark, sp, db, scale):
+    def sync():
+        db.remove_collection(id_="playlist0")
+        spocol.Playlist.from_id("playlist0").sync(db=db)
+
+    run(benchmark, sync, sp)
+
+
+@pytest.mark.parametrize("operation", ["__add__", "__sub__", "__truediv__", "__mod__"])
+def test_set_operations(benchmark, tracks, operation, scale):
+    # Two collections overlapping on half of their items
+    n = len(tracks) // 3
+    first, second = tracks[: 2 * n], tracks[n:]
+
+    def combine():
+        collection = getattr(spocol.TrackCollection(_items=first), operation)(
+            spocol.TrackCollection(_items=second)
+        )
+        return list(collection.items)
+
+    run(benchmark, combine)
+
+
+def test_sort_and_filter(benchmark, sp, scale):
+    # Audio features are not part of the listing, so they are requested from the API
+    def sort_and_filter():
+        collection = (
+            spocol.Playlist.from_id("playlist0")
+            .filter(F.audio_features.energy.between(0.3, 0.8) & (F.popularity >= 20))
+            .sort(by=["audio_features.danceability", "popularity"], ascending=False)
+        )
+        return list(collection.items)
+
+    items = run(benchmark, sort_and_filter, sp)
+    assert sp.calls["audio_features"] > 0
+    assert items == sorted(
+        items,
+        key=lambda item: (item.audio_features.danceability, item.popularity),
+        reverse=True,
+    )
+
+
+# Database
+def test_db_ingest(benchmark, db, tracks, scale):
+    run(
+        benchmark,
+        lambda: db.ingest_tracks(tracks=tracks, collection_id="catalog"),
+        setup=lambda: db.remove_collection(id_="catalog"),
+    )
+
+
+def test_db_load_collection(benchmark, catalog_db, scale):
+    items = run(
+        benchmark, lambda: catalog_db.build_collection_from_collection_id(id_="catalog")
+    )
+    assert len(items) == scale
+
+
+# Graphs
+def test_build_artist_graph(benchmark, catalog_db, catalog, scale):
+    graph = run(benchmark, lambda: build_artist_graph(catalog_db))
+    assert graph.number_of_nodes() == catalog.n_artists
+
+
+def test_build_genre_graph(benchmark, catalog_db, scale):
+    graph = run(benchmark, lambda: build_genre_graph(catalog_db))
+    assert graph.number_of_nodes() > 0
+
+
+def test_artist_transition(benchmark, sp, catalog_db, catalog, scale):
+    artist_graph = build_artist_graph(catalog_db)
+    start_artist = ArtistItem.from_dict(catalog.artist(0))
+    end_artist_id = f"artist{catalog.n_artists // 2}"
+
+    def transition():
+        path = nx.dijkstra_path(
+            artist_graph,
+            source=start_artist.id,
+            target=end_artist_id,
+            weight=lambda u, v, d: artist_popularity_weight_func(
+                artist_graph, start_artist, u, v, d
+            ),
+        )
+        top_tracks = spocol.Artist.top_tracks(artist_ids=path, db=catalog_db)
+        return [next(iter(top_tracks[artist_id].items)) for artist_id in path]
+
+    # Top tracks are fetched once, then read from the database
+    run(benchmark, transition, sp)
+
+
+def test_genre_transition(benchmark, sp, catalog_db, catalog, scale):
+    genre_graph = build_genre_graph(catalog_db)
+    genres = sorted(genre_graph.nodes())
+    from_, to_ = random.Random(0).sample(genres, 2)
+
+    def transition():
+        path = nx.shortest_path(genre_graph, source=from_, target=to_, weight="weight")
+        genre_artists = catalog_db.genre_top_artists(genres=path, k=1)
+        artist_ids = [genre_artists[genre][0] for genre in path]
+        return spocol.Artist.top_tracks(artist_ids=artist_ids, db=catalog_db)
+
+    run(benchmark, transition, sp)
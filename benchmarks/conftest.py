@@ -0,0 +1,78 @@
+"""
+    Fixtures of the offline benchmark suite (bench_offline.py), run against a
+    synthetic catalog served by FakeSpotify
+"""
+
+# Standard library imports
+
+# Third party imports
+import pytest
+
+# Local imports
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.data_structures import TrackItem
+from spotify_flows.spotify.fake import FakeSpotify, SyntheticCatalog, offline_spotify
+
+# Main body
+def pytest_addoption(parser):
+    parser.addoption(
+        "--scale",
+        default="1000,10000",
+        help="Catalog sizes, in tracks, comma separated (e.g. 1000,10000,100000)",
+    )
+    parser.addoption(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Latency of each fake API call, in seconds",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [int(scale) for scale in metafunc.config.getoption("scale").split(",")]
+        metafunc.parametrize("scale", scales, scope="session")
+
+
+@pytest.fixture(scope="session")
+def catalog(scale):
+    return SyntheticCatalog(n_tracks=scale, playlist_size=max(10, scale // 10))
+
+
+@pytest.fixture(scope="session")
+def tracks(catalog):
+    """Every track of the catalog, hydrated as read from the API"""
+    return TrackItem.from_dicts(
+        catalog.hydrated_track(i) for i in range(catalog.n_tracks)
+    )
+
+
+@pytest.fixture
+def sp(catalog, request):
+    fake = FakeSpotify(catalog, latency=request.config.getoption("latency"))
+    with offline_spotify(fake):
+        yield fake
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def catalog_db(db, catalog, tracks):
+    """Database holding the whole catalog, with related artists"""
+    db.ingest_tracks(tracks=tracks, collection_id="catalog")
+    db.insert_rows(
+        "related",
+        columns=["artist_id", "related_artist_id"],
+        rows=[
+            (f"artist{k}", f"artist{other}")
+            for k in range(catalog.n_artists)
+            for other in catalog.related_artist_indices(k)
+        ],
+    )
+    return db
@@ -13,6 +13,9 @@ setup(
     packages=find_packages(),
     python_requires=">=3.7, <4",
     install_requires=["spotipy"],
-    extras_require={"dev": ["pytest", "black"]},
+    extras_require={
+        "dev": ["pytest", "black", "pytest-benchmark"],
+        "parquet": ["pyarrow"],
+    },
     entry_points={"console_scripts": ["flows=spotify_flows.scripts.main:main"]},
 )
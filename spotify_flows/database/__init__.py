@@ -1,3 +1,10 @@
 from .database import Database, SpotifyDatabase, DatabaseSingleton
+from .genre_index import GenreIndex, load_genre_index
 
-__all__ = ["Database", "SpotifyDatabase", "DatabaseSingleton"]
+__all__ = [
+    "Database",
+    "SpotifyDatabase",
+    "DatabaseSingleton",
+    "GenreIndex",
+    "load_genre_index",
+]
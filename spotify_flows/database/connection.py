@@ -0,0 +1,168 @@
+"""
+    This module holds the management of the SQLite connections used by the application
+"""
+
+# Standard library imports
+import logging
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import List
+from typing import Iterator
+
+# Third party imports
+
+# Local imports
+
+# Main body
+logger = logging.getLogger()
+
+PRAGMAS = {
+    # Readers do not block the writer, nor the writer readers
+    "journal_mode": "WAL",
+    # Durable at checkpoints rather than at every commit, which is safe with WAL
+    "synchronous": "NORMAL",
+    # Bulk loads: temporary B-trees and sorts in memory, larger page cache (in KiB)
+    "temp_store": "MEMORY",
+    "cache_size": "-65536",
+}
+
+BUSY_TIMEOUT_MS = 30000
+
+
+class FIFOLock:
+    """Reentrant lock granted to threads in the order they requested it, so that
+    queued writers are served fairly"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._owner = None
+        self._depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of times the lock is held by its owner"""
+        return self._depth
+
+    def is_owned(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    def acquire(self) -> None:
+        me = threading.get_ident()
+
+        with self._condition:
+            if self._owner == me:
+                self._depth += 1
+                return
+
+            self._queue.append(me)
+            while self._owner is not None or self._queue[0] != me:
+                self._condition.wait()
+
+            self._queue.popleft()
+            self._owner = me
+            self._depth = 1
+
+    def release(self) -> None:
+        with self._condition:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Cannot release a lock held by another thread")
+
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._condition.notify_all()
+
+
+class ConnectionManager:
+    """Connections to a SQLite database file. Each thread reads through its own
+    connection, while writes are serialized through a single writer connection:
+    threads queue for write sessions, which commit when they end.
+
+    Args:
+        file_path (str): Path to the database file
+        busy_timeout (int, optional): Time waited for locks held by other processes,
+            in milliseconds. Defaults to BUSY_TIMEOUT_MS.
+    """
+
+    def __init__(self, file_path: str, busy_timeout: int = BUSY_TIMEOUT_MS):
+        self.file_path = file_path
+        self.busy_timeout = busy_timeout
+
+        self._local = threading.local()
+        self._write_lock = FIFOLock()
+        self._writer = None
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        # Connections may be closed by another thread, see close()
+        conn = sqlite3.connect(
+            self.file_path, timeout=self.busy_timeout / 1000, check_same_thread=False
+        )
+        for pragma, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Read connection of the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Connection to be used by the current thread: the writer connection within
+        a write session, and its read connection otherwise"""
+        if self._write_lock.is_owned():
+            return self._writer
+        return self.reader()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Write session, waiting for the sessions of other threads to end. Sessions
+        are reentrant, and the outermost one commits (or rolls back on error).
+
+        Yields:
+            sqlite3.Connection: Writer connection
+        """
+        self._write_lock.acquire()
+        outermost = self._write_lock.depth == 1
+
+        try:
+            if self._writer is None:
+                self._writer = self._open()
+
+            yield self._writer
+
+            if outermost:
+                self._writer.commit()
+
+        except BaseException:
+            if outermost and self._writer is not None:
+                self._writer.rollback()
+            raise
+
+        finally:
+            self._write_lock.release()
+
+    def close(self) -> None:
+        """Close every connection"""
+        self._write_lock.acquire()
+        try:
+            with self._connections_lock:
+                for conn in self._connections:
+                    conn.close()
+                self._connections = []
+
+            self._writer = None
+            self._local = threading.local()
+
+        finally:
+            self._write_lock.release()
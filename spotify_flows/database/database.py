@@ -4,21 +4,30 @@
 
 # Standard library imports
 import yaml
-import random
+import pickle
 import logging
 import sqlite3
 import functools
 from tqdm import tqdm
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import Tuple
+from typing import Iterator
+from typing import Iterable
 from dataclasses import asdict
+from dataclasses import fields
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 
 # Third party imports
 import pandas as pd
 
 # Local imports
+from .connection import ConnectionManager
+from .migrations import LATEST_VERSION, migrate, set_schema_version
+from spotify_flows.utils.profiling import db_timer
 from spotify_flows.spotify.data_structures import (
     AlbumItem,
     ArtistItem,
@@ -29,11 +38,137 @@ from spotify_flows.spotify.data_structures import (
 # Main body
 logger = logging.getLogger()
 
+AUDIO_FEATURES_COLUMNS = [field_.name for field_ in fields(AudioFeaturesItem)]
+
+TRACK_QUERY_COLUMNS = {
+    "id": "t.id",
+    "name": "t.name",
+    "popularity": "t.popularity",
+    "duration_ms": "t.duration_ms",
+    "album.id": "t.album_id",
+    "album.name": "al.name",
+    **{f"audio_features.{column}": f"af.{column}" for column in AUDIO_FEATURES_COLUMNS},
+}
+"""SQL column of each track field, in the query of filter_track_ids"""
+
+INGEST_COLUMNS = {
+    "tracks": ["id", "name", "popularity", "album_id", "duration_ms"],
+    "albums": ["id", "name", "release_date"],
+    "artists": ["id", "name", "popularity"],
+    "albums_artists": ["artist_id", "album_id"],
+    "genres": ["artist_id", "genre"],
+    "audio_features": ["track_id", *AUDIO_FEATURES_COLUMNS],
+}
+"""Columns written by ingest_tracks, per table (besides op_index)"""
+
+_NO_AUDIO_FEATURES = AudioFeaturesItem()
+
+TABLE_DTYPES = {
+    "tracks": {"popularity": "Int64", "duration_ms": "Int64"},
+    "albums": {"release_date": "datetime"},
+    "artists": {"popularity": "Int64"},
+    "genres": {"genre": "category"},
+    "audio_features": {column: "float64" for column in AUDIO_FEATURES_COLUMNS},
+    "related": {},
+    "albums_artists": {},
+}
+"""Dtypes of table columns when read typed ("datetime" columns are parsed), e.g.
+categories for the few distinct genres rather than one string object per row"""
+
+DEFAULT_CHUNKSIZE = 10000
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Cast the columns of a dataframe, ignoring those it does not hold
+
+    Args:
+        df (pd.DataFrame): Dataframe
+        dtypes (Dict[str, str]): Dtype per column, or "datetime" for dates
+
+    Returns:
+        pd.DataFrame: Dataframe with cast columns
+    """
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if dtype == "datetime":
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def _sql_rows(df: pd.DataFrame) -> List[Tuple]:
+    """Rows of a dataframe as tuples of SQLite-compatible values: missing values
+    become NULL, and dates are written as pandas writes them"""
+    df = df.astype(object).where(df.notna(), None)
+    return [
+        tuple(str(value) if isinstance(value, datetime) else value for value in row)
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def normalize_tracks(tracks: Iterable[TrackItem]) -> Dict[str, List[Tuple]]:
+    """Split tracks into the rows of the tables holding them, without duplicates.
+    Tracks without audio features (the default ones) have no audio_features row.
+
+    Args:
+        tracks (Iterable[TrackItem]): Tracks
+
+    Returns:
+        Dict[str, List[Tuple]]: Rows per table, with the columns of INGEST_COLUMNS
+    """
+    rows = {table: {} for table in INGEST_COLUMNS}
+
+    for track in tracks:
+        album = track.album
+        rows["tracks"].setdefault(
+            track.id,
+            (track.id, track.name, track.popularity, album.id, track.duration_ms),
+        )
+
+        if album.id not in rows["albums"]:
+            release_date = str(album.release_date) if album.release_date else None
+            rows["albums"][album.id] = (album.id, album.name, release_date)
+
+        for artist in album.artists:
+            rows["albums_artists"].setdefault(
+                (album.id, artist.id), (artist.id, album.id)
+            )
+            if artist.id not in rows["artists"]:
+                rows["artists"][artist.id] = (artist.id, artist.name, artist.popularity)
+            for genre in artist.genres:
+                rows["genres"].setdefault((artist.id, genre), (artist.id, genre))
+
+        audio_features = track.audio_features
+        if audio_features is not None and audio_features != _NO_AUDIO_FEATURES:
+            rows["audio_features"].setdefault(
+                track.id,
+                (
+                    track.id,
+                    *[getattr(audio_features, col) for col in AUDIO_FEATURES_COLUMNS],
+                ),
+            )
+
+    return {table: list(table_rows.values()) for table, table_rows in rows.items()}
+
 
 def connect_me(func):
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        with self.connect():
+        with self.connect(), db_timer(func.__qualname__):
+            rv = func(self, *args, **kwargs)
+        return rv
+
+    return wrapper
+
+
+def write_me(func):
+    """Run a method within a write session, see ConnectionManager.writer"""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.connect(), self.connections.writer(), db_timer(func.__qualname__):
             rv = func(self, *args, **kwargs)
         return rv
 
@@ -43,57 +178,244 @@ def connect_me(func):
 @dataclass
 class Database:
     file_path: str
-    conn: sqlite3.Connection = field(default=None, init=False)
+    connections: ConnectionManager = field(default=None, init=False, repr=False)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of the current thread: the writer connection within a write
+        session, and the thread's read connection otherwise"""
+        with self.connect():
+            return self.connections.connection()
 
     @contextmanager
     def connect(self):
         try:
-            if not self.conn:
-                self.conn = sqlite3.connect(self.file_path)
+            if self.connections is None:
+                self.connections = ConnectionManager(self.file_path)
             yield
         finally:
             pass
 
+    def close(self) -> None:
+        """Close all connections to the database"""
+        if self.connections is not None:
+            self.connections.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Unit of work: every write made within it, by this thread, is committed
+        at its end as a single transaction, or rolled back if an error is raised.
+
+        Yields:
+            sqlite3.Connection: Writer connection
+        """
+        with self.connect(), self.connections.writer() as conn:
+            yield conn
+
     @connect_me
-    def table_contents(self, tables: List[str]) -> pd.DataFrame:
-        if isinstance(tables, str):
-            return pd.read_sql(f"SELECT * FROM {tables}", self.conn)
-        elif isinstance(tables, list):
+    def table_contents(
+        self,
+        tables: List[str],
+        columns: List[str] = None,
+        chunksize: int = None,
+        typed: bool = False,
+    ) -> pd.DataFrame:
+        """Read whole tables
+
+        Args:
+            tables (List[str]): Table name, or list of table names
+            columns (List[str], optional): Columns to read. Defaults to None (all).
+            chunksize (int, optional): If set, tables are read as iterators of
+                dataframes of that many rows. Defaults to None.
+            typed (bool, optional): Whether columns are cast as in TABLE_DTYPES.
+                Defaults to False.
+
+        Returns:
+            pd.DataFrame: Table contents, or a list of them for a list of tables
+        """
+        if isinstance(tables, list):
             return [
-                pd.read_sql(f"SELECT * FROM {table}", self.conn) for table in tables
+                self.table_contents(
+                    table, columns=columns, chunksize=chunksize, typed=typed
+                )
+                for table in tables
             ]
 
-    @connect_me
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM {tables}"
+        dtypes = TABLE_DTYPES.get(tables, {}) if typed else None
+        return self.select(query, chunksize=chunksize, dtypes=dtypes)
+
+    @write_me
     def wipe_table(self, table: str) -> None:
         c = self.conn.cursor()
         c.execute(f"DELETE FROM {table}")
-        self.conn.commit()
 
-    @connect_me
+    @write_me
     def delete_table(self, table: str) -> None:
         c = self.conn.cursor()
         c.execute(f"DROP TABLE {table}")
-        self.conn.commit()
 
-    @connect_me
+    @write_me
     def create_database_file(self, schemas: List[str]) -> None:
         c = self.conn.cursor()
         for schema in schemas:
             c.execute(schema)
 
-    @connect_me
-    def run_query(self, query: str) -> None:
+    @write_me
+    def run_query(self, query: str, params: List[Any] = None) -> None:
         c = self.conn.cursor()
-        c.execute(query)
-        self.conn.commit()
+        c.execute(query, params or [])
+        c.close()
 
     @connect_me
+    def table_exists(self, table: str) -> bool:
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        )
+        exists = c.fetchone() is not None
+        c.close()
+        return exists
+
+    @write_me
     def write_dataframe(self, df: pd.DataFrame, table: str, **kwargs) -> None:
-        df.to_sql(table, self.conn, **kwargs)
+        """Write the rows of a dataframe to a table, see pd.DataFrame.to_sql
+
+        Args:
+            df (pd.DataFrame): Rows to write
+            table (str): Table name
+        """
+        if (
+            kwargs.get("if_exists") == "append"
+            and kwargs.get("index") is False
+            and self.table_exists(table)
+        ):
+            # Plain inserts: to_sql would commit, ending the current transaction
+            self.insert_rows(table, columns=df.columns.tolist(), rows=_sql_rows(df))
+        else:
+            df.to_sql(table, self.conn, **kwargs)
+
+    @write_me
+    def insert_rows(self, table: str, columns: List[str], rows: List[Tuple]) -> None:
+        """Insert rows into a table through a single prepared statement
+
+        Args:
+            table (str): Table name
+            columns (List[str]): Columns of the rows
+            rows (List[Tuple]): Rows, as tuples of SQLite-compatible values
+        """
+        c = self.conn.cursor()
+        c.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))})",
+            rows,
+        )
+        c.close()
 
     @connect_me
-    def select(self, query: str) -> pd.DataFrame:
-        return pd.read_sql(query, self.conn)
+    def select(
+        self,
+        query: str,
+        params: List[Any] = None,
+        chunksize: int = None,
+        dtypes: Dict[str, str] = None,
+    ) -> pd.DataFrame:
+        """Read the results of a query
+
+        Args:
+            query (str): Query
+            params (List[Any], optional): Parameters of the query. Defaults to None.
+            chunksize (int, optional): If set, results are read as an iterator of
+                dataframes of that many rows. Defaults to None.
+            dtypes (Dict[str, str], optional): Dtype per column, see apply_dtypes.
+                Defaults to None.
+
+        Returns:
+            pd.DataFrame: Results, or an iterator of dataframes if chunksize is set
+        """
+        if chunksize is not None:
+            return self.iter_select(
+                query, params=params, chunksize=chunksize, dtypes=dtypes
+            )
+
+        df = pd.read_sql(query, self.conn, params=params)
+        return apply_dtypes(df, dtypes) if dtypes else df
+
+    def iter_select(
+        self,
+        query: str,
+        params: List[Any] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        dtypes: Dict[str, str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Read the results of a query by chunks, holding one chunk at a time
+
+        Args:
+            query (str): Query
+            params (List[Any], optional): Parameters of the query. Defaults to None.
+            chunksize (int, optional): Rows per chunk. Defaults to DEFAULT_CHUNKSIZE.
+            dtypes (Dict[str, str], optional): Dtype per column, see apply_dtypes.
+                Defaults to None.
+
+        Yields:
+            pd.DataFrame: Chunks of results
+        """
+        c = self.conn.cursor()
+        try:
+            c.execute(query, params or [])
+            columns = [desc[0] for desc in c.description]
+
+            rows = c.fetchmany(chunksize)
+            while rows:
+                df = pd.DataFrame.from_records(rows, columns=columns)
+                yield apply_dtypes(df, dtypes) if dtypes else df
+                rows = c.fetchmany(chunksize)
+
+        finally:
+            c.close()
+
+    def iter_rows(
+        self,
+        table: str,
+        columns: List[str] = None,
+        where: str = None,
+        params: List[Any] = None,
+        order_by: List[str] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> Iterator[Tuple]:
+        """Read the rows of a table as plain tuples, without building dataframes
+
+        Args:
+            table (str): Table name
+            columns (List[str], optional): Columns to read, in order. Defaults to None
+                (all).
+            where (str, optional): SQL condition on the rows. Defaults to None.
+            params (List[Any], optional): Parameters of the condition. Defaults to
+                None.
+            order_by (List[str], optional): Columns to sort the rows on. Defaults to
+                None.
+            chunksize (int, optional): Rows fetched at a time. Defaults to
+                DEFAULT_CHUNKSIZE.
+
+        Yields:
+            Tuple: Rows
+        """
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM {table}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {', '.join(order_by)}"
+
+        c = self.conn.cursor()
+        try:
+            c.execute(query, params or [])
+            rows = c.fetchmany(chunksize)
+            while rows:
+                yield from rows
+                rows = c.fetchmany(chunksize)
+
+        finally:
+            c.close()
 
     @connect_me
     def table_columns(self, table: str) -> List[str]:
@@ -104,13 +426,13 @@ class Database:
 class SpotifyDatabase(Database):
     op_table: str
 
-    @connect_me
+    @write_me
     def _record_operation(self, op_type: str) -> None:
         c = self.conn.cursor()
         c.execute(
-            f"INSERT INTO {self.op_table} (date, op_type) VALUES ('{datetime.now(timezone.utc)}', '{op_type}')"
+            f"INSERT INTO {self.op_table} (date, op_type) VALUES (?, ?)",
+            (str(datetime.now(timezone.utc)), op_type),
         )
-        self.conn.commit()
         c.close()
 
     @connect_me
@@ -124,8 +446,9 @@ class SpotifyDatabase(Database):
             int: Operation index
         """
         c = self.conn.cursor()
-        c.execute("SELECT MAX(id) from operations")
-        max_id = c.fetchall()[0][0]
+        c.execute(f"SELECT MAX(id) FROM {self.op_table}")
+        max_id = c.fetchone()[0]
+        c.close()
 
         if max_id is None:
             max_id = 0
@@ -133,122 +456,355 @@ class SpotifyDatabase(Database):
         return max_id + 1
 
     @connect_me
-    def create_spotify_database(self, schema_file_path: str) -> None:
+    def ensure_schema(self, schema_file_path: str) -> None:
+        """Bring the database to the schema file: existing databases are migrated
+        (see migrations.py), each migration in its own transaction, then any table
+        of the schema file which is missing is created. New databases are created at
+        the latest version.
+
+        Args:
+            schema_file_path (str): Path to the YAML file holding the schemas
+        """
         with open(schema_file_path, "r") as f:
             data = yaml.load(f, Loader=yaml.FullLoader)
-        self.create_database_file(schemas=data.values())
-        self._record_operation(self.conn, op_type="db_creation")
 
+        with self.transaction() as conn:
+            is_new = (
+                conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1"
+                ).fetchone()
+                is None
+            )
+            if is_new:
+                set_schema_version(conn, LATEST_VERSION)
+                self.create_database_file(schemas=data.values())
+
+        if not is_new:
+            migrate(
+                self,
+                on_applied=lambda version: self._record_operation(
+                    op_type=f"migration_(v{version})"
+                ),
+            )
+            self.create_database_file(schemas=data.values())
+
+    @connect_me
+    def create_spotify_database(self, schema_file_path: str) -> None:
+        self.ensure_schema(schema_file_path=schema_file_path)
+        self._record_operation(op_type="db_creation")
+
+    @connect_me
     def build_collection_from_track_ids(self, track_ids: List[str]) -> List[TrackItem]:
+        """Load tracks, see iter_tracks
 
-        (
-            df_tracks,
-            df_albums,
-            df_albums_artists,
-            df_artists,
-            df_audio_features,
-            df_genres,
-        ) = self.table_contents(
-            [
-                "tracks",
-                "albums",
-                "albums_artists",
-                "artists",
-                "audio_features",
-                "genres",
-            ]
-        )
+        Args:
+            track_ids (List[str]): Track IDs
+
+        Returns:
+            List[TrackItem]: Tracks, in the order of the IDs (unknown IDs are skipped)
+        """
+        return list(self.iter_tracks(track_ids=track_ids))
 
-        # Format the data
-        track_data = df_tracks.loc[df_tracks["id"].isin(track_ids)].to_dict("records")
+    @connect_me
+    def build_collection_from_collection_id(self, id_: str) -> List[TrackItem]:
+        track_ids = self.collection_track_ids(id_=id_)
+        return self.build_collection_from_track_ids(track_ids=track_ids)
 
-        collection = []
-        for track_dict in track_data:
-            # Get album data
-            album_id = track_dict["album_id"]
-            album_dict = df_albums.loc[df_albums["id"] == album_id].to_dict("records")[
-                0
-            ]
+    @connect_me
+    def query_track_ids(
+        self,
+        conditions: List[Tuple[str, List[Any]]] = None,
+        genres: List[str] = None,
+        artist_ids: List[str] = None,
+        order_by: List[Tuple[str, bool]] = None,
+        random: bool = False,
+        limit: int = None,
+    ) -> List[str]:
+        """Select tracks from the database, see TRACK_QUERY_COLUMNS for the columns
+        available to conditions and ordering
 
-            # Get artists ids
-            artist_ids = df_albums_artists.loc[
-                df_albums_artists["album_id"] == album_id, "artist_id"
-            ].tolist()
-            artist_dict = df_artists.loc[df_artists["id"].isin(artist_ids)].to_dict(
-                "records"
+        Args:
+            conditions (List[Tuple[str, List[Any]]], optional): SQL conditions with
+                their parameters, all of which must hold. Defaults to None.
+            genres (List[str], optional): Only keep tracks by artists of one of these
+                genres. Defaults to None.
+            artist_ids (List[str], optional): Only keep tracks by one of these artists.
+                Defaults to None.
+            order_by (List[Tuple[str, bool]], optional): (column, ascending) pairs.
+                Defaults to None.
+            random (bool, optional): Random order, which takes precedence over
+                order_by. Defaults to False.
+            limit (int, optional): Maximum number of tracks. Defaults to None.
+
+        Returns:
+            List[str]: Track IDs
+        """
+        where, params = [], []
+
+        for condition, condition_params in conditions or []:
+            where.append(f"({condition})")
+            params.extend(condition_params)
+
+        if genres:
+            where.append(
+                f"""
+                EXISTS (
+                    SELECT 1 FROM albums_artists aa
+                    JOIN genres g ON g.artist_id = aa.artist_id
+                    WHERE aa.album_id = t.album_id
+                    AND g.genre IN ({', '.join(['?'] * len(genres))})
+                )
+                """
+            )
+            params.extend(genres)
+
+        if artist_ids:
+            where.append(
+                f"""
+                EXISTS (
+                    SELECT 1 FROM albums_artists aa
+                    WHERE aa.album_id = t.album_id
+                    AND aa.artist_id IN ({', '.join(['?'] * len(artist_ids))})
+                )
+                """
             )
+            params.extend(artist_ids)
 
-            # Add genres to artist
-            artist_dict = [
-                {
-                    **a_d,
-                    "genres": df_genres.loc[
-                        df_genres["artist_id"] == a_d["id"], "genre"
-                    ].tolist(),
-                }
-                for a_d in artist_dict
-            ]
+        query = """
+            SELECT t.id FROM tracks t
+            LEFT JOIN albums al ON al.id = t.album_id
+            LEFT JOIN audio_features af ON af.track_id = t.id
+        """
+        if where:
+            query += f" WHERE {' AND '.join(where)}"
+
+        if random:
+            query += " ORDER BY RANDOM()"
+        elif order_by:
+            query += " ORDER BY " + ", ".join(
+                f"{column} {'ASC' if ascending else 'DESC'}"
+                for column, ascending in order_by
+            )
 
-            # Add artist data to album
-            album_dict["artists"] = artist_dict
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
 
-            # Add audio features
-            audio_features_dict = df_audio_features[
-                df_audio_features["track_id"] == track_dict["id"]
-            ].to_dict("records")[0]
+        c = self.conn.cursor()
+        c.execute(query, params)
+        track_ids = [row[0] for row in c.fetchall()]
+        c.close()
+        return track_ids
 
-            # Add to track
-            track_dict["album"] = album_dict
-            track_dict["audio_features"] = audio_features_dict
+    def _album_artists(self, album_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Artists of albums, with their genres, as read through albums_artists
 
-            collection.append(TrackItem.from_dict(track_dict))
+        Args:
+            album_ids (List[str]): Album IDs
 
-        return collection
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Artist data per album ID
+        """
+        c = self.conn.cursor()
+        c.execute(
+            f"""
+            SELECT aa.album_id, ar.id, ar.name, ar.popularity
+            FROM albums_artists aa
+            JOIN artists ar ON ar.id = aa.artist_id
+            WHERE aa.album_id IN ({', '.join(['?'] * len(album_ids))})
+            """,
+            album_ids,
+        )
+        album_rows = c.fetchall()
 
-    @connect_me
-    def build_collection_from_collection_id(self, id_: str) -> List[TrackItem]:
-        df_collections = self.table_contents("collections")
+        artist_ids = list({row[1] for row in album_rows})
+        c.execute(
+            f"""
+            SELECT artist_id, genre FROM genres
+            WHERE artist_id IN ({', '.join(['?'] * len(artist_ids))})
+            """,
+            artist_ids,
+        )
+        genres = {}
+        for artist_id, genre in c.fetchall():
+            genres.setdefault(artist_id, []).append(genre)
+        c.close()
 
-        track_ids = df_collections.loc[df_collections["id"] == id_, "track_id"].tolist()
-        return self.build_collection_from_track_ids(track_ids=track_ids)
+        album_artists = {}
+        for album_id, artist_id, name, popularity in album_rows:
+            album_artists.setdefault(album_id, []).append(
+                {
+                    "id": artist_id,
+                    "name": name,
+                    "popularity": popularity,
+                    "genres": genres.get(artist_id, []),
+                }
+            )
+        return album_artists
 
     @connect_me
-    def build_random_collection(self, N: int) -> List[TrackItem]:
-        df_tracks = self.table_contents("tracks")
-        track_ids = random.sample(list(df_tracks.loc[:, "id"].values), k=N)
-        return self.build_collection_from_track_ids(track_ids=track_ids)
+    def iter_tracks(
+        self, track_ids: List[str], chunk_size: int = 500
+    ) -> Iterator[TrackItem]:
+        """Load tracks, with their album, artists and audio features, through indexed
+        queries on chunks of IDs
+
+        Args:
+            track_ids (List[str]): Track IDs
+            chunk_size (int, optional): Number of tracks loaded per query. Defaults to
+                500.
+
+        Yields:
+            TrackItem: Tracks, in input order (unknown IDs are skipped)
+        """
+        track_columns = ["id", "name", "popularity", "duration_ms", "album_id"]
+        columns = ", ".join(
+            [f"t.{column}" for column in track_columns]
+            + ["al.name", "al.release_date", "af.track_id"]
+            + [f"af.{column}" for column in AUDIO_FEATURES_COLUMNS]
+        )
+
+        for i in range(0, len(track_ids), chunk_size):
+            chunk = track_ids[i : i + chunk_size]
+            c = self.conn.cursor()
+
+            c.execute(
+                f"""
+                SELECT {columns}
+                FROM tracks t
+                LEFT JOIN albums al ON al.id = t.album_id
+                LEFT JOIN audio_features af ON af.track_id = t.id
+                WHERE t.id IN ({', '.join(['?'] * len(chunk))})
+                """,
+                chunk,
+            )
+            rows = {row[0]: row for row in c.fetchall()}
+            c.close()
+            album_artists = self._album_artists(
+                album_ids=list({row[4] for row in rows.values()})
+            )
+
+            # Track columns, then the album name and release date
+            n_columns = len(track_columns) + 2
+            for track_id in chunk:
+                row = rows.get(track_id)
+                if row is None:
+                    continue
+
+                track_dict = dict(zip(track_columns, row))
+                album_id = track_dict.pop("album_id")
+                album_name, release_date = row[len(track_columns) : n_columns]
+
+                track_dict["album"] = {
+                    "id": album_id,
+                    "name": album_name,
+                    "release_date": release_date or "",
+                    "artists": album_artists.get(album_id, []),
+                }
+
+                if row[n_columns] is not None:
+                    track_dict["audio_features"] = dict(
+                        zip(AUDIO_FEATURES_COLUMNS, row[n_columns + 1 :])
+                    )
+
+                yield TrackItem.from_dict(track_dict)
 
-    @connect_me
     def store_tracks_in_database(self, collection) -> None:
-        (
-            df_all_tracks,
-            df_all_artists,
-            df_all_albums,
-            df_audio_features,
-            df_album_artist,
-        ) = collection.to_dataframes()
+        """Store the tracks of a collection, with their albums, artists and audio
+        features, as a single transaction. Audio features are only requested for
+        the tracks which have none, in the collection or in the database.
+
+        Args:
+            collection (TrackCollection): Collection to store
+        """
+        # Requests are made beforehand, so as not to hold the writer in between
+        tracks = collection.add_missing_audio_features(db=self)
+        with self.transaction():
+            self.ingest_tracks(tracks=tracks, collection_id=collection.id_)
+
+    @write_me
+    def ingest_tracks(
+        self,
+        tracks: Iterable[TrackItem],
+        collection_id: str = None,
+        prepend: bool = False,
+    ) -> None:
+        """Store tracks, with their albums, artists, genres and audio features, as a
+        single transaction. Rows already in the database (same primary key) are kept
+        as they are.
+
+        Args:
+            tracks (Iterable[TrackItem]): Tracks
+            collection_id (str, optional): Collection the tracks are added to.
+                Defaults to None.
+            prepend (bool, optional): Whether the tracks are added before those the
+                collection holds, rather than after them. Defaults to False.
+        """
+        tracks = list(tracks)
+        rows = normalize_tracks(tracks)
+        op_index = self._op_index()
+        c = self.conn.cursor()
+
+        for table, table_rows in rows.items():
+            if not table_rows:
+                continue
+
+            logger.info(f"Enriching {table} with {len(table_rows)} rows")
+            columns = INGEST_COLUMNS[table] + ["op_index"]
+            placeholders = ", ".join(["?"] * len(columns))
+
+            c.executemany(
+                f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({placeholders})",
+                [(*row, op_index) for row in table_rows],
+            )
 
-        table_map = {
-            "tracks": df_all_tracks,
-            "artists": df_all_artists,
-            "albums": df_all_albums,
-            "audio_features": df_audio_features,
-            "albums_artists": df_album_artist,
-        }
+        c.close()
 
-        for table, df_data in table_map.items():
-            logger.info(f"Enriching {table} with {len(df_data)} rows")
-            self.enrich_database_table(df_data=df_data, table=table)
+        if collection_id:
+            self.add_collection_track_ids(
+                id_=collection_id,
+                track_ids=[track.id for track in tracks],
+                prepend=prepend,
+            )
+        self._record_operation(op_type="record_addition_(tracks)")
 
-        df_collection = df_all_tracks.loc[:, ["id"]].rename(columns={"id": "track_id"})
-        df_collection.loc[:, "id"] = collection.id_
+    @connect_me
+    def audio_features_track_ids(self, track_ids: List[str]) -> List[str]:
+        """IDs of the tracks whose audio features are stored
 
-        self.write_dataframe(
-            df_collection, "collections", if_exists="append", index=False
+        Args:
+            track_ids (List[str]): Track IDs
+
+        Returns:
+            List[str]: IDs of the tracks with stored audio features
+        """
+        return self._stored_ids(
+            table="audio_features", column="track_id", ids=track_ids
         )
-        self._record_operation(op_type="collection_addition")
 
     @connect_me
+    def _stored_ids(self, table: str, column: str, ids: List[str]) -> List[str]:
+        """Values of a key column found in a table, looked up by chunks"""
+        ids = list(dict.fromkeys(ids))
+        stored_ids = []
+        c = self.conn.cursor()
+
+        for i in range(0, len(ids), 500):
+            chunk = ids[i : i + 500]
+            c.execute(
+                f"""
+                SELECT {column} FROM {table}
+                WHERE {column} IN ({', '.join(['?'] * len(chunk))})
+                """,
+                chunk,
+            )
+            stored_ids.extend(row[0] for row in c.fetchall())
+
+        c.close()
+        return stored_ids
+
+    @write_me
     def enrich_database_table(self, df_data: pd.DataFrame, table: str) -> None:
 
         df_existing = self.table_contents(table)
@@ -286,55 +842,56 @@ class SpotifyDatabase(Database):
             self._record_operation(op_type=f"record_addition_({table})")
 
     @connect_me
-    def playlist_exists(self, id_: str):
-        out = self.select(f"SELECT * FROM collections WHERE id = '{id_}'")
-        return len(out) > 0
+    def playlist_exists(self, id_: str) -> bool:
+        c = self.conn.cursor()
+        c.execute("SELECT 1 FROM collections WHERE id = ? LIMIT 1", (id_,))
+        exists = c.fetchone() is not None
+        c.close()
+        return exists
 
     @connect_me
     def load_playlist(self, playlist_id: str):
-        df_collections = self.select(
-            f"SELECT DISTINCT track_id FROM collections WHERE id = '{playlist_id}'"
-        )
-        track_ids = df_collections["track_id"].tolist()
+        track_ids = self.collection_track_ids(id_=playlist_id)
         return self.build_collection_from_track_ids(track_ids=track_ids)
 
     @connect_me
     def load_album(self, album_id: str):
-        df = self.select(
-            f"SELECT DISTINCT id FROM tracks WHERE album_id = '{album_id}'"
-        )
-
-        track_ids = df["id"].tolist()
+        c = self.conn.cursor()
+        c.execute("SELECT DISTINCT id FROM tracks WHERE album_id = ?", (album_id,))
+        track_ids = [row[0] for row in c.fetchall()]
+        c.close()
         return self.build_collection_from_track_ids(track_ids=track_ids)
 
     @connect_me
     def load_artist(self, artist_id: str):
-        df_tracks, df_album_artists = self.table_contents(["tracks", "albums_artists"])
-
-        track_ids = (
-            df_album_artists.loc[df_album_artists["artist_id"] == artist_id]
-            .merge(df_tracks, how="inner", on="album_id")
-            .loc[:, "id"]
-            .tolist()
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT DISTINCT t.id FROM tracks t
+            JOIN albums_artists aa ON aa.album_id = t.album_id
+            WHERE aa.artist_id = ?
+            """,
+            (artist_id,),
         )
-
+        track_ids = [row[0] for row in c.fetchall()]
+        c.close()
         return self.build_collection_from_track_ids(track_ids=track_ids)
 
     @connect_me
     def load_track(self, track_id: str):
         return self.build_collection_from_track_ids(track_ids=[track_id])
 
-    @connect_me
+    @write_me
     def add_collection(self, collection_id: str, tracks: List[TrackItem]):
-        df = pd.DataFrame(
-            data={"id": collection_id, "track_id": [track.id for track in tracks]}
-        )
-        self.enrich_database_table(df_data=df, table="collections")
+        """Store a collection and its tracks as a single transaction
 
-        for track_item in tracks:
-            self.add_track(track_item=track_item)
+        Args:
+            collection_id (str): Collection ID
+            tracks (List[TrackItem]): Tracks of the collection
+        """
+        self.ingest_tracks(tracks=tracks, collection_id=collection_id)
 
-    @connect_me
+    @write_me
     def add_artist(self, artist_item: ArtistItem) -> None:
         artist_dict = asdict(artist_item)
         self.enrich_database_table(
@@ -342,13 +899,13 @@ class SpotifyDatabase(Database):
         )
         self.add_genres(artist_id=artist_item.id, genres=artist_item.genres)
 
-    @connect_me
+    @write_me
     def add_genres(self, artist_id: str, genres: List[str]):
         if genres:
             df = pd.DataFrame(data={"genre": genres, "artist_id": artist_id})
             self.enrich_database_table(df_data=df, table="genres")
 
-    @connect_me
+    @write_me
     def add_album(self, album_item: AlbumItem):
         album_dict = asdict(album_item)
         self.enrich_database_table(df_data=pd.DataFrame([album_dict]), table="albums")
@@ -359,24 +916,757 @@ class SpotifyDatabase(Database):
         for artist_item in album_item.artists:
             self.add_artist(artist_item=artist_item)
 
-    @connect_me
+    @write_me
     def add_album_artists(self, album_id: str, artist_ids: List[str]):
         df = pd.DataFrame(data={"artist_id": artist_ids, "album_id": album_id})
         self.enrich_database_table(df_data=df, table="albums_artists")
 
-    @connect_me
+    @write_me
     def add_track(self, track_item: TrackItem):
-        track_dict = asdict(track_item)
-        track_dict["album_id"] = track_item.album.id
-        self.enrich_database_table(df_data=pd.DataFrame([track_dict]), table="tracks")
-        self.add_album(album_item=track_item.album)
+        self.ingest_tracks(tracks=[track_item])
 
-    @connect_me
+    @write_me
     def add_audio_features(self, artist_id: str, audio_features: AudioFeaturesItem):
         audio_features_dict = asdict(audio_features)
         df = pd.DataFrame(data=[{"artist_id": artist_id, **audio_features_dict}])
         self.enrich_database_table(df_data=df, table="audio_features")
 
+    @write_me
+    def store_artist_top_tracks(self, top_tracks: Dict[str, List[TrackItem]]) -> None:
+        """Replace the materialized top tracks of the given artists. The tracks are
+        also ingested, so that their albums' artists are stored, and artists without
+        any top track get an empty marker row, recording that they were refreshed.
+
+        Args:
+            top_tracks (Dict[str, List[TrackItem]]): Popular tracks (enriched with audio
+                features) per artist ID, in ranking order
+        """
+        self.ingest_tracks(
+            tracks=[track for tracks in top_tracks.values() for track in tracks]
+        )
+
+        refreshed_at = str(datetime.now(timezone.utc))
+        rows = [
+            (
+                artist_id,
+                rank,
+                track.id,
+                track.name,
+                track.popularity,
+                track.duration_ms,
+                track.album.id,
+                track.album.name,
+                str(track.album.release_date) if track.album.release_date else None,
+                *[getattr(track.audio_features, col) for col in AUDIO_FEATURES_COLUMNS],
+                refreshed_at,
+            )
+            for artist_id, tracks in top_tracks.items()
+            for rank, track in enumerate(tracks)
+        ]
+
+        c = self.conn.cursor()
+        c.executemany(
+            "DELETE FROM artist_top_tracks WHERE artist_id = ?",
+            [(artist_id,) for artist_id in top_tracks],
+        )
+        if rows:
+            placeholders = ", ".join(["?"] * len(rows[0]))
+            c.executemany(
+                f"INSERT INTO artist_top_tracks VALUES ({placeholders})", rows
+            )
+        # Artists without top tracks get a marker row (rank -1, no track)
+        c.executemany(
+            """
+            INSERT INTO artist_top_tracks (artist_id, rank, refreshed_at)
+            VALUES (?, -1, ?)
+            """,
+            [
+                (artist_id, refreshed_at)
+                for artist_id, tracks in top_tracks.items()
+                if not tracks
+            ],
+        )
+        c.close()
+        self._record_operation(op_type="record_addition_(artist_top_tracks)")
+
+    @connect_me
+    def load_artist_top_tracks(
+        self, artist_ids: List[str]
+    ) -> Dict[str, List[TrackItem]]:
+        """Read the materialized top tracks of the given artists in a single query,
+        with the artists of their albums. Artists that were never refreshed are
+        absent from the output, and those without top tracks map to an empty list.
+
+        Args:
+            artist_ids (List[str]): Artist IDs
+
+        Returns:
+            Dict[str, List[TrackItem]]: Popular tracks per artist ID, in ranking order
+        """
+        unique_ids = list(dict.fromkeys(artist_ids))
+        if not unique_ids:
+            return {}
+
+        c = self.conn.cursor()
+        c.execute(
+            f"""
+            SELECT * FROM artist_top_tracks
+            WHERE artist_id IN ({', '.join(['?'] * len(unique_ids))})
+            ORDER BY artist_id, rank
+            """,
+            unique_ids,
+        )
+        columns = [desc[0] for desc in c.description]
+        row_dicts = [dict(zip(columns, row)) for row in c.fetchall()]
+        c.close()
+
+        album_artists = self._album_artists(
+            album_ids=list({row_dict["album_id"] for row_dict in row_dicts})
+        )
+
+        top_tracks = {}
+        for row_dict in row_dicts:
+            tracks = top_tracks.setdefault(row_dict["artist_id"], [])
+            if row_dict["track_id"] is None:
+                continue
+
+            track_dict = {
+                "id": row_dict["track_id"],
+                "name": row_dict["name"],
+                "popularity": row_dict["popularity"],
+                "duration_ms": row_dict["duration_ms"],
+                "audio_features": {
+                    col: row_dict[col] for col in AUDIO_FEATURES_COLUMNS
+                },
+                "album": {
+                    "id": row_dict["album_id"],
+                    "name": row_dict["album_name"],
+                    "release_date": row_dict["release_date"] or "",
+                    "artists": album_artists.get(row_dict["album_id"], []),
+                },
+            }
+            tracks.append(TrackItem.from_dict(track_dict))
+
+        return top_tracks
+
+    @write_me
+    def refresh_genre_top_artists(self, k: int = 10) -> None:
+        """Rebuild the genre_top_artists table, holding the k most popular artists of
+        each genre
+
+        Args:
+            k (int, optional): Number of artists kept per genre. Defaults to 10.
+        """
+        c = self.conn.cursor()
+        c.execute("DELETE FROM genre_top_artists")
+        c.execute(
+            """
+            INSERT INTO genre_top_artists (genre, rank, artist_id, popularity)
+            SELECT genre, rank, artist_id, popularity FROM (
+                SELECT
+                    genres.genre,
+                    genres.artist_id,
+                    artists.popularity,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY genres.genre
+                        ORDER BY artists.popularity DESC, genres.artist_id
+                    ) - 1 AS rank
+                FROM (SELECT DISTINCT genre, artist_id FROM genres) AS genres
+                INNER JOIN artists ON artists.id = genres.artist_id
+            )
+            WHERE rank < ?
+            """,
+            (k,),
+        )
+        c.close()
+        self._record_operation(op_type="refresh_(genre_top_artists)")
+
+    @connect_me
+    def genre_top_artists(self, genres: List[str], k: int = 1) -> Dict[str, List[str]]:
+        """Most popular artists of each of the given genres, read from the
+        genre_top_artists table. Genres absent from the table (e.g. added since its
+        last refresh) are looked up through the genres index instead.
+
+        Args:
+            genres (List[str]): Genre names
+            k (int, optional): Number of artists per genre. Defaults to 1.
+
+        Returns:
+            Dict[str, List[str]]: Artist IDs per genre, by decreasing popularity
+        """
+        unique_genres = list(dict.fromkeys(genres))
+        if not unique_genres:
+            return {}
+
+        c = self.conn.cursor()
+        c.execute(
+            f"""
+            SELECT genre, artist_id FROM genre_top_artists
+            WHERE genre IN ({', '.join(['?'] * len(unique_genres))}) AND rank < ?
+            ORDER BY genre, rank
+            """,
+            [*unique_genres, k],
+        )
+
+        top_artists = {}
+        for genre, artist_id in c.fetchall():
+            top_artists.setdefault(genre, []).append(artist_id)
+
+        for genre in unique_genres:
+            if len(top_artists.get(genre, [])) < k:
+                c.execute(
+                    """
+                    SELECT genres.artist_id FROM genres
+                    INNER JOIN artists ON artists.id = genres.artist_id
+                    WHERE genres.genre = ?
+                    GROUP BY genres.artist_id
+                    ORDER BY MAX(artists.popularity) DESC, genres.artist_id
+                    LIMIT ?
+                    """,
+                    (genre, k),
+                )
+                top_artists[genre] = [row[0] for row in c.fetchall()]
+
+        c.close()
+        return top_artists
+
+    @connect_me
+    def cached_resolutions(
+        self, kind: str, query: str, max_age: timedelta = None
+    ) -> List[Dict[str, Any]]:
+        """Candidates previously resolved for a name query
+
+        Args:
+            kind (str): Kind of object searched (artist, album, track, show, playlist)
+            query (str): Name query
+            max_age (timedelta, optional): Resolutions older than this are ignored.
+                Defaults to None (no expiry).
+
+        Returns:
+            List[Dict[str, Any]]: Candidates (id, name, popularity), best first
+        """
+        sql = """
+            SELECT id, name, popularity FROM resolutions
+            WHERE kind = ? AND query = ?
+        """
+        params = [kind, query]
+
+        if max_age is not None:
+            sql += " AND resolved_at >= ?"
+            params.append(str(datetime.now(timezone.utc) - max_age))
+
+        c = self.conn.cursor()
+        c.execute(sql + " ORDER BY rank", params)
+        candidates = [
+            {"id": id_, "name": name, "popularity": popularity}
+            for id_, name, popularity in c.fetchall()
+        ]
+        c.close()
+        return candidates
+
+    @write_me
+    def store_resolutions(
+        self,
+        kind: str,
+        resolutions: Dict[str, List[Dict[str, Any]]],
+        replace_kind: bool = False,
+    ) -> None:
+        """Store the candidates resolved for name queries
+
+        Args:
+            kind (str): Kind of object searched (artist, album, track, show, playlist)
+            resolutions (Dict[str, List[Dict[str, Any]]]): Candidates per query, best
+                first
+            replace_kind (bool, optional): Whether all stored resolutions of that kind
+                should be replaced, e.g. for a complete listing. Defaults to False.
+        """
+        resolved_at = str(datetime.now(timezone.utc))
+        c = self.conn.cursor()
+
+        if replace_kind:
+            c.execute("DELETE FROM resolutions WHERE kind = ?", (kind,))
+        else:
+            c.executemany(
+                "DELETE FROM resolutions WHERE kind = ? AND query = ?",
+                [(kind, query) for query in resolutions],
+            )
+
+        c.executemany(
+            """
+            INSERT INTO resolutions
+                (kind, query, rank, id, name, popularity, resolved_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    kind,
+                    query,
+                    rank,
+                    candidate["id"],
+                    candidate.get("name"),
+                    candidate.get("popularity"),
+                    resolved_at,
+                )
+                for query, candidates in resolutions.items()
+                for rank, candidate in enumerate(candidates)
+            ],
+        )
+        c.close()
+
+    @write_me
+    def invalidate_resolutions(self, kind: str = None, query: str = None) -> None:
+        """Forget stored name resolutions
+
+        Args:
+            kind (str, optional): Only forget this kind. Defaults to None (all kinds).
+            query (str, optional): Only forget this query. Defaults to None (all queries).
+        """
+        conditions = {"kind": kind, "query": query}
+        conditions = {col: value for col, value in conditions.items() if value}
+        where = " AND ".join(f"{col} = ?" for col in conditions) or "1 = 1"
+
+        c = self.conn.cursor()
+        c.execute(f"DELETE FROM resolutions WHERE {where}", list(conditions.values()))
+        c.close()
+
+    @connect_me
+    def show_states(self, show_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """State recorded for shows at their last check
+
+        Args:
+            show_ids (List[str]): Show IDs
+
+        Returns:
+            Dict[str, Dict[str, Any]]: State (total_episodes, last_episode_id,
+                last_release_date, checked_at) per show ID, for known shows only
+        """
+        if not show_ids:
+            return {}
+
+        c = self.conn.cursor()
+        c.execute(
+            f"""
+            SELECT * FROM show_states
+            WHERE show_id IN ({', '.join(['?'] * len(show_ids))})
+            """,
+            list(show_ids),
+        )
+        columns = [desc[0] for desc in c.description]
+        states = {row[0]: dict(zip(columns, row)) for row in c.fetchall()}
+        c.close()
+        return states
+
+    @write_me
+    def store_show_states(self, states: Dict[str, Dict[str, Any]]) -> None:
+        """Record the state of shows after a check
+
+        Args:
+            states (Dict[str, Dict[str, Any]]): State (total_episodes, last_episode_id,
+                last_release_date) per show ID
+        """
+        checked_at = str(datetime.now(timezone.utc))
+        c = self.conn.cursor()
+        c.executemany(
+            """
+            INSERT OR REPLACE INTO show_states
+                (show_id, total_episodes, last_episode_id, last_release_date, checked_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    show_id,
+                    state.get("total_episodes"),
+                    state.get("last_episode_id"),
+                    state.get("last_release_date"),
+                    checked_at,
+                )
+                for show_id, state in states.items()
+            ],
+        )
+        c.close()
+
+    @connect_me
+    def collection_state(self, id_: str) -> Dict[str, Any]:
+        """State recorded for a collection at its last sync
+
+        Args:
+            id_ (str): Collection ID
+
+        Returns:
+            Dict[str, Any]: State (watermark, total, synced_at), or None if the
+                collection was never synced
+        """
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT watermark, total, synced_at FROM collection_states WHERE id = ?",
+            (id_,),
+        )
+        row = c.fetchone()
+        c.close()
+
+        if row is None:
+            return None
+
+        return dict(zip(["watermark", "total", "synced_at"], row))
+
+    @write_me
+    def store_collection_state(self, id_: str, watermark: str, total: int) -> None:
+        """Record the state of a collection after a sync
+
+        Args:
+            id_ (str): Collection ID
+            watermark (str): Most recent addition date of the collection's items
+            total (int): Number of items in the collection
+        """
+        c = self.conn.cursor()
+        c.execute(
+            """
+            INSERT OR REPLACE INTO collection_states (id, watermark, total, synced_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (id_, watermark, total, str(datetime.now(timezone.utc))),
+        )
+        c.close()
+
+    @connect_me
+    def _current_snapshot_id(self, id_: str) -> str:
+        """Snapshot ID of the current version of a collection: the recorded snapshot
+        of playlists, and "" for collections without versions"""
+        snapshot_id = self.playlist_snapshot(playlist_id=id_)
+        return snapshot_id if snapshot_id is not None else ""
+
+    @connect_me
+    def collection_size(self, id_: str, snapshot_id: str = None) -> int:
+        """Number of distinct tracks stored for a collection
+
+        Args:
+            id_ (str): Collection ID
+            snapshot_id (str, optional): Version of the collection. Defaults to None
+                (current version).
+
+        Returns:
+            int: Number of tracks
+        """
+        if snapshot_id is None:
+            snapshot_id = self._current_snapshot_id(id_=id_)
+
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT COUNT(DISTINCT track_id) FROM collections
+            WHERE id = ? AND snapshot_id = ?
+            """,
+            (id_, snapshot_id),
+        )
+        size = c.fetchone()[0]
+        c.close()
+        return size
+
+    @write_me
+    def add_collection_track_ids(
+        self,
+        id_: str,
+        track_ids: List[str],
+        snapshot_id: str = "",
+        prepend: bool = False,
+    ) -> None:
+        """Append tracks to a collection, skipping those it already holds
+
+        Args:
+            id_ (str): Collection ID
+            track_ids (List[str]): Track IDs
+            snapshot_id (str, optional): Version of the collection. Defaults to ""
+                (collections without versions).
+            prepend (bool, optional): Whether the tracks are inserted, in order,
+                before those the collection holds (e.g. newest first collections).
+                Defaults to False.
+        """
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT track_id, position FROM collections
+            WHERE id = ? AND snapshot_id = ?
+            ORDER BY position
+            """,
+            (id_, snapshot_id),
+        )
+        rows = c.fetchall()
+        existing = {track_id for track_id, _ in rows}
+
+        new_ids = [
+            track_id
+            for track_id in dict.fromkeys(track_ids)
+            if track_id not in existing
+        ]
+        # Positions need not start at 0: prepended tracks take negative positions
+        if prepend:
+            start = (rows[0][1] if rows else 0) - len(new_ids)
+        else:
+            start = rows[-1][1] + 1 if rows else 0
+        c.executemany(
+            """
+            INSERT INTO collections (id, snapshot_id, position, track_id)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (id_, snapshot_id, start + i, track_id)
+                for i, track_id in enumerate(new_ids)
+            ],
+        )
+        c.close()
+
+    @write_me
+    def store_collection_version(
+        self, id_: str, snapshot_id: str, track_ids: List[str]
+    ) -> None:
+        """Store a version of a collection, e.g. a playlist at a given snapshot,
+        replacing any stored under the same snapshot ID
+
+        Args:
+            id_ (str): Collection ID
+            snapshot_id (str): Snapshot ID of the version
+            track_ids (List[str]): Track IDs, in order (duplicates are kept)
+        """
+        c = self.conn.cursor()
+        c.execute(
+            "DELETE FROM collections WHERE id = ? AND snapshot_id = ?",
+            (id_, snapshot_id),
+        )
+        c.executemany(
+            """
+            INSERT INTO collections (id, snapshot_id, position, track_id)
+            VALUES (?, ?, ?, ?)
+            """,
+            [(id_, snapshot_id, i, track_id) for i, track_id in enumerate(track_ids)],
+        )
+        c.close()
+
+    @write_me
+    def remove_collection(self, id_: str) -> None:
+        """Forget the tracks, versions and sync state of a collection
+
+        Args:
+            id_ (str): Collection ID
+        """
+        c = self.conn.cursor()
+        c.execute("DELETE FROM collections WHERE id = ?", (id_,))
+        c.execute("DELETE FROM collection_states WHERE id = ?", (id_,))
+        c.execute("DELETE FROM playlist_snapshots WHERE playlist_id = ?", (id_,))
+        c.close()
+
+    @connect_me
+    def collection_track_ids(self, id_: str, snapshot_id: str = None) -> List[str]:
+        """IDs of the tracks stored for a collection, read through a range scan of
+        the collections key
+
+        Args:
+            id_ (str): Collection ID
+            snapshot_id (str, optional): Version of the collection. Defaults to None
+                (current version).
+
+        Returns:
+            List[str]: Track IDs, in collection order
+        """
+        if snapshot_id is None:
+            snapshot_id = self._current_snapshot_id(id_=id_)
+
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT track_id FROM collections
+            WHERE id = ? AND snapshot_id = ?
+            ORDER BY position
+            """,
+            (id_, snapshot_id),
+        )
+        track_ids = [row[0] for row in c.fetchall()]
+        c.close()
+        return track_ids
+
+    @write_me
+    def remove_collection_track_ids(
+        self, id_: str, track_ids: List[str], snapshot_id: str = ""
+    ) -> None:
+        """Remove tracks from a collection
+
+        Args:
+            id_ (str): Collection ID
+            track_ids (List[str]): Track IDs
+            snapshot_id (str, optional): Version of the collection. Defaults to ""
+                (collections without versions).
+        """
+        c = self.conn.cursor()
+        c.executemany(
+            "DELETE FROM collections WHERE id = ? AND snapshot_id = ? AND track_id = ?",
+            [(id_, snapshot_id, track_id) for track_id in track_ids],
+        )
+        c.close()
+
+    @connect_me
+    def stored_track_ids(self, track_ids: List[str]) -> List[str]:
+        """IDs of the tracks stored in the tracks table
+
+        Args:
+            track_ids (List[str]): Track IDs
+
+        Returns:
+            List[str]: IDs of the stored tracks
+        """
+        return self._stored_ids(table="tracks", column="id", ids=track_ids)
+
+    @connect_me
+    def stored_album_ids(self, album_ids: List[str]) -> List[str]:
+        """IDs of the albums stored in the albums table
+
+        Args:
+            album_ids (List[str]): Album IDs
+
+        Returns:
+            List[str]: IDs of the stored albums
+        """
+        return self._stored_ids(table="albums", column="id", ids=album_ids)
+
+    @connect_me
+    def stored_artist_ids(self, artist_ids: List[str]) -> List[str]:
+        """IDs of the artists stored in the artists table
+
+        Args:
+            artist_ids (List[str]): Artist IDs
+
+        Returns:
+            List[str]: IDs of the stored artists
+        """
+        return self._stored_ids(table="artists", column="id", ids=artist_ids)
+
+    @connect_me
+    def playlist_snapshot(self, playlist_id: str) -> str:
+        """Snapshot ID of the playlist version stored in the database
+
+        Args:
+            playlist_id (str): Playlist ID
+
+        Returns:
+            str: Snapshot ID, or None if the playlist was never synced
+        """
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT snapshot_id FROM playlist_snapshots WHERE playlist_id = ?",
+            (playlist_id,),
+        )
+        row = c.fetchone()
+        c.close()
+        return row[0] if row else None
+
+    @write_me
+    def store_playlist_snapshot(self, playlist_id: str, snapshot_id: str) -> None:
+        """Record the snapshot ID of the playlist version stored in the database
+
+        Args:
+            playlist_id (str): Playlist ID
+            snapshot_id (str): Snapshot ID
+        """
+        c = self.conn.cursor()
+        c.execute(
+            """
+            INSERT OR REPLACE INTO playlist_snapshots (playlist_id, snapshot_id, synced_at)
+            VALUES (?, ?, ?)
+            """,
+            (playlist_id, snapshot_id, str(datetime.now(timezone.utc))),
+        )
+        c.close()
+
+    @write_me
+    def spill_items(self, cache_id: str, start: int, items: List[Any]) -> None:
+        """Store items of an in-memory cache which grew too large
+
+        Args:
+            cache_id (str): Cache ID
+            start (int): Position of the first item within the cache
+            items (List[Any]): Picklable items
+        """
+        c = self.conn.cursor()
+        c.executemany(
+            "INSERT INTO item_cache (cache_id, position, item) VALUES (?, ?, ?)",
+            [
+                (cache_id, start + i_item, pickle.dumps(item))
+                for i_item, item in enumerate(items)
+            ],
+        )
+        c.close()
+
+    @connect_me
+    def spilled_items(self, cache_id: str, start: int, n: int) -> List[Any]:
+        """Read back spilled items of a cache
+
+        Args:
+            cache_id (str): Cache ID
+            start (int): Position of the first item to read
+            n (int): Number of items to read
+
+        Returns:
+            List[Any]: Items, in cache order
+        """
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT item FROM item_cache
+            WHERE cache_id = ? AND position >= ?
+            ORDER BY position
+            LIMIT ?
+            """,
+            (cache_id, start, n),
+        )
+        items = [pickle.loads(row[0]) for row in c.fetchall()]
+        c.close()
+        return items
+
+    @write_me
+    def drop_spilled_items(self, cache_id: str) -> None:
+        """Forget the spilled items of a cache
+
+        Args:
+            cache_id (str): Cache ID
+        """
+        c = self.conn.cursor()
+        c.execute("DELETE FROM item_cache WHERE cache_id = ?", (cache_id,))
+        c.close()
+
+    @connect_me
+    def filter_track_ids(
+        self, track_ids: List[str], condition: str, params: List[Any]
+    ) -> List[str]:
+        """Select the tracks satisfying a condition, see TRACK_QUERY_COLUMNS for the
+        columns available
+
+        Args:
+            track_ids (List[str]): IDs of the candidate tracks
+            condition (str): SQL condition
+            params (List[Any]): Parameters of the condition
+
+        Returns:
+            List[str]: IDs of the tracks satisfying the condition, in input order
+                (duplicates are kept)
+        """
+        unique_ids = list(dict.fromkeys(track_ids))
+        selected = set()
+        c = self.conn.cursor()
+
+        for i in range(0, len(unique_ids), 500):
+            chunk = unique_ids[i : i + 500]
+            c.execute(
+                f"""
+                SELECT t.id FROM tracks t
+                LEFT JOIN albums al ON al.id = t.album_id
+                LEFT JOIN audio_features af ON af.track_id = t.id
+                WHERE t.id IN ({', '.join(['?'] * len(chunk))}) AND ({condition})
+                """,
+                chunk + list(params),
+            )
+            selected.update(row[0] for row in c.fetchall())
+
+        c.close()
+        return [track_id for track_id in track_ids if track_id in selected]
+
 
 class DatabaseSingleton(type):
     _instances = {}
@@ -0,0 +1,204 @@
+"""
+    This module holds the trigram index used to search genre names
+"""
+
+# Standard library imports
+import os
+import pickle
+from typing import Dict
+from typing import List
+from typing import Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Third party imports
+
+# Local imports
+from .database import Database
+
+# Main body
+def genres_version(db: Database) -> Tuple[int, int]:
+    """Version of the genres table, which changes whenever rows are added or removed
+
+    Args:
+        db (Database): Database holding the genres table
+
+    Returns:
+        Tuple[int, int]: Number of rows and index of the last operation
+    """
+    return tuple(
+        db.conn.execute("SELECT COUNT(*), MAX(op_index) FROM genres").fetchone()
+    )
+
+
+def load_genre_index(db: Database, file_path: str) -> "GenreIndex":
+    """Load the genre index saved in a file, (re)building and saving it if the file
+    is missing or if the genres table changed since the index was built
+
+    Args:
+        db (Database): Database holding the genres table
+        file_path (str): Path of the saved index
+
+    Returns:
+        GenreIndex: Genre name index
+    """
+    if os.path.exists(file_path):
+        genre_index = GenreIndex.load(file_path)
+        if genre_index.version == genres_version(db):
+            return genre_index
+
+    genre_index = GenreIndex.from_database(db)
+    genre_index.save(file_path)
+    return genre_index
+
+
+def trigrams(text: str) -> List[str]:
+    """Split text into its distinct trigrams, padded so that word boundaries count
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        List[str]: Trigrams of the text
+    """
+    padded = f"  {text.lower().strip()} "
+    return list(dict.fromkeys(padded[i : i + 3] for i in range(len(padded) - 2)))
+
+
+@dataclass
+class GenreIndex:
+    """Inverted index from trigrams to genre names, used for fuzzy and substring
+    searches without scanning every genre"""
+
+    genres: List[str] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict, repr=False)
+    version: Tuple[int, int] = field(default=None, compare=False)
+    _positions: Dict[str, int] = field(init=False, repr=False, compare=False)
+    _sizes: List[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._positions = {genre: i_genre for i_genre, genre in enumerate(self.genres)}
+        self._sizes = [len(trigrams(genre)) for genre in self.genres]
+
+    @classmethod
+    def from_genres(cls, genres: List[str]) -> "GenreIndex":
+        """Build the index from a list of genre names
+
+        Args:
+            genres (List[str]): Genre names
+
+        Returns:
+            GenreIndex: Index object
+        """
+        unique_genres = sorted(set(genres))
+        postings = {}
+        for i_genre, genre in enumerate(unique_genres):
+            for trigram in trigrams(genre):
+                postings.setdefault(trigram, []).append(i_genre)
+
+        return cls(genres=unique_genres, postings=postings)
+
+    @classmethod
+    def from_database(cls, db: Database) -> "GenreIndex":
+        """Build the index from the genres table of the database
+
+        Args:
+            db (Database): Database holding the genres table
+
+        Returns:
+            GenreIndex: Index object
+        """
+        version = genres_version(db)
+        df_genres = db.select("SELECT DISTINCT genre FROM genres")
+        genre_index = cls.from_genres(df_genres["genre"].dropna().tolist())
+        genre_index.version = version
+        return genre_index
+
+    @classmethod
+    def load(cls, file_path: str) -> "GenreIndex":
+        with open(file_path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "wb") as f:
+            pickle.dump(self, f)
+
+    def __len__(self) -> int:
+        return len(self.genres)
+
+    def __contains__(self, genre: str) -> bool:
+        return genre in self._positions
+
+    def matches(
+        self, query: str, n: int = 10, threshold: float = 0.4
+    ) -> List[Tuple[str, float]]:
+        """Genres most similar to the query, by trigram similarity (Dice coefficient)
+
+        Args:
+            query (str): Genre name, possibly misspelt
+            n (int, optional): Maximum number of matches. Defaults to 10.
+            threshold (float, optional): Minimum similarity. Defaults to 0.4.
+
+        Returns:
+            List[Tuple[str, float]]: Genres and their similarity, best match first
+        """
+        query_trigrams = trigrams(query)
+        shared_counts = Counter(
+            i_genre
+            for trigram in query_trigrams
+            for i_genre in self.postings.get(trigram, [])
+        )
+
+        scores = []
+        for i_genre, shared in shared_counts.items():
+            score = 2 * shared / (len(query_trigrams) + self._sizes[i_genre])
+            if score >= threshold:
+                scores.append((self.genres[i_genre], score))
+
+        return sorted(scores, key=lambda x: (-x[1], x[0]))[:n]
+
+    def contains(self, substring: str) -> List[str]:
+        """Genres containing the given substring
+
+        Args:
+            substring (str): Substring to look for
+
+        Returns:
+            List[str]: Matching genres, in alphabetical order
+        """
+        substring = substring.lower()
+        inner_trigrams = [substring[i : i + 3] for i in range(len(substring) - 2)]
+
+        if not inner_trigrams:
+            return [genre for genre in self.genres if substring in genre]
+
+        candidates = set(self.postings.get(inner_trigrams[0], []))
+        for trigram in inner_trigrams[1:]:
+            candidates.intersection_update(self.postings.get(trigram, []))
+
+        return [
+            self.genres[i_genre]
+            for i_genre in sorted(candidates)
+            if substring in self.genres[i_genre]
+        ]
+
+    def resolve(self, name: str) -> str:
+        """Genre best matching a user-typed name
+
+        Args:
+            name (str): Genre name, possibly misspelt
+
+        Raises:
+            KeyError: If no genre is close enough to the name
+
+        Returns:
+            str: Genre name as stored in the database
+        """
+        if name in self:
+            return name
+
+        best_matches = self.matches(name, n=1)
+        if not best_matches:
+            raise KeyError(name)
+
+        return best_matches[0][0]
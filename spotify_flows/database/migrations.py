@@ -0,0 +1,253 @@
+"""
+    This module holds the migrations bringing existing databases to the current
+    schema (data/db_schemas.yaml)
+"""
+
+# Standard library imports
+import logging
+import sqlite3
+from typing import List
+from typing import Callable
+from dataclasses import dataclass
+
+# Third party imports
+
+# Local imports
+
+# Main body
+logger = logging.getLogger()
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Change of the database schema, applied once. The version of a database is
+    the version of the last migration applied to it, stored as its user_version.
+
+    Args:
+        version (int): Version reached by the migration
+        description (str): Description of the migration
+        apply (Callable[[sqlite3.Cursor], None]): Statements of the migration
+    """
+
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+def table_exists(c: sqlite3.Cursor, table: str) -> bool:
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return c.fetchone() is not None
+
+
+def rebuild_table(c: sqlite3.Cursor, table: str, create: str, copy: str) -> None:
+    """Replace a table by a new definition, SQLite being unable to alter keys.
+    Indexes of the former table are dropped with it.
+
+    Args:
+        c (sqlite3.Cursor): Cursor of the writer connection
+        table (str): Table name
+        create (str): CREATE TABLE statement of the new table, named "{table}_new"
+        copy (str): SELECT statement reading the former table's rows into the new
+            one. Rows conflicting on the new keys are dropped.
+    """
+    c.execute(f"DROP TABLE IF EXISTS {table}_new")
+    c.execute(create)
+
+    if table_exists(c, table):
+        c.execute(f"INSERT OR IGNORE INTO {table}_new {copy}")
+        c.execute(f"DROP TABLE {table}")
+
+    c.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _add_keys_and_indexes(c: sqlite3.Cursor) -> None:
+    rebuild_table(
+        c,
+        "albums_artists",
+        create="""
+            CREATE TABLE albums_artists_new (
+                artist_id TEXT,
+                album_id TEXT,
+                op_index INTEGER,
+                PRIMARY KEY (album_id, artist_id)
+            ) WITHOUT ROWID
+        """,
+        copy="""
+            SELECT artist_id, album_id, op_index FROM albums_artists
+            WHERE artist_id IS NOT NULL AND album_id IS NOT NULL
+            ORDER BY rowid
+        """,
+    )
+    rebuild_table(
+        c,
+        "genres",
+        create="""
+            CREATE TABLE genres_new (
+                artist_id TEXT,
+                genre TEXT,
+                op_index INTEGER,
+                PRIMARY KEY (artist_id, genre)
+            ) WITHOUT ROWID
+        """,
+        copy="""
+            SELECT artist_id, genre, op_index FROM genres
+            WHERE artist_id IS NOT NULL AND genre IS NOT NULL
+            ORDER BY rowid
+        """,
+    )
+    rebuild_table(
+        c,
+        "related",
+        create="""
+            CREATE TABLE related_new (
+                artist_id TEXT,
+                related_artist_id TEXT,
+                PRIMARY KEY (artist_id, related_artist_id)
+            ) WITHOUT ROWID
+        """,
+        copy="""
+            SELECT artist_id, related_artist_id FROM related
+            WHERE artist_id IS NOT NULL AND related_artist_id IS NOT NULL
+        """,
+    )
+    # Collections were sets of tracks: they keep the order of their first insertion
+    rebuild_table(
+        c,
+        "collections",
+        create="""
+            CREATE TABLE collections_new (
+                id TEXT,
+                position INTEGER,
+                track_id TEXT,
+                PRIMARY KEY (id, position)
+            ) WITHOUT ROWID
+        """,
+        copy="""
+            SELECT
+                id,
+                ROW_NUMBER() OVER (PARTITION BY id ORDER BY MIN(rowid)) - 1,
+                track_id
+            FROM collections
+            WHERE id IS NOT NULL AND track_id IS NOT NULL
+            GROUP BY id, track_id
+        """,
+    )
+
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS albums_artists_artist_idx "
+        "ON albums_artists (artist_id)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS genres_genre_idx ON genres (genre, artist_id)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS related_related_artist_idx "
+        "ON related (related_artist_id)"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS collections_track_idx ON collections (track_id, id)"
+    )
+    if table_exists(c, "tracks"):
+        c.execute("CREATE INDEX IF NOT EXISTS tracks_album_idx ON tracks (album_id)")
+
+
+def _add_collection_versions(c: sqlite3.Cursor) -> None:
+    # Stored playlists become the version of their recorded snapshot
+    if table_exists(c, "playlist_snapshots"):
+        snapshot_id = """
+            COALESCE(
+                (
+                    SELECT snapshot_id FROM playlist_snapshots
+                    WHERE playlist_id = collections.id
+                ),
+                ''
+            )
+        """
+    else:
+        snapshot_id = "''"
+
+    rebuild_table(
+        c,
+        "collections",
+        create="""
+            CREATE TABLE collections_new (
+                id TEXT,
+                snapshot_id TEXT,
+                position INTEGER,
+                track_id TEXT,
+                PRIMARY KEY (id, snapshot_id, position)
+            ) WITHOUT ROWID
+        """,
+        copy=f"SELECT id, {snapshot_id}, position, track_id FROM collections",
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS collections_track_idx ON collections (track_id, id)"
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Keys of link tables, ordered collections, foreign key indexes",
+        apply=_add_keys_and_indexes,
+    ),
+    Migration(
+        version=2,
+        description="Versions of collections, keyed by snapshot ID",
+        apply=_add_collection_versions,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(conn: sqlite3.Connection, version: int) -> None:
+    # PRAGMA statements take no parameters
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def migrate(
+    db, target: int = LATEST_VERSION, on_applied: Callable[[int], None] = None
+) -> List[int]:
+    """Apply the migrations a database is missing. Each migration is applied in its
+    own transaction, along with the update of the database version, so a failing
+    migration leaves the database at the version of the previous one. Called within
+    a write session, the migrations join its transaction instead.
+
+    Args:
+        db (Database): Database to migrate
+        target (int, optional): Version to reach. Defaults to LATEST_VERSION.
+        on_applied (Callable[[int], None], optional): Called with the version of
+            each migration, within its transaction. Defaults to None.
+
+    Returns:
+        List[int]: Versions of the migrations applied
+    """
+    applied = []
+
+    for migration in MIGRATIONS:
+        with db.transaction() as conn:
+            if migration.version > target or schema_version(conn) >= migration.version:
+                continue
+
+            logger.info(
+                f"Migrating database to v{migration.version}: {migration.description}"
+            )
+            if not conn.in_transaction:
+                # Schema changes do not open transactions implicitly
+                conn.execute("BEGIN")
+
+            c = conn.cursor()
+            migration.apply(c)
+            c.close()
+            set_schema_version(conn, migration.version)
+            if on_applied is not None:
+                on_applied(migration.version)
+
+        applied.append(migration.version)
+
+    return applied
@@ -0,0 +1,215 @@
+"""
+    This module holds the export of the catalog to Parquet files, and their import.
+    It requires pyarrow, installed with the "parquet" extra.
+
+    Exported tables are directories of Parquet files (partitions of rows), e.g.
+    data/catalog/tracks/part-00000.parquet, which analyses can read column by column
+    through memory maps, without going through the live database or pandas.
+"""
+
+# Standard library imports
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict
+from typing import List
+from datetime import datetime, timezone
+
+# Third party imports
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Local imports
+from .migrations import schema_version
+
+# Main body
+logger = logging.getLogger()
+
+CATALOG_TABLES = [
+    "tracks",
+    "albums",
+    "artists",
+    "albums_artists",
+    "genres",
+    "audio_features",
+    "related",
+]
+
+ROWS_PER_FILE = 250000
+
+_ARROW_TYPES = {
+    "INTEGER": ("INTEGER", pa.int64()),
+    "REAL": ("REAL", pa.float64()),
+    "TEXT": ("TEXT", pa.string()),
+    "DATE": ("TEXT", pa.string()),
+}
+
+
+def _table_schema(conn, table: str) -> Dict[str, tuple]:
+    """SQLite cast and Arrow type of each column of a table, from its declaration"""
+    columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return {
+        name: _ARROW_TYPES.get(declared_type.upper(), ("TEXT", pa.string()))
+        for _, name, declared_type, *_ in columns
+    }
+
+
+def export_catalog(
+    db, directory: str, tables: List[str] = None, rows_per_file: int = ROWS_PER_FILE
+) -> Dict[str, int]:
+    """Snapshot catalog tables into Parquet files. Tables are read within a single
+    read transaction, so that they are consistent with each other.
+
+    Args:
+        db (SpotifyDatabase): Database to export
+        directory (str): Output directory, holding a directory per table. Tables
+            exported before are replaced.
+        tables (List[str], optional): Tables to export. Defaults to CATALOG_TABLES.
+        rows_per_file (int, optional): Rows per Parquet file. Defaults to
+            ROWS_PER_FILE.
+
+    Returns:
+        Dict[str, int]: Number of rows exported per table
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    tables = tables or CATALOG_TABLES
+
+    # Read connection, even within a write session: the snapshot is rolled back
+    with db.connect():
+        conn = db.connections.reader()
+
+    metadata = {
+        "spotify_flows.schema_version": str(schema_version(conn)),
+        "spotify_flows.exported_at": str(datetime.now(timezone.utc)),
+    }
+    n_rows = {}
+
+    conn.execute("BEGIN")
+    try:
+        for table in tables:
+            n_rows[table] = _export_table(
+                conn, table, directory / table, rows_per_file, metadata
+            )
+            logger.info(f"Exported {n_rows[table]} rows of {table}")
+
+    finally:
+        conn.rollback()
+
+    return n_rows
+
+
+def _export_table(
+    conn, table: str, path: Path, rows_per_file: int, metadata: Dict[str, str]
+) -> int:
+    columns = _table_schema(conn, table)
+    schema = pa.schema(
+        [(name, arrow_type) for name, (_, arrow_type) in columns.items()],
+        metadata=metadata,
+    )
+
+    # Written aside, then swapped with the previous export
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir()
+
+    c = conn.cursor()
+    c.execute(
+        "SELECT "
+        + ", ".join(f"CAST({name} AS {cast})" for name, (cast, _) in columns.items())
+        + f" FROM {table}"
+    )
+
+    n_rows, i_file = 0, 0
+    rows = c.fetchmany(rows_per_file)
+    while rows or i_file == 0:
+        arrays = [
+            pa.array(values, type=field_.type)
+            for values, field_ in zip(
+                zip(*rows) if rows else [[]] * len(schema), schema
+            )
+        ]
+        pq.write_table(
+            pa.Table.from_arrays(arrays, schema=schema),
+            tmp_path / f"part-{i_file:05d}.parquet",
+        )
+        n_rows += len(rows)
+        i_file += 1
+        rows = c.fetchmany(rows_per_file)
+
+    c.close()
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp_path.rename(path)
+    return n_rows
+
+
+def read_table(directory: str, table: str, columns: List[str] = None) -> pa.Table:
+    """Read an exported table, memory-mapping its files. Numeric columns convert to
+    numpy without copies, e.g. read_table(...).column("energy").to_numpy().
+
+    Args:
+        directory (str): Export directory
+        table (str): Table name
+        columns (List[str], optional): Columns to read. Defaults to None (all).
+
+    Returns:
+        pa.Table: Table
+    """
+    return pq.read_table(Path(directory) / table, columns=columns, memory_map=True)
+
+
+def import_catalog(
+    db, directory: str, tables: List[str] = None, batch_size: int = 50000
+) -> Dict[str, int]:
+    """Load exported tables into a database, in a single transaction. Rows already
+    in the database (same primary key) are kept as they are.
+
+    Args:
+        db (SpotifyDatabase): Database to load into, at the current schema
+        directory (str): Export directory
+        tables (List[str], optional): Tables to import. Defaults to the exported
+            tables among CATALOG_TABLES.
+        batch_size (int, optional): Rows inserted per statement. Defaults to 50000.
+
+    Returns:
+        Dict[str, int]: Number of rows read per table
+    """
+    directory = Path(directory)
+    tables = tables or [
+        table for table in CATALOG_TABLES if (directory / table).is_dir()
+    ]
+    n_rows = {}
+
+    with db.transaction() as conn:
+        for table in tables:
+            parquet_file_paths = sorted((directory / table).glob("*.parquet"))
+            table_columns = _table_schema(conn, table)
+            n_rows[table] = 0
+
+            for file_path in parquet_file_paths:
+                parquet_file = pq.ParquetFile(file_path, memory_map=True)
+                columns = [
+                    name
+                    for name in parquet_file.schema_arrow.names
+                    if name in table_columns
+                ]
+                statement = (
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['?'] * len(columns))})"
+                )
+
+                for batch in parquet_file.iter_batches(
+                    batch_size=batch_size, columns=columns
+                ):
+                    conn.executemany(
+                        statement,
+                        zip(*[column.to_pylist() for column in batch.columns]),
+                    )
+                    n_rows[table] += batch.num_rows
+
+            logger.info(f"Imported {n_rows[table]} rows of {table}")
+
+        db._record_operation(op_type="import_(parquet)")
+
+    return n_rows
@@ -2,17 +2,18 @@ from apscheduler.schedulers.background import BlockingScheduler
 
 from spotify_flows.database import SpotifyDatabase
 from spotify_flows.spotify.collections import TrackCollection
-from spotify_flows.scripts.todays_podcasts import todays_podcasts
+from spotify_flows.scripts.commands.todays_podcasts import todays_podcasts
 from spotify_flows.spotify.login import login
+from spotify_flows.spotify.throttle import background
+from spotify_flows.utils.profiling import profiled
 
 
 scheduler = BlockingScheduler()
 
 
 def random_playlist():
-    db = SpotifyDatabase("spotify_flows/data/spotify.db")
-    items = db.build_random_collection(N=20)
-    TrackCollection(_items=items, id_="x").to_playlist(
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    TrackCollection.from_query(random=True, limit=20, db=db).to_playlist(
         playlist_name="My random playlist"
     )
 
@@ -24,8 +25,8 @@ def refresh_token():
 
 
 job = scheduler.add_job(refresh_token, "interval", minutes=15)
-job = scheduler.add_job(todays_podcasts, "cron", hour=7)
-# job = scheduler.add_job(random_playlist, "cron", day_of_week="mon-fri", hour="8-18")
-job = scheduler.add_job(random_playlist, "interval", seconds=5)
+job = scheduler.add_job(background(profiled(todays_podcasts)), "cron", hour=7)
+# job = scheduler.add_job(background(profiled(random_playlist)), "cron", day_of_week="mon-fri", hour="8-18")
+job = scheduler.add_job(background(profiled(random_playlist)), "interval", seconds=5)
 
 scheduler.start()
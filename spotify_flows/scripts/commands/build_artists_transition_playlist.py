@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 import copy
 
+from spotify_flows.database import SpotifyDatabase
 from spotify_flows.spotify.collections import Artist, CollectionCollection
 from spotify_flows.spotify.data_structures import ArtistItem
 from spotify_flows.spotify.artists import read_artists_from_id, get_artist_id
@@ -41,7 +42,11 @@ def build_artists_transition_playlist(
         ),
     )
 
-    start = Artist.from_id(path[0]).popular().add_audio_features().random(1)
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+    top_tracks = Artist.top_tracks(artist_ids=path, db=db)
+
+    start = top_tracks[path[0]].random(1)
     target_audio = copy.copy(list(start.items)[0].audio_features)
 
     target_func = lambda x: (x.audio_features.energy - target_audio.energy) + (
@@ -54,13 +59,7 @@ def build_artists_transition_playlist(
     p = CollectionCollection(
         id_="collection",
         collections=[start]
-        + [
-            Artist.from_id(artist_id)
-            .popular()
-            .add_audio_features()
-            .optimize(target_func, N=1)
-            for artist_id in path
-        ],
+        + [top_tracks[artist_id].optimize(target_func, N=1) for artist_id in path],
     )
 
     p.to_playlist(out_playlist)
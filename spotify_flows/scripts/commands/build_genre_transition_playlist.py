@@ -1,13 +1,19 @@
 import pickle
+import logging
 import networkx as nx
-import sqlite3
-import pandas as pd
 import numpy as np
 
+from spotify_flows.database import SpotifyDatabase, load_genre_index
 from spotify_flows.spotify.collections import Artist, TrackCollection, Track
 
+N_CANDIDATE_ARTISTS = 5
 
-def build_genre_transition_playlist(from_: str, to_: str, out_playlist: str = None):
+logger = logging.getLogger()
+
+
+def build_genre_transition_playlist(
+    from_: str, to_: str, out_playlist: str = None, db_path: str = "data/spotify.db"
+):
 
     # 1. Unpickle the graph
     with open("data/genre_graph.p", "rb") as f:
@@ -16,46 +22,59 @@ def build_genre_transition_playlist(from_: str, to_: str, out_playlist: str = No
     # with open("data/artist_graph.p", "rb") as f:
     #     artist_graph = pickle.load(f)
 
-    # 2. Determine shortest path
+    # 2. Determine shortest path between the genres best matching the input names
+    db = SpotifyDatabase(db_path, op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    genre_index = load_genre_index(db, "data/genre_index.p")
+    from_ = genre_index.resolve(from_)
+    to_ = genre_index.resolve(to_)
+
     path = nx.shortest_path(genre_graph, source=from_, target=to_, weight="weight")
 
-    # 3. Build playlist
-    with sqlite3.connect("data/spotify.db") as conn:
-        df_genres = pd.read_sql("SELECT * FROM genres", con=conn)
-        df_artists = pd.read_sql("SELECT * FROM artists", con=conn)
+    # 3. Pick the most popular artist of each genre, avoiding repeats when possible
+    genre_artists = db.genre_top_artists(genres=path, k=N_CANDIDATE_ARTISTS)
+
+    path_artist_ids = []
+    for genre in path:
+        candidates = genre_artists.get(genre, [])
+        if not candidates:
+            logger.warning(f"No artist found for genre {genre}, skipping it")
+            continue
+
+        unused = [id_ for id_ in candidates if id_ not in path_artist_ids]
+        path_artist_ids.append((unused or candidates)[0])
+
+    # 4. Build playlist
+    top_tracks = Artist.top_tracks(artist_ids=path_artist_ids, db=db)
 
     playlist_tracks = []
     playlist_track_ids = []
     latest_track = None
 
-    for genre in path:
-        artist_id = (
-            df_genres.loc[df_genres["genre"] == genre]
-            .merge(df_artists, left_on="artist_id", right_on="id")
-            .sort_values("popularity", ascending=False)
-            .loc[:, "artist_id"]
-            .iloc[0]
-        )
-
-        popular_tracks = Artist.from_id(artist_id).popular().add_audio_features()
+    for artist_id in path_artist_ids:
+        all_tracks = list(top_tracks[artist_id].items)
+        if not all_tracks:
+            logger.warning(f"No top tracks found for artist {artist_id}, skipping it")
+            continue
 
         if latest_track is None:
-            latest_track = next(popular_tracks.items)
+            latest_track = all_tracks[0]
             energy_level = latest_track.audio_features.energy
 
         else:
-            all_tracks = list(popular_tracks.items)
-
             all_valid_tracks = [
                 track for track in all_tracks if track.id not in playlist_track_ids
             ]
+            if not all_valid_tracks:
+                continue
 
             all_energy_levels = np.array(
                 [track.audio_features.energy for track in all_valid_tracks]
             )
             energy_diffs = np.abs(all_energy_levels - energy_level)
             i_latest_track = np.where(energy_diffs == energy_diffs.min())[0][0]
-            latest_track = all_tracks[i_latest_track]
+            latest_track = all_valid_tracks[i_latest_track]
 
         if latest_track.id not in playlist_track_ids:
             playlist_tracks.append(latest_track)
@@ -1,28 +1,20 @@
-import pickle
-import difflib
+from spotify_flows.database import SpotifyDatabase, load_genre_index
 
 
 def list_genres(matches: str = None, contains: str = None):
 
-    # 1. Unpickle the graph
-    with open("data/genre_graph.p", "rb") as f:
-        genre_graph = pickle.load(f)
-
-    all_genres = list(genre_graph.nodes())
-
-    def similarity(a, b):
-        return difflib.SequenceMatcher(a=a, b=b).ratio()
+    # 1. Load the index
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    genre_index = load_genre_index(db, "data/genre_index.p")
 
     if matches:
-        genres_to_print = [
-            genre for genre in all_genres if similarity(genre, matches) > 0.5
-        ]
+        genres_to_print = [genre for genre, _ in genre_index.matches(matches, n=50)]
 
     elif contains:
-        genres_to_print = [genre for genre in all_genres if contains in genre]
+        genres_to_print = genre_index.contains(contains)
 
     else:
-        genres_to_print = all_genres
+        genres_to_print = genre_index.genres
 
     for node in genres_to_print:
         print(node)
@@ -1,14 +1,50 @@
 # Standard library imports
+from typing import Any
+from typing import Dict
+from typing import List
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 # Third party imports
 import yaml
 
 # Local imports
-from spotify_flows.spotify.collections import Show
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.collections import Show, TrackCollection
+from spotify_flows.spotify.podcasts import get_shows
 from spotify_flows.spotify.playlists import make_new_playlist, edit_playlist_details
+from spotify_flows.spotify.throttle import with_request_priority
 
 # Main body
+def shows_to_check(
+    shows: List[Dict[str, Any]], states: Dict[str, Dict[str, Any]], since: datetime
+) -> List[str]:
+    """Shows which may have episodes released since the given date. A show is skipped
+    when its episode count did not change since the last check and its latest known
+    episode is older than the date.
+
+    Args:
+        shows (List[Dict[str, Any]]): Show data, holding the total number of episodes
+        states (Dict[str, Dict[str, Any]]): State recorded at the last check, per show
+        since (datetime): Earliest release date of interest
+
+    Returns:
+        List[str]: IDs of the shows whose episodes must be fetched
+    """
+    show_ids = []
+    for show in shows:
+        state = states.get(show["id"])
+        if (
+            state is not None
+            and state["total_episodes"] == show["total_episodes"]
+            and (state["last_release_date"] or "") < str(since)
+        ):
+            continue
+        show_ids.append(show["id"])
+
+    return show_ids
+
+
 def todays_podcasts(playlist_name: str = None):
     if playlist_name is None:
         playlist_name = "Today's podcasts"
@@ -22,11 +58,55 @@ def todays_podcasts(playlist_name: str = None):
         minute=0, hour=0, second=0, microsecond=0
     ) - timedelta(days=1)
 
-    filter_ = lambda x: str(x.release_date) >= str(start_time)
+    # 3. Only look into shows which may have new episodes
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    shows = get_shows(show_ids=[item["id"] for item in data])
+    states = db.show_states(show_ids=[show["id"] for show in shows])
+    show_ids = shows_to_check(shows=shows, states=states, since=start_time)
+
+    # 4. Fetch the recent episodes of each show concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        episodes = dict(
+            zip(
+                show_ids,
+                executor.map(
+                    with_request_priority(
+                        lambda id_: list(
+                            Show.from_id(id_).released_since(start_time).items
+                        )
+                    ),
+                    show_ids,
+                ),
+            )
+        )
+
+    # 5. Record what was seen
+    new_states = {}
+    for show in shows:
+        if show["id"] not in episodes:
+            continue
+
+        state = states.get(show["id"], {})
+        show_episodes = episodes[show["id"]]
+        latest = max(show_episodes, key=lambda ep: ep.release_date, default=None)
+
+        new_states[show["id"]] = {
+            "total_episodes": show["total_episodes"],
+            "last_episode_id": latest.id if latest else state.get("last_episode_id"),
+            "last_release_date": str(latest.release_date)
+            if latest
+            else state.get("last_release_date"),
+        }
+
+    db.store_show_states(states=new_states)
 
     # Build up the collection of shows
-    collection = sum(
-        [Show.from_id(item["id"]).filter(criteria_func=filter_) for item in data]
+    collection = TrackCollection(
+        _items=[
+            episode for show_episodes in episodes.values() for episode in show_episodes
+        ]
     ).sort(by="duration_ms", ascending=True)
 
     # Add to playlist
@@ -1,6 +1,9 @@
+import os
 import argparse
 
 import spotify_flows.scripts.commands as commands
+from spotify_flows.utils import profiling
+from spotify_flows.spotify.resolution import resolution_cache, init_resolution_cache
 
 
 def main() -> int:
@@ -8,6 +11,10 @@ def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--out_playlist", action="store")
     parser.add_argument("--smooth_energy", action="store_true")
+    parser.add_argument("--db", action="store", default="data/spotify.db")
+    parser.add_argument("--refresh_names", action="store_true")
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile_json", action="store")
 
     subparsers = parser.add_subparsers(dest="action")
 
@@ -40,50 +47,69 @@ def main() -> int:
     args, _common_args = parser.parse_known_args()
     common_args = parser.parse_args(_common_args)
 
-    if args.action == "todays_podcasts":
-        p = commands.todays_podcasts(args.out_playlist)
-
-    elif args.action == "pomodoro":
-        p = commands.build_pomodoro_from_playlist(
-            in_playlist=args.in_playlist, out_playlist=common_args.out_playlist
-        )
-
-    if args.action == "related":
-        p = commands.build_related_artists_playlist(
-            artist_id=args.artist, out_playlist=common_args.out_playlist
-        )
-
-    if args.action == "artists":
-        p = commands.build_playlist_from_artists(
-            artist_names=args.artist_list, out_playlist=common_args.out_playlist
-        )
-
-    if args.action == "artist_transition":
-        p = commands.build_artists_transition_playlist(
-            start_artist_name=args.from_,
-            end_artist_name=args.to_,
-            out_playlist=common_args.out_playlist,
-        )
-
-    if args.action == "smoothen":
-        p = commands.smoothen_playlist(
-            playlist_name=args.in_playlist,
-            feature=args.feature,
-            out_playlist=common_args.out_playlist,
-        )
-
-    if args.action == "genre_transition":
-        p = commands.build_genre_transition_playlist(
-            from_=args.from_, to_=args.to_, out_playlist=common_args.out_playlist
-        )
-
-    if args.action == "genres":
-        commands.list_genres(matches=args.matches, contains=args.contains)
-
-    if args.smooth_energy:
-        p.sort(by="audio_features.energy", ascending=True).to_playlist(
-            common_args.out_playlist
-        )
+    # Name -> ID resolutions are cached in the local database
+    if os.path.exists(args.db):
+        init_resolution_cache(args.db)
+
+        if args.refresh_names:
+            resolution_cache.invalidate()
+
+    with profiling.profile(f"cli_{args.action}") as profile_:
+        if args.action == "todays_podcasts":
+            p = commands.todays_podcasts(args.out_playlist)
+
+        elif args.action == "pomodoro":
+            p = commands.build_pomodoro_from_playlist(
+                in_playlist=args.in_playlist, out_playlist=common_args.out_playlist
+            )
+
+        if args.action == "related":
+            p = commands.build_related_artists_playlist(
+                artist_id=args.artist, out_playlist=common_args.out_playlist
+            )
+
+        if args.action == "artists":
+            p = commands.build_playlist_from_artists(
+                artist_names=args.artist_list, out_playlist=common_args.out_playlist
+            )
+
+        if args.action == "artist_transition":
+            p = commands.build_artists_transition_playlist(
+                start_artist_name=args.from_,
+                end_artist_name=args.to_,
+                out_playlist=common_args.out_playlist,
+            )
+
+        if args.action == "smoothen":
+            p = commands.smoothen_playlist(
+                playlist_name=args.in_playlist,
+                feature=args.feature,
+                out_playlist=common_args.out_playlist,
+            )
+
+        if args.action == "genre_transition":
+            p = commands.build_genre_transition_playlist(
+                from_=args.from_,
+                to_=args.to_,
+                out_playlist=common_args.out_playlist,
+                db_path=args.db,
+            )
+
+        if args.action == "genres":
+            commands.list_genres(matches=args.matches, contains=args.contains)
+
+        if args.smooth_energy:
+            p.sort(by="audio_features.energy", ascending=True).to_playlist(
+                common_args.out_playlist
+            )
+
+    # Options after the action are only parsed into common_args
+    if args.profile or common_args.profile:
+        print(profile_.report())
+
+    profile_json = args.profile_json or common_args.profile_json
+    if profile_json:
+        profile_.export_json(profile_json)
 
     return 0
 
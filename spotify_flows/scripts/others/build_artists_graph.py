@@ -1,11 +1,8 @@
 # Standard library imports
-import sqlite3
 import pickle
 
 # Third party imports
-import pandas as pd
 import networkx as nx
-from tqdm import tqdm
 
 # Local imports
 from spotify_flows.database import SpotifyDatabase
@@ -13,60 +10,53 @@ from spotify_flows.database import SpotifyDatabase
 # Main body
 
 
-def main():
-    db = SpotifyDatabase("data/spotify.db", op_table="operations")
-    df_related, df_genres, df_artists = db.table_contents(
-        ["related", "genres", "artists"]
-    )
-
-    G = nx.Graph()
+def pop_diff(popularity_1: int, popularity_2: int) -> float:
+    if popularity_1 is None or popularity_2 is None:
+        return float("nan")
+    return abs(popularity_1 - popularity_2)
 
-    # Build dataframe to build the nodes
-    # artist_id, related_id, genres, popularity
-    df_packed_genres = (
-        df_genres.groupby("artist_id")
-        .apply(lambda df: df["genre"].unique().tolist())
-        .reset_index()
-        .rename(columns={0: "genre"})
-    )
 
-    df_nodes = df_artists.merge(
-        df_packed_genres, left_on="id", right_on="artist_id"
-    ).loc[:, ["id", "genre", "popularity"]]
+def build_artist_graph(db: SpotifyDatabase) -> nx.Graph:
+    # Rows are streamed: only the graph and the popularity of artists are held
+    popularity = dict(db.iter_rows("artists", columns=["id", "popularity"]))
 
-    node_data = [(d.pop("id"), d) for d in df_nodes.to_dict("records")]
+    genres = {}
+    for artist_id, genre in db.iter_rows("genres", columns=["artist_id", "genre"]):
+        genres.setdefault(artist_id, []).append(genre)
 
-    G.add_nodes_from(node_data)
+    G = nx.Graph()
 
-    # Build dataframe to build the edges
-    # artist_id, relative_artist_id, pop_diff
-    df_edges = (
-        df_related.merge(
-            df_artists[["id", "popularity"]],
-            left_on="artist_id",
-            right_on="id",
-            how="inner",
+    # Nodes: artist_id, genres, popularity
+    G.add_nodes_from(
+        (artist_id, {"genre": artist_genres, "popularity": popularity[artist_id]})
+        for artist_id, artist_genres in genres.items()
+        if artist_id in popularity
+    )
+    del genres
+
+    # Edges: artist_id, related_artist_id, pop_diff
+    G.add_edges_from(
+        (
+            artist_id,
+            related_artist_id,
+            {
+                "pop_diff": pop_diff(
+                    popularity[artist_id], popularity[related_artist_id]
+                )
+            },
         )
-        .merge(
-            df_artists[["id", "popularity"]],
-            left_on="related_artist_id",
-            right_on="id",
-            how="inner",
+        for artist_id, related_artist_id in db.iter_rows(
+            "related", columns=["artist_id", "related_artist_id"]
         )
-        .loc[:, ["artist_id", "related_artist_id", "popularity_x", "popularity_y"]]
+        if artist_id in popularity and related_artist_id in popularity
     )
 
-    df_edges.loc[:, "pop_diff"] = (
-        df_edges["popularity_x"] - df_edges["popularity_y"]
-    ).abs()
-    df_edges.drop(columns=["popularity_x", "popularity_y"], inplace=True)
+    return G
 
-    edge_data = [
-        (d.pop("artist_id"), d.pop("related_artist_id"), d)
-        for d in df_edges.to_dict("records")
-    ]
 
-    G.add_edges_from(edge_data)
+def main():
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    G = build_artist_graph(db)
 
     with open("data/artist_graph.p", "wb") as f:
         pickle.dump(G, f)
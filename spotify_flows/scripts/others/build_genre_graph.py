@@ -1,69 +1,41 @@
-import sqlite3
-import pandas as pd
-import networkx as nx
 import pickle
-from spotify_flows.database import SpotifyDatabase
-
-
-def main():
+import itertools
+from collections import Counter
 
-    db = SpotifyDatabase("data/spotify.db", op_table="operations")
-    df_genres = db.table_contents("genres")
-
-    df_pairs = df_genres.drop(columns=["op_index"]).merge(df_genres, on="artist_id")
-    df_pairs = df_pairs[df_pairs["genre_x"] != df_pairs["genre_y"]]
+import networkx as nx
+from spotify_flows.database import SpotifyDatabase
 
-    df_pairs.loc[:, "letters"] = df_pairs["genre_x"] + df_pairs["genre_y"]
-    df_pairs["letters"] = df_pairs["letters"].apply(lambda x: "".join(sorted(x)))
 
-    df_letter_map = (
-        df_pairs.groupby("letters").first().reset_index().drop(columns=["artist_id"])
+def build_genre_graph(db: SpotifyDatabase, verbose: bool = False) -> nx.Graph:
+    # Genres are streamed in artist order (the table's key), one artist at a time
+    genre_counts = Counter()
+    common_counts = Counter()
+    rows = db.iter_rows(
+        "genres", columns=["artist_id", "genre"], order_by=["artist_id"]
     )
 
-    # Count of common artists
-    df_all_counts = (
-        df_pairs[["letters", "artist_id"]]
-        .groupby("letters")
-        .count()
-        .reset_index()
-        .rename(columns={"artist_id": "common_count"})
-    )
-    df_all_counts = df_all_counts.groupby("letters").first().reset_index()
-    df_all_counts = df_all_counts.merge(df_letter_map, on="letters")
+    for _, artist_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        artist_genres = sorted({genre for _, genre in artist_rows})
+        genre_counts.update(artist_genres)
+        common_counts.update(itertools.combinations(artist_genres, 2))
 
-    # Count of totals
-    df_genre_counts = (
-        df_genres.groupby("genre")
-        .count()
-        .reset_index()
-        .rename(columns={"artist_id": "count"})
-    )
+    G = nx.Graph()
 
-    # Merge
-    df_all_counts = (
-        df_all_counts.merge(df_genre_counts, left_on="genre_x", right_on="genre")
-        .drop(columns=["genre"])
-        .rename(columns={"count": "count_x"})
-        .merge(df_genre_counts, left_on="genre_y", right_on="genre")
-        .drop(columns=["genre"])
-        .rename(columns={"count": "count_y"})
-    )
+    for (genre_1, genre_2), common_count in common_counts.items():
+        # Same weights as when common artists were counted per ordered pair
+        weight = (genre_counts[genre_1] + genre_counts[genre_2]) / (2 * common_count)
 
-    # Compute total
-    df_all_counts.loc[:, "total_count"] = (
-        df_all_counts["count_x"] + df_all_counts["count_y"]
-    )
+        G.add_edge(genre_1, genre_2, weight=weight)
+        if verbose:
+            print(f"Added edge: {genre_1} to {genre_2} (weight={weight:.2f})")
 
-    G = nx.Graph()
+    return G
 
-    for row in df_all_counts.iterrows():
-        if row[1]["common_count"] > 0:
-            genre_1 = row[1]["genre_x"]
-            genre_2 = row[1]["genre_y"]
-            weight = row[1]["total_count"] / row[1]["common_count"]
 
-            G.add_edge(genre_1, genre_2, weight=weight)
-            print(f"Added edge: {genre_1} to {genre_2} (weight={weight:.2f})")
+def main():
+
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    G = build_genre_graph(db, verbose=True)
 
     # Pickle the graph
     with open("data/genre_graph.p", "wb") as f:
@@ -0,0 +1,12 @@
+from spotify_flows.database import GenreIndex, SpotifyDatabase
+
+
+def main():
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    genre_index = GenreIndex.from_database(db)
+    genre_index.save("data/genre_index.p")
+    print(f"Indexed {len(genre_index)} genres")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
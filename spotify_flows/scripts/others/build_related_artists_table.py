@@ -1,41 +1,37 @@
-import sqlite3
 import pandas as pd
 from tqdm import tqdm
-import copy
 
 from spotify_flows.analysis.graphs import graph_recursion
 from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.throttle import background
 
 
+@background
 def main():
     db = SpotifyDatabase("data/spotify.db", op_table="operations")
-    df_related, df_artists = db.table_contents(["related", "artists"])
-
-    # Artists to load
-    all_artist_ids = (
-        df_artists.loc[~df_artists["id"].isin(df_related["artist_id"]), "id"]
-        .unique()
-        .tolist()
-    )
 
     # Load memo
-    if len(df_related) > 0:
-        memo = (
-            df_related.groupby("artist_id")
-            .apply(lambda x: x["related_artist_id"].unique().tolist())
-            .to_dict()
-        )
-    else:
-        memo = {}
+    memo = {}
+    for artist_id, related_artist_id in db.iter_rows(
+        "related", columns=["artist_id", "related_artist_id"]
+    ):
+        memo.setdefault(artist_id, []).append(related_artist_id)
+
+    # Artists to load
+    all_artist_ids = [
+        artist_id
+        for (artist_id,) in db.iter_rows("artists", columns=["id"])
+        if artist_id not in memo
+    ]
 
     # Build inks
     for artist_id in tqdm(all_artist_ids):
         if artist_id not in memo:
-            old_memo = copy.deepcopy(memo)
+            old_keys = set(memo)
             graph_recursion(artist_id, memo)
 
             # Write to database
-            memo_to_write = {k: v for k, v in memo.items() if k not in old_memo}
+            memo_to_write = {k: v for k, v in memo.items() if k not in old_keys}
 
             if memo_to_write:
                 print(f"Writing {len(memo_to_write)} rows to database")
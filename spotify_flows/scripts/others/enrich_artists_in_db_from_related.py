@@ -1,5 +1,4 @@
 # Standard library imports
-import sqlite3
 from dataclasses import asdict
 
 # Third party imports
@@ -13,14 +12,16 @@ from spotify_flows.database import SpotifyDatabase
 
 def main():
     db = SpotifyDatabase("data/spotify.db", op_table="operations")
-    df_related, df_artists = db.table_contents(["related", "artists"])
+    enriched_artist_ids = {
+        artist_id for (artist_id,) in db.iter_rows("artists", columns=["id"])
+    }
 
-    df_related = df_related.drop_duplicates()
-    enriched_artist_ids = df_artists.loc[:, "id"].unique().tolist()
+    all_artist_ids = set()
+    for artist_id, related_artist_id in db.iter_rows(
+        "related", columns=["artist_id", "related_artist_id"]
+    ):
+        all_artist_ids.update((artist_id, related_artist_id))
 
-    all_artist_ids = set(
-        df_related["artist_id"].tolist() + df_related["related_artist_id"].tolist()
-    )
     artists_to_enrich = [id for id in all_artist_ids if id not in enriched_artist_ids]
     remaining_artists = artists_to_enrich
 
@@ -1,4 +1,3 @@
-import sqlite3
 import pandas as pd
 from spotify_flows.spotify.artists import read_artists_from_id
 from spotify_flows.database import SpotifyDatabase
@@ -6,12 +5,14 @@ from spotify_flows.database import SpotifyDatabase
 
 def main():
     db = SpotifyDatabase("data/spotify.db", op_table="operations")
-    df_genres, df_artists = db.table_contents(["genres", "artists"])
-
-    enriched_artist_ids = df_genres.loc[:, "artist_id"].tolist()
-    all_artist_ids = df_artists.loc[:, "id"].tolist()
-
-    artists_to_enrich = [id for id in all_artist_ids if id not in enriched_artist_ids]
+    enriched_artist_ids = {
+        artist_id for (artist_id,) in db.iter_rows("genres", columns=["artist_id"])
+    }
+    artists_to_enrich = [
+        artist_id
+        for (artist_id,) in db.iter_rows("artists", columns=["id"])
+        if artist_id not in enriched_artist_ids
+    ]
     remaining_artists = artists_to_enrich
 
     while remaining_artists:
@@ -28,6 +29,8 @@ def main():
         db.enrich_database_table(df_data=df_data, table="genres")
         remaining_artists = remaining_artists[n:]
 
+    db.refresh_genre_top_artists()
+
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,32 @@
+# Standard library imports
+import argparse
+
+# Third party imports
+
+# Local imports
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.database.parquet import export_catalog, import_catalog
+
+# Main body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="data/catalog")
+    parser.add_argument("--import", dest="import_", action="store_true")
+    args = parser.parse_args()
+
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    if args.import_:
+        n_rows = import_catalog(db, args.directory)
+    else:
+        n_rows = export_catalog(db, args.directory)
+
+    for table, n in n_rows.items():
+        print(f"{table}: {n} rows")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
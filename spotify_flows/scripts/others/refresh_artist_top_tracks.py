@@ -0,0 +1,50 @@
+# Standard library imports
+from datetime import datetime, timedelta, timezone
+
+# Third party imports
+from tqdm import tqdm
+
+# Local imports
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.artists import get_artists_top_tracks
+from spotify_flows.spotify.data_structures import TrackItem
+from spotify_flows.spotify.throttle import background
+
+# Main body
+BATCH_SIZE = 50
+MAX_AGE_DAYS = 7
+
+
+@background
+def main():
+    db = SpotifyDatabase("data/spotify.db", op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    # Artists never refreshed, or refreshed too long ago
+    cutoff = str(datetime.now(timezone.utc) - timedelta(days=MAX_AGE_DAYS))
+    df_stale = db.select(
+        """
+        SELECT artists.id FROM artists
+        LEFT JOIN (
+            SELECT artist_id, MAX(refreshed_at) AS refreshed_at
+            FROM artist_top_tracks GROUP BY artist_id
+        ) AS refreshed ON refreshed.artist_id = artists.id
+        WHERE refreshed.refreshed_at IS NULL OR refreshed.refreshed_at < ?
+        """,
+        params=[cutoff],
+    )
+    artist_ids = df_stale["id"].unique().tolist()
+
+    for i_batch in tqdm(range(0, len(artist_ids), BATCH_SIZE)):
+        batch = artist_ids[i_batch : i_batch + BATCH_SIZE]
+        top_tracks = {
+            artist_id: [TrackItem.from_dict(track) for track in tracks_data]
+            for artist_id, tracks_data in get_artists_top_tracks(
+                artist_ids=batch
+            ).items()
+        }
+        db.store_artist_top_tracks(top_tracks=top_tracks)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,11 +13,27 @@ from typing import Any
 import spotify_flows.spotify.tracks as tracks
 from .login import login_if_missing
 from .classes import ExtendedSpotify
+from .resolution import resolution_cache
 from .data_structures import TrackItem
 from .data_structures import AlbumItem
 
 
 # Main body
+@login_if_missing(scope=None)
+def search_albums(sp: ExtendedSpotify, *, album_name: str) -> List[Dict[str, Any]]:
+    """Search albums matching the name
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        album_name (str): Name of album
+
+    Returns:
+        List[Dict[str, Any]]: Candidates (id, name), in search relevance order
+    """
+    results = sp.search(album_name, type="album", limit=10).get("albums").get("items")
+    return [{"id": res["id"], "name": res["name"]} for res in results]
+
+
 @login_if_missing(scope=None)
 def get_album_id(sp: ExtendedSpotify, *, album_name: str) -> str:
     """Get ID of album that matches the name
@@ -29,8 +45,11 @@ def get_album_id(sp: ExtendedSpotify, *, album_name: str) -> str:
     Returns:
         str: ID of album
     """
-    results = sp.search(album_name, type="album", limit=10).get("albums").get("items")
-    return results[0].get("id")
+    return resolution_cache.resolve(
+        kind="album",
+        query=album_name,
+        search_func=lambda query: search_albums(sp=sp, album_name=query),
+    )
 
 
 @login_if_missing(scope=None)
@@ -64,3 +83,22 @@ def get_album_info(sp: ExtendedSpotify, *, album_id: str) -> Dict[str, Any]:
         Dict[str, Any]: Album information
     """
     return sp.albums([album_id]).get("albums")[0]
+
+
+@login_if_missing(scope=None)
+def get_albums_info(
+    sp: ExtendedSpotify, *, album_ids: List[str]
+) -> List[Dict[str, Any]]:
+    """Get the information of several albums from the Spotify API, 20 per request
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        album_ids (List[str]): Album IDs
+
+    Returns:
+        List[Dict[str, Any]]: Album information, in the order of the IDs
+    """
+    album_data = []
+    for i in range(0, len(album_ids), 20):
+        album_data += sp.albums(album_ids[i : i + 20]).get("albums")
+    return album_data
@@ -3,6 +3,8 @@
 """
 
 # Standard library imports
+from typing import Any
+from typing import Dict
 from typing import List
 
 # Third party imports
@@ -14,24 +16,46 @@ from .data_structures import AlbumItem
 from .data_structures import ArtistItem
 from .login import login, login_if_missing
 from .classes import ExtendedSpotify
+from .resolution import resolution_cache
 
 # Main body
 @login_if_missing(scope=None)
-def get_artist_id(sp: ExtendedSpotify, *, artist_name: str) -> str:
-    """Get ID of artist that matches the name provided
+def search_artists(sp: ExtendedSpotify, *, artist_name: str) -> List[Dict[str, Any]]:
+    """Search artists matching the name provided
 
     Args:
         sp (ExtendedSpotify): Spotify object
         artist_name (str): Artist name
 
     Returns:
-        str: Best matching artist ID
+        List[Dict[str, Any]]: Candidates (id, name, popularity), most popular first
     """
     results = (
         sp.search(artist_name, type="artist", limit=10).get("artists").get("items")
     )
     sorted_results = sorted(results, key=lambda x: x["popularity"], reverse=True)
-    return sorted_results[0].get("id")
+    return [
+        {"id": res["id"], "name": res["name"], "popularity": res["popularity"]}
+        for res in sorted_results
+    ]
+
+
+@login_if_missing(scope=None)
+def get_artist_id(sp: ExtendedSpotify, *, artist_name: str) -> str:
+    """Get ID of artist that matches the name provided
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        artist_name (str): Artist name
+
+    Returns:
+        str: Best matching artist ID
+    """
+    return resolution_cache.resolve(
+        kind="artist",
+        query=artist_name,
+        search_func=lambda query: search_artists(sp=sp, artist_name=query),
+    )
 
 
 @login_if_missing(scope=None)
@@ -49,7 +73,43 @@ def get_artist_popular_songs(sp: ExtendedSpotify, *, artist_id: str) -> List[Tra
     track_ids = [track["id"] for track in tracks_data]
 
     for track_id in track_ids:
-        yield tracks.read_track_from_id(track_id=track_id)
+        yield tracks.read_track_from_id(sp=sp, track_id=track_id)
+
+
+@login_if_missing(scope=None)
+def get_artists_top_tracks(
+    sp: ExtendedSpotify, *, artist_ids: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Get the popular songs of several artists, enriched with their audio features.
+    Unlike get_artist_popular_songs, the track data returned by the top tracks endpoint
+    is used as is, and the audio features are retrieved in batches.
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        artist_ids (List[str]): Artist IDs
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Popular track data per artist ID
+    """
+    top_tracks = {
+        artist_id: sp.artist_top_tracks(artist_id=artist_id).get("tracks")
+        for artist_id in artist_ids
+    }
+
+    track_ids = list(
+        {
+            track["id"]: None
+            for tracks_data in top_tracks.values()
+            for track in tracks_data
+        }
+    )
+    audio_features = tracks.get_audio_features(sp=sp, track_ids=track_ids)
+
+    for tracks_data in top_tracks.values():
+        for track in tracks_data:
+            track["audio_features"] = audio_features.get(track["id"]) or {}
+
+    return top_tracks
 
 
 @login_if_missing(scope=None)
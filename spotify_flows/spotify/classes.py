@@ -3,14 +3,59 @@
 """
 
 # Standard library imports
+import time
 
 # Third party imports
+import requests
 from spotipy import Spotify
 
 # Local imports
+from .throttle import RequestScheduler, endpoint_class, request_scheduler
+from spotify_flows.utils import profiling
 
 # Main body
 class ExtendedSpotify(Spotify):
+    """Spotify client whose requests go through a RequestScheduler, which paces them
+    and retries them. The retries of spotipy's session are disabled, as they would
+    hide 429 responses and their Retry-After header from the scheduler.
+
+    Args:
+        scheduler (RequestScheduler, optional): Scheduler of the requests. Defaults
+            to the scheduler shared by all clients.
+    """
+
+    def __init__(self, *args, scheduler: RequestScheduler = None, **kwargs):
+        self.scheduler = scheduler if scheduler is not None else request_scheduler
+        super().__init__(*args, **kwargs)
+
+    def _build_session(self):
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.hooks["response"].append(self._record_response)
+
+    @staticmethod
+    def _record_response(response, *args, **kwargs):
+        # Bodies are read here rather than by spotipy, to time their transfer too
+        start = time.perf_counter()
+        n_bytes = len(response.content)
+        profiling.record_request(
+            endpoint=endpoint_class(response.url),
+            seconds=response.elapsed.total_seconds() + time.perf_counter() - start,
+            n_bytes=n_bytes,
+            error=response.status_code >= 400,
+        )
+
+    def _internal_call(self, method, url, payload, params):
+        # The parent call alters its params, which are copied for retries
+        return self.scheduler.call(
+            endpoint_class(url),
+            lambda: super(ExtendedSpotify, self)._internal_call(
+                method, url, payload, dict(params)
+            ),
+        )
+
     def playlist_add_items(self, playlist_id, items, item_type="track", position=None):
         plid = self._get_id("playlist", playlist_id)
         ftracks = [self._get_uri(item_type, tid) for tid in items]
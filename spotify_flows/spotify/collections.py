@@ -4,15 +4,17 @@
 
 # Standard library imports
 import copy
-import random
-import inspect
+import math
 import logging
 import itertools
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Union
 from typing import Tuple
 from typing import Callable
+from typing import Iterable
+from datetime import datetime
 from dataclasses import dataclass, field, asdict
 
 # Third party imports
@@ -22,8 +24,10 @@ import networkx as nx
 
 # Local imports
 import spotify_flows.database as database
+from spotify_flows.database.database import TRACK_QUERY_COLUMNS
+from spotify_flows.utils import profiling
 
-from .login import login
+from .login import LazyLogin
 from .data_structures import (
     EpisodeItem,
     SpotifyDataStructure,
@@ -32,27 +36,56 @@ from .data_structures import (
 )
 
 from .tracks import get_track_id, read_track_from_id
+from .tracks import read_tracks_from_ids
 from .tracks import get_audio_features
 from .albums import get_album_id
 from .albums import get_album_songs
 from .podcasts import get_show_id
 from .podcasts import get_show_episodes
 from .user import get_all_saved_tracks
+from .user import get_saved_tracks_since
 from .user import get_recommendations_for_genre
 
 from .artists import get_artist_id
 from .artists import get_artist_albums
+from .artists import get_artists_top_tracks
 from .artists import get_related_artists
 from .artists import get_artist_popular_songs
 
 from .playlists import get_playlist_id
 from .playlists import make_new_playlist
 from .playlists import get_playlist_tracks
+from .playlists import get_playlist_track_ids
+from .playlists import get_playlist_track_listing
+from .playlists import get_playlist_snapshot_id
+from .resolution import resolution_cache
+from .item_cache import ItemCache
+from .item_cache import spill_settings
+from .plan import (
+    AUDIO_FEATURES_BATCH_SIZE,
+    HYDRATION_CALLS_PER_TRACK,
+    CostModel,
+    Operation,
+    First,
+    Random,
+    Shuffle,
+    Sort,
+    Filter,
+    optimize,
+    split_pushable,
+    apply_operations,
+)
+from .plan import explain as explain_plan
+from .sort_keys import SortKey
+from .predicates import Predicate, as_predicate
 
 
 # Main body
 logger = logging.getLogger()
 
+INGEST_BATCH_SIZE = 500
+"""Tracks read from the API are stored in the database by batches of this size"""
+
 
 class DatabaseNotLoaded(Exception):
     pass
@@ -65,7 +98,7 @@ class TrackCollection:
 
     read_items_from_db = lambda id_, db: db.build_collection_from_collection_id(id_=id_)
 
-    sp = login(
+    sp = LazyLogin(
         scope="playlist-modify-private playlist-modify-public user-read-playback-position user-library-read"
     )
 
@@ -73,6 +106,13 @@ class TrackCollection:
     info: SpotifyDataStructure = None
     _items: List[Any] = field(default_factory=list)
     _audio_features_enriched: bool = False
+    _cache: ItemCache = field(default=None, repr=False, compare=False)
+    _listing: ItemCache = field(default=None, repr=False, compare=False)
+    _hydrated: Dict[str, TrackItem] = field(default=None, repr=False, compare=False)
+    _source: "TrackCollection" = field(default=None, repr=False, compare=False)
+    _operations: Tuple[Operation, ...] = field(default=(), repr=False, compare=False)
+
+    cost_model = CostModel()
 
     def copy(self):
         return copy.copy(self)
@@ -93,13 +133,157 @@ class TrackCollection:
 
     @property
     def items(self):
-        if self._items:
-            yield from self._items
+        """Items of the collection. They are computed at most once, on first use, and
+        memoized so that the collection can be iterated again, and shared between
+        the collections built from it."""
+        if self._cache is None:
+            profiling.record_cache("collection_items", misses=1)
+            self._cache = ItemCache(self._item_source())
         else:
-            if self.id_:
-                yield from self.item_gen()
-            else:
-                yield from iter(())
+            profiling.record_cache("collection_items", hits=1)
+        yield from self._cache
+
+    def _item_source(self):
+        if self._source is not None:
+            return self._execute_plan()
+        elif isinstance(self._items, (list, tuple)) and self._items:
+            return self._items
+        elif self._items:
+            return iter(self._items)
+        elif self.id_:
+            return self.item_gen()
+        else:
+            return iter(())
+
+    def _listing_gen(self):
+        """Tracks of the collection holding LISTING_FIELDS only, listed cheaply before
+        hydration, or None if the collection cannot be listed"""
+        return None
+
+    def _hydrate(self, listed_items):
+        """Fetch the listed tracks in full"""
+        return listed_items
+
+    def _listed_items(self):
+        """Listing of the collection, memoized like its items so that the plans over
+        the collection list it once, or None if the collection cannot be listed"""
+        if self._listing is None:
+            listed_items = self._listing_gen()
+            if listed_items is None:
+                return None
+
+            profiling.record_cache("collection_listing", misses=1)
+            self._listing = ItemCache(listed_items)
+        else:
+            profiling.record_cache("collection_listing", hits=1)
+        return iter(self._listing)
+
+    def _hydrated_items(self, listed_items):
+        """Listed tracks fetched in full, each at most once across the plans over the
+        collection"""
+        if self._hydrated is None:
+            self._hydrated = {}
+
+        for item in listed_items:
+            if item.id not in self._hydrated:
+                self._hydrated[item.id] = next(iter(self._hydrate([item])))
+            yield self._hydrated[item.id]
+
+    def _db_track_ids(self):
+        """IDs of the tracks of the collection when it is served by the database, or
+        None"""
+        if self._items or not self.id_ or not self.exist_in_db:
+            return None
+
+        return CollectionDatabase().collection_track_ids(id_=self.id_)
+
+    def _then(self, operation: Operation) -> "TrackCollection":
+        """Collection resulting from an operation. The operation is recorded in a lazy
+        plan over the source collection, only optimized and run once items are
+        needed.
+
+        Args:
+            operation (Operation): Operation applied to the items
+
+        Returns:
+            TrackCollection: Resulting collection
+        """
+        if self._source is not None and self._cache is None:
+            source, operations = self._source, self._operations + (operation,)
+        else:
+            source, operations = self, (operation,)
+
+        return TrackCollection(
+            _source=source,
+            _operations=operations,
+            _audio_features_enriched=self._audio_features_enriched,
+        )
+
+    def _execute_plan(self):
+        source = self._source
+        operations = optimize(self._operations)
+        enrich = (
+            None
+            if source._audio_features_enriched
+            else self._enrich_missing_audio_features
+        )
+
+        # Leading filters run as a SQL query when the source is served by the database
+        if operations and isinstance(operations[0], Filter) and source._cache is None:
+            sql = operations[0].predicate.to_sql(TRACK_QUERY_COLUMNS)
+            track_ids = source._db_track_ids() if sql is not None else None
+
+            if track_ids is not None:
+                logger.info(f"Running {operations[0]} in the database")
+                db = CollectionDatabase()
+                items = db.build_collection_from_track_ids(
+                    track_ids=db.filter_track_ids(track_ids, *sql)
+                )
+                return iter(apply_operations(operations[1:], items, enrich=enrich))
+
+        # Operations on listing fields run before hydration, if the source was not
+        # already read. The listing and hydrated tracks are shared between the plans
+        # over the source.
+        pushed, remaining = split_pushable(operations)
+        listed_items = (
+            source._listed_items() if pushed and source._cache is None else None
+        )
+
+        if listed_items is not None:
+            logger.info(f"Running {', '.join(map(str, pushed))} before hydration")
+            items = source._hydrated_items(apply_operations(pushed, listed_items))
+            return iter(apply_operations(remaining, items, enrich=enrich))
+
+        return iter(apply_operations(operations, source.items, enrich=enrich))
+
+    def explain(self, size: int = None) -> str:
+        """Describe how the collection's items would be computed, with the estimated
+        number of API calls
+
+        Args:
+            size (int, optional): Number of tracks of the source collection, if known.
+                Defaults to None.
+
+        Returns:
+            str: Plan description
+        """
+        source = self._source if self._source is not None else self
+        cost_model = source.cost_model if source._cache is None else CostModel()
+
+        if size is None and source._cache is not None and source._cache.is_exhausted:
+            size = len(source._cache)
+        elif (
+            size is None and isinstance(source._items, (list, tuple)) and source._items
+        ):
+            size = len(source._items)
+
+        return explain_plan(
+            source_name=f"{type(source).__name__} {source.id_}".strip(),
+            operations=list(self._operations),
+            cost_model=cost_model,
+            size=size,
+            enriched=source._audio_features_enriched,
+        )
 
     def item_gen(self):
         db = CollectionDatabase()
@@ -109,11 +293,26 @@ class TrackCollection:
 
         else:
             logger.info(f"Retrieving items via API")
-            for track_dict in self._api_track_gen:
-                track = TrackItem.from_dict(track_dict)
-                if db.is_loaded():
-                    db.add_track(track_item=track)
-                yield track
+            batch = []
+            try:
+                for track_dict in self._api_track_gen:
+                    # Artists yield the items of their albums
+                    track = (
+                        track_dict
+                        if isinstance(track_dict, TrackItem)
+                        else TrackItem.from_dict(track_dict)
+                    )
+                    if db.is_loaded():
+                        batch.append(track)
+                        if len(batch) >= INGEST_BATCH_SIZE:
+                            db.ingest_tracks(tracks=batch)
+                            batch = []
+                    yield track
+
+            finally:
+                # Tracks read so far are stored, even if the items are not all read
+                if batch:
+                    db.ingest_tracks(tracks=batch)
 
     @classmethod
     def from_id(cls, id_: str):
@@ -129,6 +328,101 @@ class TrackCollection:
         items = cls.read_items_from_db(id_=id_, db=db)
         return TrackCollection(id_=id_, _items=items)
 
+    @classmethod
+    def from_query(
+        cls,
+        where: Predicate = None,
+        genres: List[str] = None,
+        artist_ids: List[str] = None,
+        released_after: Union[str, datetime] = None,
+        released_before: Union[str, datetime] = None,
+        order_by: Union[str, List[str]] = None,
+        ascending: Union[bool, List[bool]] = True,
+        random: bool = False,
+        limit: int = None,
+        db: database.SpotifyDatabase = None,
+    ) -> "TrackCollection":
+        """Collection of the tracks of the database matching a query, without any API
+        request. The query runs when items are first needed, and tracks are then
+        loaded in chunks.
+
+        Args:
+            where (Predicate, optional): Predicate on the tracks, e.g.
+                F.audio_features.energy.between(0.4, 0.8) & (F.popularity >= 50).
+                Defaults to None.
+            genres (List[str], optional): Only keep tracks by artists of one of these
+                genres. Defaults to None.
+            artist_ids (List[str], optional): Only keep tracks by one of these artists.
+                Defaults to None.
+            released_after (Union[str, datetime], optional): Earliest album release
+                date (included). Defaults to None.
+            released_before (Union[str, datetime], optional): Latest album release
+                date (excluded). Defaults to None.
+            order_by (Union[str, List[str]], optional): Field(s) used for ordering.
+                Defaults to None.
+            ascending (Union[bool, List[bool]], optional): Ascending order, for all
+                fields or per field. Defaults to True.
+            random (bool, optional): Random order. Defaults to False.
+            limit (int, optional): Maximum number of tracks. Defaults to None.
+            db (database.SpotifyDatabase, optional): Database queried. Defaults to
+                the collection database.
+
+        Raises:
+            DatabaseNotLoaded: If no database is given nor loaded
+            ValueError: If the predicate or ordering cannot run in the database, or if
+                ascending does not hold one value per ordering field
+
+        Returns:
+            TrackCollection: Collection of matching tracks
+        """
+        if db is None:
+            db = CollectionDatabase()
+            if not db.is_loaded():
+                raise DatabaseNotLoaded
+
+        conditions = []
+        if where is not None:
+            sql = where.to_sql(TRACK_QUERY_COLUMNS)
+            if sql is None:
+                raise ValueError(f"Predicate cannot run in the database: {where}")
+            conditions.append(sql)
+
+        # Release dates are stored as text starting with YYYY-MM-DD
+        if released_after is not None:
+            conditions.append(("al.release_date >= ?", [str(released_after)[:10]]))
+        if released_before is not None:
+            conditions.append(("al.release_date < ?", [str(released_before)[:10]]))
+
+        order_by = [order_by] if isinstance(order_by, str) else list(order_by or [])
+        ascending = (
+            [ascending] * len(order_by) if isinstance(ascending, bool) else ascending
+        )
+        if len(ascending) != len(order_by):
+            raise ValueError("ascending must hold one value per ordering field")
+        for by in order_by:
+            if by not in TRACK_QUERY_COLUMNS:
+                raise ValueError(
+                    f"Cannot order by '{by}' in the database. Valid fields: "
+                    f"{', '.join(TRACK_QUERY_COLUMNS)}"
+                )
+
+        def items():
+            track_ids = db.query_track_ids(
+                conditions=conditions,
+                genres=genres,
+                artist_ids=artist_ids,
+                order_by=[
+                    (TRACK_QUERY_COLUMNS[by], ascending_)
+                    for by, ascending_ in zip(order_by, ascending)
+                ],
+                random=random,
+                limit=limit,
+            )
+            logger.info(f"Loading {len(track_ids)} tracks from the database")
+            yield from db.iter_tracks(track_ids=track_ids)
+
+        return cls(_items=items(), _audio_features_enriched=True)
+
     @classmethod
     def from_name(cls, name: str):
         name = name.replace("_", " ")
@@ -269,14 +563,7 @@ class TrackCollection:
         Returns:
             TrackCollection: Object with items shuffled.
         """
-        new_items_list = copy.copy(list(self.items))
-        random.shuffle(new_items_list)
-
-        new_items = (item for item in new_items_list)
-
-        return TrackCollection(
-            _items=new_items, _audio_features_enriched=self._audio_features_enriched
-        )
+        return self._then(Shuffle())
 
     def random(self, N: int) -> "TrackCollection":
         """Sample items randomly
@@ -287,15 +574,7 @@ class TrackCollection:
         Returns:
             TrackCollection: Object with new items
         """
-
-        def new_items(N):
-            all_items = list(self.items)
-            k = min(N, len(all_items))
-            yield from random.sample(all_items, k=k)
-
-        return TrackCollection(
-            _items=new_items(N), _audio_features_enriched=self._audio_features_enriched
-        )
+        return self._then(Random(N))
 
     def remove_remixes(self) -> "TrackCollection":
         """Remove remixes from items
@@ -305,83 +584,65 @@ class TrackCollection:
         """
         banned_words = ["remix", "mixed"]
 
-        def new_items():
-            for item in self.items:
-                if all(
-                    [
-                        (banned_word not in item.name.lower())
-                        for banned_word in banned_words
-                    ]
-                ):
-                    yield item
+        def criteria_func(item):
+            return all(
+                banned_word not in item.name.lower() for banned_word in banned_words
+            )
 
-        return TrackCollection(
-            _items=new_items(), _audio_features_enriched=self._audio_features_enriched
-        )
+        return self.filter(criteria_func, needs=["name"])
 
-    def sort(self, by: str, ascending: bool = True) -> "TrackCollection":
+    def sort(
+        self,
+        by: Union[str, List[str]],
+        ascending: Union[bool, List[bool]] = True,
+        missing: str = "last",
+    ) -> "TrackCollection":
         """Sort items
 
         Args:
-            by (str): Criteria used for sorting
-            ascending (bool, optional): Ascending order. Defaults to True.
+            by (Union[str, List[str]]): Field(s) used for sorting, most significant
+                first, e.g. "popularity" or "audio_features.energy"
+            ascending (Union[bool, List[bool]], optional): Ascending order, for all
+                fields or per field. Defaults to True.
+            missing (str, optional): Placement of missing values, "last", "first" or
+                "error". Defaults to "last".
+
+        Raises:
+            ValueError: If a field does not exist
 
         Returns:
             TrackCollection: Object with sorted items
         """
-        str_attr = f"item.{by}"
-
-        def new_items():
-            # Enrichment with audio features if needed
-            if by.startswith("audio_features") and not self._audio_features_enriched:
-                all_items = self._enrich_with_audio_features(items=self.items)
-                self._audio_features_enriched = True
+        by = [by] if isinstance(by, str) else list(by)
+        ascending = [ascending] * len(by) if isinstance(ascending, bool) else ascending
 
-            else:
-                all_items = self.items
+        if len(ascending) != len(by):
+            raise ValueError("ascending must hold one value per sort field")
 
-            sorted_items = sorted(
-                list(all_items),
-                key=eval(f"lambda item: {str_attr}"),
-                reverse=(not ascending),
-            )
-
-            yield from sorted_items
-
-        return TrackCollection(
-            _items=new_items(), _audio_features_enriched=self._audio_features_enriched
+        keys = tuple(
+            SortKey.compile(by=by_, ascending=ascending_, missing=missing)
+            for by_, ascending_ in zip(by, ascending)
         )
+        return self._then(Sort(keys=keys))
 
-    def filter(self, criteria_func: Callable[..., Any]) -> "TrackCollection":
-        """Filter items by certain criteria function
+    def filter(
+        self, criteria: Union[Predicate, Callable[..., Any]], needs: List[str] = None
+    ) -> "TrackCollection":
+        """Filter items by a predicate, e.g. (F.audio_features.energy > 0.6) &
+        (F.popularity >= 50), or by a criteria function
 
         Args:
-            criteria_func (Callable[..., Any]): Criteria used for filtering
+            criteria (Union[Predicate, Callable[..., Any]]): Criteria used for filtering
+            needs (List[str], optional): Item fields read by a criteria function, e.g.
+                ["name", "audio_features"]. Filters reading fields available before
+                hydration only (id, name, popularity, duration_ms) are applied to the
+                listed tracks. Defaults to None (any field may be read, so audio
+                features are fetched first).
 
         Returns:
             TrackCollection: Object with filtered items
         """
-
-        # Enrichment with audio features if needed
-        def new_items():
-
-            if (
-                "audio_features" in inspect.getsource(criteria_func)
-                and not self._audio_features_enriched
-            ):
-                self._audio_features_enriched = True
-                all_items = self._enrich_with_audio_features(items=self.items)
-
-            else:
-                all_items = self.items
-
-            for item in all_items:
-                if criteria_func(item):
-                    yield item
-
-        return TrackCollection(
-            _items=new_items(), _audio_features_enriched=self._audio_features_enriched
-        )
+        return self._then(Filter(predicate=as_predicate(criteria, needs=needs)))
 
     def insert_at_time_intervals(self, other, time: int):
         def new_items(time):
@@ -429,14 +690,46 @@ class TrackCollection:
         def new_items():
             for item in self.items:
                 item.audio_features = AudioFeaturesItem.from_dict(
-                    get_audio_features(track_ids=[item.id])[item.id]
+                    get_audio_features(sp=self.sp, track_ids=[item.id])[item.id]
                 )
                 yield item
 
         return TrackCollection(_items=new_items(), _audio_features_enriched=True)
 
+    def add_missing_audio_features(
+        self, db: database.SpotifyDatabase
+    ) -> List[TrackItem]:
+        """Get items enriched with audio features, only requesting those of the items
+        which have none, neither in the collection nor in the database
+
+        Args:
+            db (database.SpotifyDatabase): Database holding stored audio features
+
+        Returns:
+            List[TrackItem]: Items (those with stored audio features are left as is)
+        """
+        items = list(self.items)
+        if self._audio_features_enriched:
+            return items
+
+        stored_ids = set(db.audio_features_track_ids([item.id for item in items]))
+        missing = [
+            item
+            for item in items
+            if item.id not in stored_ids and item.audio_features == AudioFeaturesItem()
+        ]
+        profiling.record_cache(
+            "audio_features", hits=len(items) - len(missing), misses=len(missing)
+        )
+        if missing:
+            logger.info(f"Requesting audio features of {len(missing)} tracks")
+            for _ in self._enrich_with_audio_features(missing):
+                pass
+
+        return items
+
     def _enrich_with_audio_features(self, items: List[TrackItem]) -> List[TrackItem]:
-        """Get items enriched with audio features
+        """Get items enriched with audio features, requested in batches
 
         Args:
             items (List[TrackItem]): Items to enrich
@@ -444,11 +737,48 @@ class TrackCollection:
         Returns:
             List[TrackItem]: Enriched items
         """
-        for item in items:
-            item.audio_features = AudioFeaturesItem.from_dict(
-                get_audio_features(track_ids=[item.id])[item.id]
+        items = iter(items)
+        batch = list(itertools.islice(items, AUDIO_FEATURES_BATCH_SIZE))
+
+        while batch:
+            audio_features = get_audio_features(
+                sp=self.sp, track_ids=[item.id for item in batch]
             )
-            yield item
+            for item in batch:
+                item.audio_features = AudioFeaturesItem.from_dict(
+                    audio_features[item.id]
+                )
+                yield item
+
+            batch = list(itertools.islice(items, AUDIO_FEATURES_BATCH_SIZE))
+
+    def _enrich_missing_audio_features(
+        self, items: Iterable[TrackItem]
+    ) -> Iterable[TrackItem]:
+        """Get items enriched with audio features, only requesting (in batches) those
+        of the items which have none, e.g. not those loaded from the database
+
+        Args:
+            items (Iterable[TrackItem]): Items to enrich
+
+        Yields:
+            TrackItem: Enriched items, in input order
+        """
+        pending, missing = [], []
+        for item in items:
+            pending.append(item)
+            if item.audio_features == AudioFeaturesItem():
+                missing.append(item)
+
+            if len(missing) >= AUDIO_FEATURES_BATCH_SIZE:
+                for _ in self._enrich_with_audio_features(missing):
+                    pass
+                yield from pending
+                pending, missing = [], []
+
+        for _ in self._enrich_with_audio_features(missing):
+            pass
+        yield from pending
 
     def set_id(self, id_: str) -> "TrackCollection":
         """Add ID to collection, e.g. to use for storage in a database
@@ -470,7 +800,7 @@ class TrackCollection:
         """
 
         # By ID
-        items = copy.copy(self.items)
+        items = list(self.items)
 
         idx = 0
         while idx < len(items):
@@ -481,9 +811,12 @@ class TrackCollection:
             else:
                 idx += 1
 
-        new_coll = copy.deepcopy(self)
-        new_coll._items = items
-        return new_coll
+        return TrackCollection(
+            id_=self.id_,
+            info=self.info,
+            _items=items,
+            _audio_features_enriched=self._audio_features_enriched,
+        )
 
     def first(self, n: int) -> "TrackCollection":
         """First n items
@@ -491,12 +824,7 @@ class TrackCollection:
         Returns:
             TrackCollection: Collection with trimmed items
         """
-
-        new_items = itertools.islice(self.items, n)
-
-        return TrackCollection(
-            _items=new_items, _audio_features_enriched=self._audio_features_enriched
-        )
+        return self._then(First(n))
 
     def to_playlist(self, playlist_name: str = None) -> None:
         if playlist_name is None:
@@ -588,10 +916,93 @@ class Playlist(TrackCollection):
     def _db_track_gen(self):
         return super()._db_track_gen
 
+    cost_model = CostModel(
+        listing_page_size=100,
+        fetch_calls=lambda n: math.ceil(n / 50) + HYDRATION_CALLS_PER_TRACK * n,
+    )
+
     @property
     def _api_track_gen(self):
         return get_playlist_tracks(sp=self.sp, playlist_id=self.id_)
 
+    def _listing_gen(self):
+        if CollectionDatabase().is_loaded():
+            # Served by the database copy, which is cheap to read in full
+            return None
+
+        return (
+            TrackItem.from_dict(track)
+            for track in get_playlist_track_listing(sp=self.sp, playlist_id=self.id_)
+        )
+
+    def _hydrate(self, listed_items):
+        for item in listed_items:
+            yield TrackItem.from_dict(read_track_from_id(sp=self.sp, track_id=item.id))
+
+    def _db_track_ids(self):
+        db = CollectionDatabase()
+        if self._items or not db.is_loaded():
+            return None
+
+        self.sync(db=db)
+        return db.collection_track_ids(id_=self.id_)
+
+    def item_gen(self):
+        db = CollectionDatabase()
+
+        if db.is_loaded():
+            self.sync(db=db)
+            yield from self._db_track_gen
+
+        else:
+            yield from super().item_gen()
+
+    def sync(self, db: database.SpotifyDatabase) -> None:
+        """Bring the playlist stored in the database up to date. The stored copy is
+        reused as long as the playlist's snapshot ID is unchanged. Otherwise, the
+        track IDs are listed and stored, in order, as the version of the new
+        snapshot, and only the tracks missing from the database are fetched in full.
+
+        Args:
+            db (database.SpotifyDatabase): Database holding the collection
+        """
+        snapshot_id = get_playlist_snapshot_id(sp=self.sp, playlist_id=self.id_)
+        if db.playlist_snapshot(playlist_id=self.id_) == snapshot_id:
+            profiling.record_cache("playlist_snapshots", hits=1)
+            return
+        profiling.record_cache("playlist_snapshots", misses=1)
+
+        track_ids = get_playlist_track_ids(sp=self.sp, playlist_id=self.id_)
+        stored_ids = set(db.stored_track_ids(track_ids=track_ids))
+
+        added_ids = [id_ for id_ in dict.fromkeys(track_ids) if id_ not in stored_ids]
+        profiling.record_cache(
+            "stored_tracks",
+            hits=len(set(track_ids)) - len(added_ids),
+            misses=len(added_ids),
+        )
+        logger.info(
+            f"Playlist {self.id_} changed: {len(track_ids)} tracks, "
+            f"{len(added_ids)} to fetch"
+        )
+
+        added_tracks = TrackItem.from_dicts(
+            read_tracks_from_ids(
+                sp=self.sp,
+                track_ids=added_ids,
+                stored_album_ids=db.stored_album_ids,
+                stored_artist_ids=db.stored_artist_ids,
+            )
+        )
+
+        # Requests are made beforehand, so as not to hold the writer in between
+        with db.transaction():
+            db.ingest_tracks(tracks=added_tracks)
+            db.store_collection_version(
+                id_=self.id_, snapshot_id=snapshot_id, track_ids=track_ids
+            )
+            db.store_playlist_snapshot(playlist_id=self.id_, snapshot_id=snapshot_id)
+
 
 class Album(TrackCollection):
     """Class representing an Album's track contents"""
@@ -639,6 +1050,51 @@ class Artist(TrackCollection):
 
         return Artist(id_=self.id_, _items=items())
 
+    @classmethod
+    def top_tracks(
+        cls, artist_ids: List[str], db: database.SpotifyDatabase
+    ) -> Dict[str, TrackCollection]:
+        """Popular songs, with audio features, of several artists. These are read from
+        the artist_top_tracks table of the database, and only the artists missing from
+        it are fetched from the API (and then stored).
+
+        Args:
+            artist_ids (List[str]): Artist IDs
+            db (database.SpotifyDatabase): Database holding the artist_top_tracks table
+
+        Returns:
+            Dict[str, TrackCollection]: Collection of popular songs per artist ID,
+                already materialized, hence empty for artists without top tracks
+        """
+        top_tracks = db.load_artist_top_tracks(artist_ids=artist_ids)
+        missing_ids = [
+            id_ for id_ in dict.fromkeys(artist_ids) if id_ not in top_tracks
+        ]
+
+        if missing_ids:
+            logger.info(f"Retrieving top tracks of {len(missing_ids)} artists via API")
+            fetched = {
+                artist_id: [TrackItem.from_dict(track) for track in tracks_data]
+                for artist_id, tracks_data in get_artists_top_tracks(
+                    sp=cls.sp, artist_ids=missing_ids
+                ).items()
+            }
+            db.store_artist_top_tracks(top_tracks=fetched)
+            top_tracks.update(fetched)
+
+        # Collections are built on their items' cache, so that empty ones are not
+        # fetched again through the artist ID
+        collections = {}
+        for artist_id in artist_ids:
+            items = top_tracks.get(artist_id, [])
+            collections[artist_id] = TrackCollection(
+                id_=artist_id,
+                _items=items,
+                _audio_features_enriched=True,
+                _cache=ItemCache(items),
+            )
+        return collections
+
     def all_songs(self) -> "Artist":
         """All songs by the artist
 
@@ -647,7 +1103,7 @@ class Artist(TrackCollection):
         """
 
         # Build album collections
-        album_data = get_artist_albums(artist_id=self.id_)
+        album_data = get_artist_albums(sp=self.sp, artist_id=self.id_)
         album_collection_items = [Album.from_id(album["id"]) for album in album_data]
         album_collection = CollectionCollection(collections=album_collection_items)
 
@@ -693,11 +1149,71 @@ class SavedTracks(TrackCollection):
     def _api_track_gen(self):
         return get_all_saved_tracks(sp=self.sp)
 
+    def item_gen(self):
+        db = CollectionDatabase()
+
+        if db.is_loaded():
+            self.sync(db=db)
+            yield from self._db_track_gen
+
+        else:
+            logger.info(f"Retrieving items via API")
+            yield from self._api_track_gen
+
+    def _db_track_ids(self):
+        db = CollectionDatabase()
+        if self._items or not db.is_loaded():
+            return None
+
+        self.sync(db=db)
+        return db.collection_track_ids(id_=self.id_)
+
+    def sync(self, db: database.SpotifyDatabase) -> None:
+        """Bring the saved tracks stored in the database up to date. Only the tracks
+        saved since the last sync (the "added_at" watermark) are requested. Removals
+        are detected by comparing the number of saved tracks with the number of
+        stored ones, in which case the whole collection is reloaded.
+
+        Args:
+            db (database.SpotifyDatabase): Database holding the collection
+        """
+        state = db.collection_state(id_=self.id_)
+        watermark = state["watermark"] if state else None
+
+        results, total = get_saved_tracks_since(sp=self.sp, added_after=watermark)
+
+        reload = (
+            state is None or db.collection_size(id_=self.id_) + len(results) != total
+        )
+        if reload:
+            logger.info(f"Reloading all saved tracks via API")
+            if state is not None:
+                results, total = get_saved_tracks_since(sp=self.sp)
+
+        with db.transaction():
+            if reload:
+                db.remove_collection(id_=self.id_)
+
+            if results:
+                logger.info(f"Storing {len(results)} new saved tracks")
+                tracks = [TrackItem.from_dict(result["track"]) for result in results]
+                # Newest first, as served by the API
+                db.ingest_tracks(tracks=tracks, collection_id=self.id_, prepend=True)
+                watermark = max(result["added_at"] for result in results)
+
+            db.store_collection_state(id_=self.id_, watermark=watermark, total=total)
+
 
 @dataclass
 class CollectionCollection(TrackCollection):
     collections: List[TrackCollection] = field(default_factory=list)
 
+    def _item_source(self):
+        # Items come from the collections, the collection having no ID of its own
+        if self._source is None and not self._items:
+            return self.item_gen()
+        return super()._item_source()
+
     def item_gen(self):
         if self.collections:
             yield from sum(self.collections).items
@@ -728,20 +1244,20 @@ class Genre(TrackCollection):
     """Class representing an genre's track contents"""
 
     def __init__(self, genre_name: str = "") -> None:
+        super().__init__()
         self.genre_name = genre_name
-        self._items = []
 
-    @property
-    def items(self) -> List[TrackItem]:
-        if self._items:
-            return self._items
-        else:
-            if self.id_:
-                yield from get_recommendations_for_genre(
-                    sp=self.sp, genre_names=[self.genre_name]
-                )
-            else:
-                yield from iter(())
+    def _item_source(self):
+        # Items come from the genre name, the collection having no ID of its own
+        if self._source is None and not self._items:
+            return self.item_gen()
+        return super()._item_source()
+
+    def item_gen(self):
+        if self.genre_name:
+            yield from get_recommendations_for_genre(
+                sp=self.sp, genre_names=[self.genre_name]
+            )
 
 
 class Show(TrackCollection):
@@ -763,13 +1279,32 @@ class Show(TrackCollection):
     def item_gen(self):
         yield from self._api_track_gen
 
+    def released_since(self, since: datetime) -> "Show":
+        """Episodes released since a given date. Pages of episodes stop being
+        requested as soon as older episodes are reached.
+
+        Args:
+            since (datetime): Earliest release date
+
+        Returns:
+            Show: Show with items set to the recent episodes only
+        """
+
+        def items():
+            for ep_dict in get_show_episodes(sp=self.sp, show_id=self.id_, since=since):
+                yield EpisodeItem.from_dict(ep_dict)
+
+        return Show(id_=self.id_, _items=items())
+
 
 class Track(TrackCollection):
     """Class representing a single-track collection"""
 
     def __init__(self, id_: str):
         self.id_ = id_
-        self._items = iter([TrackItem.from_dict(read_track_from_id(track_id=id_))])
+        self._items = iter(
+            [TrackItem.from_dict(read_track_from_id(sp=self.sp, track_id=id_))]
+        )
 
     @classmethod
     def func_get_id(cls, name):
@@ -787,4 +1322,7 @@ class CollectionDatabase(
 
 
 def init_db(db_path):
-    CollectionDatabase(file_path=db_path, op_table="operations")
+    db = CollectionDatabase(file_path=db_path, op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+    resolution_cache.db = db
+    spill_settings.db = db
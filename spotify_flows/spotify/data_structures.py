@@ -3,9 +3,15 @@
 """
 
 # Standard library imports
+import weakref
+import contextvars
+from array import array
 from typing import Any
 from typing import List
 from typing import Dict
+from typing import Tuple
+from typing import Callable
+from typing import Iterable
 from dataclasses import dataclass, fields, field
 
 # Third party imports
@@ -14,12 +20,136 @@ from dataclasses import dataclass, fields, field
 from spotify_flows.utils.dates import date_parsing
 
 # Main body
+def slotted(cls: type) -> type:
+    """Rebuild a dataclass with __slots__ for its fields, so that its instances hold no
+    per-instance __dict__ (the equivalent of dataclass(slots=True) on Python 3.10+).
+    Methods of the class cannot use zero-argument super(), which would still refer
+    to the original class.
+
+    Args:
+        cls (type): Dataclass
+
+    Raises:
+        TypeError: If a method of the class uses zero-argument super()
+
+    Returns:
+        type: Slotted copy of the dataclass
+    """
+    for name, value in cls.__dict__.items():
+        func = getattr(value, "__func__", value)
+        if "__class__" in getattr(getattr(func, "__code__", None), "co_freevars", ()):
+            raise TypeError(
+                f"{cls.__name__}.{name} uses zero-argument super(), "
+                "which slotted classes do not support"
+            )
+
+    field_names = tuple(field_.name for field_ in fields(cls))
+    cls_dict = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in field_names + ("__dict__", "__weakref__")
+    }
+    cls_dict["__slots__"] = field_names + ("__weakref__",)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+class ItemRegistry:
+    """Registry interning data structures by ID, so that identical albums or artists
+    shared by many tracks are held as a single object. Entries are weak references and
+    disappear with the last item using them."""
+
+    def __init__(self):
+        self._items = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def intern(self, item: "SpotifyDataStructure") -> "SpotifyDataStructure":
+        """Get the registered object identical to the item, registering the item if
+        there is none
+
+        Args:
+            item (SpotifyDataStructure): Data structure with an id field
+
+        Returns:
+            SpotifyDataStructure: Shared object
+        """
+        if not item.id:
+            return item
+
+        key = (type(item), item.id)
+        existing = self._items.get(key)
+        if existing is not None and existing.identical_to(item):
+            return existing
+
+        self._items[key] = item
+        return item
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+registry = ItemRegistry()
+
+
+def _parse_release_date(value: Any) -> Any:
+    """Parse release dates given as non-empty strings, leaving other values as is"""
+    return date_parsing(value) if isinstance(value, str) and value else value
+
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+_CONSTRUCTORS: Dict[type, Callable[[Dict[str, Any]], "SpotifyDataStructure"]] = {}
+
+_batch_items: contextvars.ContextVar = contextvars.ContextVar(
+    "batch_items", default=None
+)
+"""Interned items built during the current from_dicts call, with their input
+dictionary, per class and ID"""
+
+
 class SpotifyDataStructure:
     """Base class for Spotify data structures"""
 
+    __slots__ = ()
+
+    interned = False
+    """Whether objects built from dictionaries are interned by ID, see ItemRegistry"""
+
+    def __getstate__(self) -> List[Any]:
+        return [getattr(self, field_.name) for field_ in fields(self)]
+
+    def __setstate__(self, state: List[Any]) -> None:
+        # object.__setattr__ also restores frozen data structures
+        for field_, value in zip(fields(self), state):
+            object.__setattr__(self, field_.name, value)
+
+    def identical_to(self, other: "SpotifyDataStructure") -> bool:
+        """Whether both objects hold exactly the same data, used for interning
+
+        Args:
+            other (SpotifyDataStructure): Object to compare with
+
+        Returns:
+            bool: True if identical
+        """
+        return self == other
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Names of the dataclass fields, computed once per class
+
+        Returns:
+            Tuple[str, ...]: Field names
+        """
+        try:
+            return _FIELD_NAMES[cls]
+        except KeyError:
+            names = _FIELD_NAMES[cls] = tuple(field_.name for field_ in fields(cls))
+            return names
+
     @classmethod
     def trim_dict(cls, dict_: Dict[str, Any]) -> Dict[str, Any]:
-        """Trim input dictionary based on dataclass fields
+        """Trim input dictionary based on dataclass fields. The input is not modified.
 
         Args:
             dict_ (Dict[str, Any]): Dictionary holding construction data
@@ -28,14 +158,69 @@ class SpotifyDataStructure:
             Dict[str, Any]: Dictionary with ommitted keys
         """
         if dict_ is None:
-            dict_ = {}
+            return {}
+
+        return {key: dict_[key] for key in cls.field_names() if key in dict_}
+
+    @classmethod
+    def _field_converters(cls) -> Dict[str, Callable[[Any], Any]]:
+        """Conversions of the input values of some fields, e.g. into nested data
+        structures, bound once into the class constructor
+
+        Returns:
+            Dict[str, Callable[[Any], Any]]: Conversion function per field name
+        """
+        return {}
+
+    @classmethod
+    def _constructor(cls) -> Callable[[Dict[str, Any]], "SpotifyDataStructure"]:
+        """Constructor from dictionary compiled once per class, with the field names,
+        field conversions and interning bound locally
+
+        Returns:
+            Callable[[Dict[str, Any]], SpotifyDataStructure]: Constructor
+        """
+        try:
+            return _CONSTRUCTORS[cls]
+        except KeyError:
+            pass
+
+        field_names = cls.field_names()
+        converters = tuple(cls._field_converters().items())
+        intern = registry.intern if cls.interned else None
+
+        def construct(dict_):
+            if dict_ is None:
+                return cls()
+
+            batch_items = _batch_items.get() if intern is not None else None
+            if batch_items is not None:
+                # Within a batch, an input equal to an earlier one gives the same item
+                batch_key = (cls, dict_.get("id"))
+                built = batch_items.get(batch_key)
+                if built is not None and built[0] == dict_:
+                    return built[1]
+
+            data = {key: dict_[key] for key in field_names if key in dict_}
+            for key, convert in converters:
+                if key in data:
+                    data[key] = convert(data[key])
+
+            item = cls(**data)
+            if intern is None:
+                return item
 
-        class_fields = [field.name for field in fields(cls)]
-        return {key: dict_[key] for key in class_fields if key in list(dict_.keys())}
+            item = intern(item)
+            if batch_items is not None:
+                batch_items[batch_key] = (dict_, item)
+            return item
+
+        _CONSTRUCTORS[cls] = construct
+        return construct
 
     @classmethod
     def from_dict(cls, dict_: Dict[str, Any]) -> "SpotifyDataStructure":
-        """Construct data structure from input dictionary
+        """Construct data structure from input dictionary. The input is not modified.
 
         Args:
             dict_ (Dict[str, Any]): Dictionary holding construction data
@@ -43,9 +228,31 @@ class SpotifyDataStructure:
         Returns:
             SpotifyDataStructure: Data structure object
         """
-        return cls(**cls.trim_dict(dict_))
+        return cls._constructor()(dict_)
+
+    @classmethod
+    def from_dicts(
+        cls, dicts: Iterable[Dict[str, Any]]
+    ) -> List["SpotifyDataStructure"]:
+        """Construct data structures in bulk, e.g. from a page of API results. The
+        nested albums and artists shared by the items are built once per batch, their
+        input dictionaries being compared rather than converted again.
 
+        Args:
+            dicts (Iterable[Dict[str, Any]]): Dictionaries holding construction data
 
+        Returns:
+            List[SpotifyDataStructure]: Data structure objects
+        """
+        construct = cls._constructor()
+        token = _batch_items.set({})
+        try:
+            return [construct(dict_) for dict_ in dicts]
+        finally:
+            _batch_items.reset(token)
+
+
+@slotted
 @dataclass(eq=True, frozen=True)
 class AudioFeaturesItem(SpotifyDataStructure):
     danceability: float = -1
@@ -60,30 +267,86 @@ class AudioFeaturesItem(SpotifyDataStructure):
     valence: float = -1
     tempo: float = 0
 
+    def to_array(self) -> array:
+        """Compact representation of the audio features, as an array of doubles
+        ordered like AUDIO_FEATURES_NAMES
+
+        Returns:
+            array: Audio features
+        """
+        return array("d", [getattr(self, name) for name in AUDIO_FEATURES_NAMES])
 
+    @classmethod
+    def from_array(cls, values: Iterable[float]) -> "AudioFeaturesItem":
+        """Construct audio features from their compact representation
+
+        Args:
+            values (Iterable[float]): Audio features, ordered like AUDIO_FEATURES_NAMES
+
+        Returns:
+            AudioFeaturesItem: Audio features object
+        """
+        return cls(*values)
+
+
+AUDIO_FEATURES_NAMES = tuple(field_.name for field_ in fields(AudioFeaturesItem))
+
+
+@slotted
 @dataclass(eq=True, frozen=True)
 class ArtistItem(SpotifyDataStructure):
     id: str = ""
     name: str = ""
     popularity: int = 0
-    genres: List[str] = field(default_factory=list)
+    genres: Tuple[str, ...] = ()
 
+    def __post_init__(self):
+        # Artists are interned, hence hashed, so their genres are a tuple
+        if not isinstance(self.genres, tuple):
+            object.__setattr__(self, "genres", tuple(self.genres))
 
-@dataclass(unsafe_hash=True)
+    interned = True
+
+    @classmethod
+    def _field_converters(cls):
+        def genres(values):
+            return tuple(values or ())
+
+        return {"genres": genres}
+
+
+@slotted
+@dataclass(eq=True, frozen=True)
 class AlbumItem(SpotifyDataStructure):
     id: str = ""
     name: str = ""
     release_date: str = ""
-    artists: List[ArtistItem] = field(default_factory=list, compare=False)
+    artists: Tuple[ArtistItem, ...] = field(default=(), compare=False)
+
+    def __post_init__(self):
+        # Albums are shared between tracks (interned), so their artists are a tuple
+        if not isinstance(self.artists, tuple):
+            object.__setattr__(self, "artists", tuple(self.artists))
+
+    interned = True
+
+    def identical_to(self, other: "AlbumItem") -> bool:
+        return self == other and self.artists == other.artists
 
     @classmethod
-    def from_dict(cls, track_dict):
-        release_date_str = track_dict["release_date"]
-        if isinstance(release_date_str, str):
-            track_dict["release_date"] = date_parsing(release_date_str)
-        return super().from_dict(track_dict)
+    def _field_converters(cls):
+        construct_artist = ArtistItem._constructor()
+
+        def artists(values):
+            return tuple(
+                value if isinstance(value, ArtistItem) else construct_artist(value)
+                for value in values or ()
+            )
+
+        return {"release_date": _parse_release_date, "artists": artists}
 
 
+@slotted
 @dataclass(unsafe_hash=True)
 class TrackItem(SpotifyDataStructure):
     item_type = "track"
@@ -98,21 +361,20 @@ class TrackItem(SpotifyDataStructure):
     album: AlbumItem = AlbumItem()
 
     @classmethod
-    def from_dict(cls, track_dict):
-        album_dict = track_dict.get("album")
+    def _field_converters(cls):
+        construct_album = AlbumItem._constructor()
+        construct_audio_features = AudioFeaturesItem._constructor()
 
-        artists = [
-            ArtistItem.from_dict(artist_dict)
-            for artist_dict in album_dict.get("artists")
-        ]
+        def album(value):
+            return construct_album(value) if isinstance(value, dict) else value
 
-        album_dict["artists"] = artists
-        album = AlbumItem.from_dict(track_dict.get("album"))
+        def audio_features(value):
+            return construct_audio_features(value) if isinstance(value, dict) else value
 
-        track_dict["album"] = album
-        return super().from_dict(track_dict)
+        return {"album": album, "audio_features": audio_features}
 
 
+@slotted
 @dataclass(eq=True, frozen=True)
 class EpisodeItem(SpotifyDataStructure):
     item_type = "episode"
@@ -124,7 +386,5 @@ class EpisodeItem(SpotifyDataStructure):
     description: str = field(default="", repr=False)
 
     @classmethod
-    def from_dict(cls, ep_dict):
-        release_date_str = ep_dict["release_date"]
-        ep_dict["release_date"] = date_parsing(release_date_str)
-        return super().from_dict(ep_dict)
+    def _field_converters(cls):
+        return {"release_date": date_parsing}
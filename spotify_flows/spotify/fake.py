@@ -0,0 +1,895 @@
+"""
+    This module holds an offline stand-in for the Spotify API: a synthetic catalog
+    of artists, albums, tracks, playlists and shows, served by FakeSpotify through
+    the ExtendedSpotify methods used by the application. It lets collections, scripts
+    and benchmarks run without network, with API calls counted and an optional
+    latency injected per call.
+
+    Usage:
+        with offline_spotify(FakeSpotify(SyntheticCatalog(n_tracks=10000))) as sp:
+            Playlist.from_id("playlist0").items
+"""
+
+# Standard library imports
+import re
+import json
+import math
+import time
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Callable
+from typing import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+# Third party imports
+from spotipy.exceptions import SpotifyException
+
+# Local imports
+from spotify_flows.utils import profiling
+
+# Main body
+GENRE_PREFIXES = [
+    "indie",
+    "dark",
+    "nu",
+    "french",
+    "deep",
+    "alt",
+    "dream",
+    "neo",
+    "post",
+    "lo-fi",
+]
+GENRE_BASES = [
+    "pop",
+    "rock",
+    "jazz",
+    "house",
+    "techno",
+    "folk",
+    "soul",
+    "metal",
+    "rap",
+    "ambient",
+]
+
+
+def _memoized_property(func: Callable) -> property:
+    """Property computed on first access and then stored on the instance, like
+    functools.cached_property (Python 3.8+)"""
+    name = f"_{func.__name__}"
+
+    @wraps(func)
+    def getter(self):
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            value = self.__dict__[name] = func(self)
+            return value
+
+    return property(getter)
+
+
+def _index(id_: str, prefix: str) -> int:
+    """Index of a synthetic entity from its ID or URI, e.g. 12 for "track12" or
+    "spotify:track:track12", or None if the ID is not of that kind"""
+    id_ = id_.rsplit(":", 1)[-1]
+    if id_.startswith(prefix) and id_[len(prefix) :].isdigit():
+        return int(id_[len(prefix) :])
+    return None
+
+
+@dataclass
+class SyntheticCatalog:
+    """Deterministic catalog of synthetic Spotify objects. Objects are generated from
+    their index when requested, so that large catalogs cost no memory up front.
+
+    Args:
+        n_tracks (int, optional): Number of tracks. Defaults to 1000.
+        tracks_per_album (int, optional): Tracks per album. Defaults to 10.
+        albums_per_artist (int, optional): Albums per artist. Defaults to 3.
+        n_genres (int, optional): Number of genres (at most 100). Defaults to 50.
+        n_related (int, optional): Related artists per artist. Defaults to 20.
+        n_playlists (int, optional): Playlists of the user. Defaults to 10.
+        playlist_size (int, optional): Tracks per playlist. Defaults to 100.
+        n_saved (int, optional): Saved tracks of the user. Defaults to 500.
+        n_shows (int, optional): Number of shows. Defaults to 5.
+        episodes_per_show (int, optional): Episodes per show, one per week. Defaults
+            to 60.
+        today (date, optional): Release date of the latest episodes. Defaults to
+            2024-01-01.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+
+    n_tracks: int = 1000
+    tracks_per_album: int = 10
+    albums_per_artist: int = 3
+    n_genres: int = 50
+    n_related: int = 20
+    n_playlists: int = 10
+    playlist_size: int = 100
+    n_saved: int = 500
+    n_shows: int = 5
+    episodes_per_show: int = 60
+    today: date = date(2024, 1, 1)
+    seed: int = 0
+
+    @property
+    def n_albums(self) -> int:
+        return math.ceil(self.n_tracks / self.tracks_per_album)
+
+    @property
+    def n_artists(self) -> int:
+        return math.ceil(self.n_albums / self.albums_per_artist)
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}-{kind}-{index}")
+
+    @_memoized_property
+    def genres(self) -> List[str]:
+        names = [
+            f"{prefix} {base}" for base in GENRE_BASES for prefix in GENRE_PREFIXES
+        ]
+        return names[: self.n_genres]
+
+    # Artists
+    def artist_genres(self, k: int) -> List[str]:
+        rng = self._rng("genres", k)
+        return rng.sample(self.genres, min(len(self.genres), rng.randint(1, 3)))
+
+    def simplified_artist(self, k: int) -> Dict[str, Any]:
+        return {
+            "id": f"artist{k}",
+            "name": f"Artist {k}",
+            "type": "artist",
+            "uri": f"spotify:artist:artist{k}",
+        }
+
+    def artist(self, k: int) -> Dict[str, Any]:
+        rng = self._rng("artist", k)
+        return {
+            **self.simplified_artist(k),
+            "popularity": rng.randint(0, 100),
+            "followers": {"total": rng.randint(0, 10 ** 6)},
+            "genres": self.artist_genres(k),
+        }
+
+    def artist_album_indices(self, k: int) -> List[int]:
+        return list(range(k, self.n_albums, self.n_artists))
+
+    def related_artist_indices(self, k: int) -> List[int]:
+        """Related artists: the neighbours of an artist, so that all artists are
+        connected, and others at random"""
+        if self.n_artists < 2:
+            return []
+
+        rng = self._rng("related", k)
+        related = {(k + 1) % self.n_artists, (k - 1) % self.n_artists}
+        n_related = min(self.n_related, self.n_artists - 1)
+        while len(related) < n_related:
+            related.add(rng.randrange(self.n_artists))
+            related.discard(k)
+        return sorted(related)
+
+    @_memoized_property
+    def artists_by_genre(self) -> Dict[str, List[int]]:
+        index = {}
+        for k in range(self.n_artists):
+            for genre in self.artist_genres(k):
+                index.setdefault(genre, []).append(k)
+        return index
+
+    # Albums
+    def album_track_indices(self, j: int) -> List[int]:
+        return list(
+            range(
+                j * self.tracks_per_album,
+                min(self.n_tracks, (j + 1) * self.tracks_per_album),
+            )
+        )
+
+    def simplified_album(self, j: int) -> Dict[str, Any]:
+        rng = self._rng("album", j)
+        release_date = date(1960, 1, 1) + timedelta(days=rng.randrange(64 * 365))
+        return {
+            "id": f"album{j}",
+            "name": f"Album {j}",
+            "album_type": "album",
+            "release_date": str(release_date),
+            "release_date_precision": "day",
+            "total_tracks": len(self.album_track_indices(j)),
+            "artists": [self.simplified_artist(j % self.n_artists)],
+            "type": "album",
+            "uri": f"spotify:album:album{j}",
+        }
+
+    def album(self, j: int) -> Dict[str, Any]:
+        return {
+            **self.simplified_album(j),
+            "genres": [],
+            "popularity": self._rng("album_popularity", j).randint(0, 100),
+        }
+
+    # Tracks
+    def simplified_track(self, i: int) -> Dict[str, Any]:
+        rng = self._rng("track", i)
+        j = i // self.tracks_per_album
+        return {
+            "id": f"track{i}",
+            "name": f"Track {i}",
+            "duration_ms": rng.randint(120000, 400000),
+            "explicit": rng.random() < 0.1,
+            "track_number": i % self.tracks_per_album + 1,
+            "disc_number": 1,
+            "artists": [self.simplified_artist(j % self.n_artists)],
+            "type": "track",
+            "uri": f"spotify:track:track{i}",
+        }
+
+    def track(self, i: int) -> Dict[str, Any]:
+        return {
+            **self.simplified_track(i),
+            "popularity": self._rng("track_popularity", i).randint(0, 100),
+            "album": self.simplified_album(i // self.tracks_per_album),
+        }
+
+    def hydrated_track(self, i: int) -> Dict[str, Any]:
+        """Track as read by tracks.read_track_from_id (album and artists in full),
+        with its audio features"""
+        j = i // self.tracks_per_album
+        album = {**self.album(j), "artists": [self.artist(j % self.n_artists)]}
+        return {
+            **self.track(i),
+            "album": album,
+            "audio_features": self.audio_features(i),
+        }
+
+    def audio_features(self, i: int) -> Dict[str, Any]:
+        rng = self._rng("audio_features", i)
+        return {
+            "id": f"track{i}",
+            "danceability": rng.random(),
+            "energy": rng.random(),
+            "key": rng.randrange(12),
+            "loudness": rng.uniform(-30, 0),
+            "mode": rng.randrange(2),
+            "speechiness": rng.random() / 2,
+            "acousticness": rng.random(),
+            "instrumentalness": rng.random(),
+            "liveness": rng.random() / 2,
+            "valence": rng.random(),
+            "tempo": rng.uniform(60, 180),
+            "type": "audio_features",
+            "uri": f"spotify:track:track{i}",
+        }
+
+    def artist_top_track_indices(self, k: int) -> List[int]:
+        track_indices = [
+            i for j in self.artist_album_indices(k) for i in self.album_track_indices(j)
+        ]
+        popularity = {
+            i: self._rng("track_popularity", i).randint(0, 100) for i in track_indices
+        }
+        return sorted(track_indices, key=lambda i: -popularity[i])[:10]
+
+    # User library
+    def playlist_track_indices(self, p: int) -> List[int]:
+        rng = self._rng("playlist", p)
+        return rng.sample(range(self.n_tracks), min(self.playlist_size, self.n_tracks))
+
+    @_memoized_property
+    def saved_track_indices(self) -> List[int]:
+        """Saved tracks, most recently saved first"""
+        rng = self._rng("saved", 0)
+        return rng.sample(range(self.n_tracks), min(self.n_saved, self.n_tracks))
+
+    def saved_at(self, position: int) -> str:
+        saved_at = datetime.combine(self.today, datetime.min.time())
+        return f"{saved_at - timedelta(hours=position):%Y-%m-%dT%H:%M:%SZ}"
+
+    # Shows
+    def show(self, s: int) -> Dict[str, Any]:
+        return {
+            "id": f"show{s}",
+            "name": f"Show {s}",
+            "publisher": f"Publisher {s}",
+            "total_episodes": self.episodes_per_show,
+            "type": "show",
+            "uri": f"spotify:show:show{s}",
+        }
+
+    def episode(self, s: int, e: int) -> Dict[str, Any]:
+        """e-th most recent episode of a show"""
+        return {
+            "id": f"episode{s}x{e}",
+            "name": f"Show {s} episode {self.episodes_per_show - e}",
+            "description": f"Episode {self.episodes_per_show - e} of show {s}",
+            "duration_ms": self._rng("episode", s * self.episodes_per_show + e).randint(
+                600000, 5400000
+            ),
+            "release_date": str(self.today - timedelta(weeks=e)),
+            "release_date_precision": "day",
+            "type": "episode",
+            "uri": f"spotify:episode:episode{s}x{e}",
+        }
+
+    def episode_from_id(self, id_: str) -> Dict[str, Any]:
+        match = re.fullmatch(r"episode(\d+)x(\d+)", id_.rsplit(":", 1)[-1])
+        if match is None:
+            return None
+        s, e = map(int, match.groups())
+        if s >= self.n_shows or e >= self.episodes_per_show:
+            return None
+        return self.episode(s, e)
+
+
+def _endpoint(endpoint: str) -> Callable:
+    """Serve a FakeSpotify method as a request to an endpoint class: counted,
+    delayed by the injected latency and recorded into the current profile"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return self._request(
+                endpoint, func.__name__, lambda: func(self, *args, **kwargs)
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _not_found(kind: str, id_: str) -> SpotifyException:
+    return SpotifyException(404, -1, f"{kind} {id_} not found")
+
+
+class FakeSpotify:
+    """Offline stand-in for ExtendedSpotify, serving a synthetic catalog. The
+    playlists of the user can be edited, their snapshot ID changing with every edit.
+
+    Args:
+        catalog (SyntheticCatalog, optional): Catalog served. Defaults to a catalog
+            of 1000 tracks.
+        latency (float, optional): Delay of each call, in seconds. Defaults to 0.
+        scheduler (RequestScheduler, optional): Scheduler pacing the calls, see
+            throttle. Defaults to None (calls are not paced).
+    """
+
+    user_id = "fake_user"
+
+    def __init__(
+        self, catalog: SyntheticCatalog = None, latency: float = 0.0, scheduler=None
+    ):
+        self.catalog = catalog if catalog is not None else SyntheticCatalog()
+        self.latency = latency
+        self.scheduler = scheduler
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+        self._playlists = {
+            f"playlist{p}": {
+                "name": f"Playlist {p}",
+                "version": 0,
+                "items": [
+                    ("track", f"track{i}")
+                    for i in self.catalog.playlist_track_indices(p)
+                ],
+            }
+            for p in range(self.catalog.n_playlists)
+        }
+        # Tracks saved since the start, with their "added_at", most recent first
+        self._newly_saved = []
+
+    @property
+    def n_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def _request(self, endpoint: str, method: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls[method] += 1
+
+        def request():
+            start = time.perf_counter()
+            if self.latency:
+                time.sleep(self.latency)
+            try:
+                return func()
+            finally:
+                profiling.record_request(
+                    endpoint, time.perf_counter() - start, n_bytes=0
+                )
+
+        if self.scheduler is not None:
+            return self.scheduler.call(endpoint, request)
+        return request()
+
+    def _page(
+        self,
+        method: str,
+        items: List[Any],
+        total: int,
+        limit: int,
+        offset: int,
+        **params,
+    ) -> Dict[str, Any]:
+        """Page of results, whose "next" link is replayed by next()"""
+        return {
+            "items": items,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next": (
+                json.dumps(
+                    {
+                        "method": method,
+                        "limit": limit,
+                        "offset": offset + limit,
+                        **params,
+                    }
+                )
+                if offset + limit < total
+                else None
+            ),
+        }
+
+    def next(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if not result.get("next"):
+            return None
+        params = json.loads(result["next"])
+        return getattr(self, params.pop("method"))(**params)
+
+    def _track_index(self, track_id: str) -> int:
+        i = _index(track_id, "track")
+        return i if i is not None and i < self.catalog.n_tracks else None
+
+    def _album_index(self, album_id: str) -> int:
+        j = _index(album_id, "album")
+        return j if j is not None and j < self.catalog.n_albums else None
+
+    def _artist_index(self, artist_id: str) -> int:
+        k = _index(artist_id, "artist")
+        return k if k is not None and k < self.catalog.n_artists else None
+
+    def _show_index(self, show_id: str) -> int:
+        s = _index(show_id, "show")
+        return s if s is not None and s < self.catalog.n_shows else None
+
+    # Tracks, albums and artists
+    @_endpoint("tracks")
+    def track(self, track_id: str, market: str = None) -> Dict[str, Any]:
+        i = self._track_index(track_id)
+        if i is None:
+            raise _not_found("track", track_id)
+        return self.catalog.track(i)
+
+    @_endpoint("tracks")
+    def tracks(self, tracks: List[str], market: str = None) -> Dict[str, Any]:
+        indices = [self._track_index(track_id) for track_id in tracks]
+        return {
+            "tracks": [None if i is None else self.catalog.track(i) for i in indices]
+        }
+
+    @_endpoint("audio-features")
+    def audio_features(self, tracks: List[str] = []) -> List[Dict[str, Any]]:
+        indices = [self._track_index(track_id) for track_id in tracks]
+        return [None if i is None else self.catalog.audio_features(i) for i in indices]
+
+    @_endpoint("albums")
+    def albums(self, albums: List[str], market: str = None) -> Dict[str, Any]:
+        indices = [self._album_index(album_id) for album_id in albums]
+        return {
+            "albums": [None if j is None else self.catalog.album(j) for j in indices]
+        }
+
+    @_endpoint("albums")
+    def album_tracks(
+        self, album_id: str, limit: int = 50, offset: int = 0, market: str = None
+    ) -> Dict[str, Any]:
+        j = self._album_index(album_id)
+        if j is None:
+            raise _not_found("album", album_id)
+        indices = self.catalog.album_track_indices(j)
+        items = [
+            self.catalog.simplified_track(i) for i in indices[offset : offset + limit]
+        ]
+        return self._page(
+            "album_tracks", items, len(indices), limit, offset, album_id=album_id
+        )
+
+    @_endpoint("artists")
+    def artists(self, artists: List[str]) -> Dict[str, Any]:
+        indices = [self._artist_index(artist_id) for artist_id in artists]
+        return {
+            "artists": [None if k is None else self.catalog.artist(k) for k in indices]
+        }
+
+    @_endpoint("artists")
+    def artist_top_tracks(self, artist_id: str, country: str = "US") -> Dict[str, Any]:
+        k = self._artist_index(artist_id)
+        if k is None:
+            raise _not_found("artist", artist_id)
+        return {
+            "tracks": [
+                self.catalog.track(i) for i in self.catalog.artist_top_track_indices(k)
+            ]
+        }
+
+    @_endpoint("artists")
+    def artist_related_artists(self, artist_id: str) -> Dict[str, Any]:
+        k = self._artist_index(artist_id)
+        if k is None:
+            raise _not_found("artist", artist_id)
+        return {
+            "artists": [
+                self.catalog.artist(other)
+                for other in self.catalog.related_artist_indices(k)
+            ]
+        }
+
+    @_endpoint("artists")
+    def artist_albums(
+        self,
+        artist_id: str,
+        album_type: str = None,
+        include_groups: str = None,
+        country: str = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        k = self._artist_index(artist_id)
+        if k is None:
+            raise _not_found("artist", artist_id)
+        # Synthetic albums are all of the "album" type
+        indices = (
+            self.catalog.artist_album_indices(k)
+            if album_type in (None, "album")
+            else []
+        )
+        items = [
+            self.catalog.simplified_album(j) for j in indices[offset : offset + limit]
+        ]
+        return self._page(
+            "artist_albums",
+            items,
+            len(indices),
+            limit,
+            offset,
+            artist_id=artist_id,
+            album_type=album_type,
+        )
+
+    # Search and recommendations
+    @_endpoint("search")
+    def search(
+        self,
+        q: str,
+        limit: int = 10,
+        offset: int = 0,
+        type: str = "track",
+        market: str = None,
+    ) -> Dict[str, Any]:
+        catalog = self.catalog
+        kinds = {
+            "artist": (catalog.n_artists, catalog.artist),
+            "album": (catalog.n_albums, catalog.album),
+            "track": (catalog.n_tracks, catalog.track),
+            "show": (catalog.n_shows, catalog.show),
+        }
+        n, build = kinds[type]
+
+        # An exact name, e.g. "Artist 12", is the only result. Otherwise, names
+        # containing the query are results.
+        query = q.lower().strip()
+        match = re.fullmatch(rf"{type} (\d+)", query)
+        if match and int(match.group(1)) < n:
+            indices = [int(match.group(1))]
+        else:
+            matches = (index for index in range(n) if query in f"{type} {index}")
+            indices = [index for _, index in zip(range(offset + limit), matches)]
+
+        items = [build(index) for index in indices[offset : offset + limit]]
+        return {f"{type}s": {"items": items, "limit": limit, "offset": offset}}
+
+    @_endpoint("recommendations")
+    def recommendations(
+        self,
+        seed_artists: List[str] = None,
+        seed_genres: List[str] = None,
+        seed_tracks: List[str] = None,
+        limit: int = 20,
+        country: str = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        artist_indices = [
+            k
+            for genre in seed_genres or []
+            for k in self.catalog.artists_by_genre.get(genre, [])
+        ]
+        artist_indices += [
+            k for k in map(self._artist_index, seed_artists or []) if k is not None
+        ]
+
+        track_indices = []
+        for k in artist_indices:
+            track_indices += self.catalog.artist_top_track_indices(k)[:2]
+            if len(track_indices) >= limit:
+                break
+
+        return {"tracks": [self.catalog.track(i) for i in track_indices[:limit]]}
+
+    # User library
+    @_endpoint("me")
+    def me(self) -> Dict[str, Any]:
+        return {"id": self.user_id, "display_name": "Fake user", "type": "user"}
+
+    @_endpoint("me/tracks")
+    def current_user_saved_tracks(
+        self, limit: int = 20, offset: int = 0, market: str = None
+    ) -> Dict[str, Any]:
+        saved = self.catalog.saved_track_indices
+        with self._lock:
+            newly_saved = list(self._newly_saved)
+        total = len(newly_saved) + len(saved)
+
+        items = []
+        for position in range(offset, min(offset + limit, total)):
+            if position < len(newly_saved):
+                added_at, i = newly_saved[position]
+            else:
+                position -= len(newly_saved)
+                added_at, i = self.catalog.saved_at(position), saved[position]
+            items.append({"added_at": added_at, "track": self.catalog.track(i)})
+
+        return self._page("current_user_saved_tracks", items, total, limit, offset)
+
+    @_endpoint("me/tracks")
+    def current_user_saved_tracks_add(self, tracks: List[str] = None) -> None:
+        indices = [self._track_index(id_.rsplit(":", 1)[-1]) for id_ in tracks or []]
+        with self._lock:
+            # Saved after any other track, the last one listed being the most recent
+            added_at = self.catalog.saved_at(-len(self._newly_saved) - 1)
+            self._newly_saved[:0] = [
+                (added_at, i) for i in reversed(indices) if i is not None
+            ]
+
+    @_endpoint("me/top")
+    def current_user_top_tracks(
+        self, limit: int = 20, offset: int = 0, time_range: str = "medium_term"
+    ) -> Dict[str, Any]:
+        rng = self.catalog._rng(f"top_{time_range}", 0)
+        indices = rng.sample(
+            range(self.catalog.n_tracks), min(50, self.catalog.n_tracks)
+        )
+        items = [self.catalog.track(i) for i in indices[offset : offset + limit]]
+        return self._page(
+            "current_user_top_tracks",
+            items,
+            len(indices),
+            limit,
+            offset,
+            time_range=time_range,
+        )
+
+    @_endpoint("me/playlists")
+    def current_user_playlists(
+        self, limit: int = 50, offset: int = 0
+    ) -> Dict[str, Any]:
+        with self._lock:
+            items = [
+                {
+                    "id": playlist_id,
+                    "name": playlist["name"],
+                    "snapshot_id": self._snapshot_id(playlist_id),
+                    "tracks": {"total": len(playlist["items"])},
+                    "type": "playlist",
+                }
+                for playlist_id, playlist in self._playlists.items()
+            ]
+        return self._page(
+            "current_user_playlists",
+            items[offset : offset + limit],
+            len(items),
+            limit,
+            offset,
+        )
+
+    # Playlists
+    def _snapshot_id(self, playlist_id: str) -> str:
+        return f"{playlist_id}-v{self._playlists[playlist_id]['version']}"
+
+    def _playlist(self, playlist_id: str) -> Dict[str, Any]:
+        playlist_id = playlist_id.rsplit(":", 1)[-1]
+        if playlist_id not in self._playlists:
+            raise _not_found("playlist", playlist_id)
+        return self._playlists[playlist_id]
+
+    def _edited(self, playlist_id: str) -> Dict[str, Any]:
+        playlist = self._playlist(playlist_id)
+        playlist["version"] += 1
+        return {"snapshot_id": self._snapshot_id(playlist_id.rsplit(":", 1)[-1])}
+
+    def _item(self, item_type: str, id_: str) -> Dict[str, Any]:
+        if item_type == "episode":
+            return self.catalog.episode_from_id(id_)
+        i = self._track_index(id_)
+        return None if i is None else self.catalog.track(i)
+
+    @_endpoint("playlists")
+    def playlist(
+        self,
+        playlist_id: str,
+        fields: str = None,
+        market: str = None,
+        additional_types=("track",),
+    ) -> Dict[str, Any]:
+        with self._lock:
+            playlist = self._playlist(playlist_id)
+            playlist_id = playlist_id.rsplit(":", 1)[-1]
+            return {
+                "id": playlist_id,
+                "name": playlist["name"],
+                "snapshot_id": self._snapshot_id(playlist_id),
+                "tracks": {"total": len(playlist["items"])},
+                "type": "playlist",
+            }
+
+    @_endpoint("playlists")
+    def playlist_items(
+        self,
+        playlist_id: str,
+        fields: str = None,
+        limit: int = 100,
+        offset: int = 0,
+        market: str = None,
+        additional_types=("track", "episode"),
+    ) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._playlist(playlist_id)["items"])
+
+        items = [
+            {"added_at": str(self.catalog.today), "track": self._item(item_type, id_)}
+            for item_type, id_ in entries[offset : offset + limit]
+        ]
+        return self._page(
+            "playlist_items",
+            items,
+            len(entries),
+            limit,
+            offset,
+            playlist_id=playlist_id,
+        )
+
+    @_endpoint("users")
+    def user_playlist_create(
+        self,
+        user: str,
+        name: str,
+        public: bool = True,
+        collaborative: bool = False,
+        description: str = "",
+    ) -> Dict[str, Any]:
+        with self._lock:
+            playlist_id = f"playlist{len(self._playlists)}"
+            while playlist_id in self._playlists:
+                playlist_id += "x"
+            self._playlists[playlist_id] = {"name": name, "version": 0, "items": []}
+        return {"id": playlist_id, "name": name, "type": "playlist"}
+
+    @_endpoint("playlists")
+    def playlist_add_items(
+        self,
+        playlist_id: str,
+        items: List[str],
+        item_type: str = "track",
+        position: int = None,
+    ) -> Dict[str, Any]:
+        entries = [(item_type, id_.rsplit(":", 1)[-1]) for id_ in items]
+        with self._lock:
+            playlist = self._playlist(playlist_id)
+            position = len(playlist["items"]) if position is None else position
+            playlist["items"][position:position] = entries
+            return self._edited(playlist_id)
+
+    def _remove_items(
+        self, playlist_id: str, item_type: str, items: List[str]
+    ) -> Dict[str, Any]:
+        ids = {id_.rsplit(":", 1)[-1] for id_ in items}
+        with self._lock:
+            playlist = self._playlist(playlist_id)
+            playlist["items"] = [
+                entry
+                for entry in playlist["items"]
+                if not (entry[0] == item_type and entry[1] in ids)
+            ]
+            return self._edited(playlist_id)
+
+    @_endpoint("playlists")
+    def playlist_remove_all_occurrences_of_items(
+        self, playlist_id: str, items: List[str], snapshot_id: str = None
+    ) -> Dict[str, Any]:
+        return self._remove_items(playlist_id, "track", items)
+
+    @_endpoint("playlists")
+    def playlist_remove_episodes(
+        self, playlist_id: str, items: List[str]
+    ) -> Dict[str, Any]:
+        return self._remove_items(playlist_id, "episode", items)
+
+    @_endpoint("playlists")
+    def playlist_change_details(
+        self,
+        playlist_id: str,
+        name: str = None,
+        public: bool = None,
+        collaborative: bool = None,
+        description: str = None,
+    ) -> None:
+        with self._lock:
+            playlist = self._playlist(playlist_id)
+            if name is not None:
+                playlist["name"] = name
+            if description is not None:
+                playlist["description"] = description
+            self._edited(playlist_id)
+
+    # Shows
+    @_endpoint("shows")
+    def show(self, show_id: str, market: str = None) -> Dict[str, Any]:
+        s = self._show_index(show_id)
+        if s is None:
+            raise _not_found("show", show_id)
+        return self.catalog.show(s)
+
+    @_endpoint("shows")
+    def shows(self, shows: List[str], market: str = None) -> Dict[str, Any]:
+        indices = [self._show_index(show_id) for show_id in shows]
+        return {"shows": [None if s is None else self.catalog.show(s) for s in indices]}
+
+    @_endpoint("shows")
+    def show_episodes(
+        self, show_id: str, limit: int = 50, offset: int = 0, market: str = None
+    ) -> Dict[str, Any]:
+        s = self._show_index(show_id)
+        if s is None:
+            raise _not_found("show", show_id)
+        n_episodes = self.catalog.episodes_per_show
+        items = [
+            self.catalog.episode(s, e)
+            for e in range(offset, min(n_episodes, offset + limit))
+        ]
+        return self._page(
+            "show_episodes", items, n_episodes, limit, offset, show_id=show_id
+        )
+
+
+@contextmanager
+def offline_spotify(sp: FakeSpotify = None) -> Iterator[FakeSpotify]:
+    """Serve the collections' requests with an offline client
+
+    Args:
+        sp (FakeSpotify, optional): Client. Defaults to a FakeSpotify over the
+            default catalog.
+
+    Yields:
+        FakeSpotify: Client
+    """
+    from .collections import TrackCollection
+
+    sp = sp if sp is not None else FakeSpotify()
+    previous = TrackCollection.__dict__["sp"]
+    TrackCollection.sp = sp
+    try:
+        yield sp
+    finally:
+        TrackCollection.sp = previous
@@ -0,0 +1,143 @@
+"""
+    This module holds the cache memoizing the items of track collections
+"""
+
+# Standard library imports
+import uuid
+import weakref
+import threading
+from typing import Any
+from typing import List
+from typing import Iterable
+from typing import Iterator
+from dataclasses import dataclass
+
+# Third party imports
+
+# Local imports
+import spotify_flows.database as database
+
+# Main body
+@dataclass
+class SpillSettings:
+    """Bound on the number of items an ItemCache holds in memory. Beyond it, items
+    are spilled to the item_cache table of the database (if one is set)."""
+
+    max_items: int = None
+    db: database.SpotifyDatabase = None
+
+    def is_enabled(self) -> bool:
+        return self.max_items is not None and self.db is not None
+
+
+spill_settings = SpillSettings()
+
+
+def configure_item_cache(max_items: int = None, db: database.SpotifyDatabase = None):
+    """Set the number of items an ItemCache holds in memory before spilling them
+
+    Args:
+        max_items (int, optional): Maximum number of items in memory, per cache.
+            Defaults to None (no limit).
+        db (database.SpotifyDatabase, optional): Database receiving spilled items.
+            Defaults to None (keep the database already set).
+    """
+    spill_settings.max_items = max_items
+    if db is not None:
+        spill_settings.db = db
+
+
+class ItemCache:
+    """Memoized iterable over a source of items. The source is only consumed as far
+    as the iterators require it, and only once: items are stored as they arrive and
+    every iterator, including concurrent ones, reads from the same buffer.
+
+    Args:
+        source (Iterable[Any]): Items to memoize
+        spill (SpillSettings, optional): Memory bound. Defaults to the module's
+            spill settings.
+    """
+
+    def __init__(self, source: Iterable[Any], spill: SpillSettings = None):
+        self._lock = threading.RLock()
+        self._spill = spill if spill is not None else spill_settings
+        self._cache_id = uuid.uuid4().hex
+        self._n_spilled = 0
+
+        if isinstance(source, (list, tuple)):
+            # Nothing left to compute
+            self._buffer = list(source)
+            self._source = None
+        else:
+            self._buffer = []
+            self._source = iter(source)
+
+    @property
+    def is_exhausted(self) -> bool:
+        return self._source is None
+
+    def __len__(self) -> int:
+        """Number of items computed so far"""
+        return self._n_spilled + len(self._buffer)
+
+    def __iter__(self) -> Iterator[Any]:
+        position = 0
+        while True:
+            if position < self._n_spilled:
+                items = self._read_spilled(position)
+                yield from items
+                position += len(items)
+                continue
+
+            with self._lock:
+                if position >= len(self) and not self._fill():
+                    return
+
+                if position < self._n_spilled:
+                    continue
+
+                item = self._buffer[position - self._n_spilled]
+
+            yield item
+            position += 1
+
+    def _fill(self) -> bool:
+        """Pull the next item from the source. Must be called with the lock held.
+
+        Returns:
+            bool: False if the source is exhausted
+        """
+        if self._source is None:
+            return False
+
+        try:
+            item = next(self._source)
+        except StopIteration:
+            self._source = None
+            return False
+
+        self._buffer.append(item)
+
+        if self._spill.is_enabled() and len(self._buffer) >= self._spill.max_items:
+            self._spill_buffer()
+
+        return True
+
+    def _spill_buffer(self) -> None:
+        db = self._spill.db
+        if not self._n_spilled:
+            # Spilled items are dropped along with the cache
+            weakref.finalize(self, db.drop_spilled_items, cache_id=self._cache_id)
+
+        db.spill_items(
+            cache_id=self._cache_id, start=self._n_spilled, items=self._buffer
+        )
+        self._n_spilled += len(self._buffer)
+        self._buffer = []
+
+    def _read_spilled(self, position: int) -> List[Any]:
+        return self._spill.db.spilled_items(
+            cache_id=self._cache_id,
+            start=position,
+            n=min(self._spill.max_items, self._n_spilled - position),
+        )
@@ -4,6 +4,7 @@
 
 # Standard library imports
 import os
+import threading
 from typing import Any
 from typing import Callable
 from functools import wraps
@@ -39,6 +40,28 @@ def login(scope: str) -> ExtendedSpotify:
     return ExtendedSpotify(auth_manager=sp_oauth)
 
 
+class LazyLogin:
+    """Spotify client of a class, logged in on first use rather than when the class
+    is defined. Assigning another client to the class attribute (e.g. an offline
+    stand-in) replaces it.
+
+    Args:
+        scope (str): Scope for the connection
+    """
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self._sp = None
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner) -> ExtendedSpotify:
+        if self._sp is None:
+            with self._lock:
+                if self._sp is None:
+                    self._sp = login(scope=self.scope)
+        return self._sp
+
+
 def login_if_missing(scope: str) -> Callable[[Callable[[ExtendedSpotify], Any]], Any]:
     def decorator(func):
         @wraps(func)
@@ -0,0 +1,130 @@
+"""
+    This module holds the helpers used to iterate over paginated API results
+"""
+
+# Standard library imports
+import itertools
+from collections import deque
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Callable
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+# Third party imports
+
+# Local imports
+from .classes import ExtendedSpotify
+from .throttle import with_request_priority
+
+# Main body
+def iter_pages(
+    sp: ExtendedSpotify, first_page: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over pages of results by following their "next" links. Each page is
+    only requested once the previous one has been consumed.
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        first_page (Dict[str, Any]): First page of results
+
+    Yields:
+        Dict[str, Any]: Pages of results
+    """
+    page = first_page
+    while page:
+        yield page
+        page = sp.next(page) if page.get("next") else None
+
+
+def iter_items(sp: ExtendedSpotify, first_page: Dict[str, Any]) -> Iterator[Any]:
+    """Iterate over the items of paginated results, following "next" links
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        first_page (Dict[str, Any]): First page of results
+
+    Yields:
+        Any: Items, as each page arrives
+    """
+    for page in iter_pages(sp, first_page):
+        yield from page.get("items")
+
+
+def iter_offset_pages(
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    limit: int = 50,
+    parallel: bool = False,
+    max_workers: int = 4,
+) -> Iterator[List[Any]]:
+    """Iterate over the pages of an offset/limit endpoint. When the first page holds
+    the total number of items, the remaining pages can be requested concurrently, with
+    at most max_workers requests in flight; they are still yielded in order.
+
+    Args:
+        fetch_page (Callable[[int, int], Dict[str, Any]]): Function requesting a page,
+            given its offset and limit
+        limit (int, optional): Page size. Defaults to 50.
+        parallel (bool, optional): Whether to request pages concurrently. Defaults to
+            False.
+        max_workers (int, optional): Number of concurrent requests. Defaults to 4.
+
+    Yields:
+        List[Any]: Items of each page
+    """
+    first_page = fetch_page(0, limit)
+    items = first_page.get("items")
+    yield items
+
+    total = first_page.get("total")
+
+    if total is None:
+        offset = len(items)
+        while len(items) == limit:
+            items = fetch_page(offset, limit).get("items")
+            offset += len(items)
+            yield items
+
+    elif parallel:
+        offsets = iter(range(limit, total, limit))
+        fetch_page = with_request_priority(fetch_page)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(
+                executor.submit(fetch_page, offset, limit)
+                for offset in itertools.islice(offsets, max_workers)
+            )
+
+            try:
+                while pending:
+                    page = pending.popleft().result()
+                    for offset in itertools.islice(offsets, 1):
+                        pending.append(executor.submit(fetch_page, offset, limit))
+                    yield page.get("items")
+
+            finally:
+                # Stop requesting pages when the consumer stops early
+                for future in pending:
+                    future.cancel()
+
+    else:
+        for offset in range(limit, total, limit):
+            yield fetch_page(offset, limit).get("items")
+
+
+def iter_offset_items(
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    limit: int = 50,
+    parallel: bool = False,
+    max_workers: int = 4,
+) -> Iterator[Any]:
+    """Iterate over the items of an offset/limit endpoint, see iter_offset_pages
+
+    Yields:
+        Any: Items, as each page arrives
+    """
+    for items in iter_offset_pages(
+        fetch_page, limit=limit, parallel=parallel, max_workers=max_workers
+    ):
+        yield from items
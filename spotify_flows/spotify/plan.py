@@ -0,0 +1,329 @@
+"""
+    This module holds the lazy query plans of chained track collection operations
+"""
+
+# Standard library imports
+import math
+import random
+import itertools
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterable
+from typing import FrozenSet
+from dataclasses import dataclass
+
+# Third party imports
+
+# Local imports
+from .predicates import Predicate
+from .sort_keys import SortKey, sort_items
+
+# Main body
+LISTING_FIELDS = frozenset({"id", "name", "popularity", "duration_ms"})
+"""Track fields available from listings (e.g. playlist items), before hydration"""
+
+HYDRATION_CALLS_PER_TRACK = 3
+"""Requests needed to hydrate a track: the track, its album and the album's artists"""
+
+AUDIO_FEATURES_BATCH_SIZE = 20
+
+DEFAULT_ESTIMATED_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Operation:
+    """Base class for the operations of a plan"""
+
+    @property
+    def needs(self) -> FrozenSet[str]:
+        """Item fields read by the operation, or None if unknown"""
+        return frozenset()
+
+    @property
+    def needs_audio_features(self) -> bool:
+        return self.needs is None or "audio_features" in self.needs
+
+    @property
+    def is_pushable(self) -> bool:
+        """Whether the operation can run on listed items, before hydration"""
+        return self.needs is not None and self.needs <= LISTING_FIELDS
+
+    def apply(self, items: Iterable[Any]) -> Iterable[Any]:
+        raise NotImplementedError
+
+    def estimate(self, n: int) -> int:
+        """Estimated number of items output, given the number of items input"""
+        return n
+
+
+@dataclass(frozen=True)
+class First(Operation):
+    n: int
+
+    def apply(self, items):
+        return itertools.islice(items, self.n)
+
+    def estimate(self, n):
+        return min(n, self.n)
+
+    def __str__(self):
+        return f"first({self.n})"
+
+
+@dataclass(frozen=True)
+class Random(Operation):
+    n: int
+
+    def apply(self, items):
+        all_items = list(items)
+        return random.sample(all_items, k=min(self.n, len(all_items)))
+
+    def estimate(self, n):
+        return min(n, self.n)
+
+    def __str__(self):
+        return f"random({self.n})"
+
+
+@dataclass(frozen=True)
+class Shuffle(Operation):
+    def apply(self, items):
+        all_items = list(items)
+        random.shuffle(all_items)
+        return all_items
+
+    def __str__(self):
+        return "shuffle()"
+
+
+@dataclass(frozen=True)
+class Sort(Operation):
+    keys: Tuple[SortKey, ...]
+    """Sort keys, most significant first"""
+
+    @property
+    def needs(self):
+        return frozenset(key.key_path.root for key in self.keys)
+
+    @property
+    def needs_audio_features(self):
+        return any(key.key_path.needs_audio_features for key in self.keys)
+
+    def apply(self, items):
+        return sort_items(items, self.keys)
+
+    def __str__(self):
+        return f"sort({', '.join(map(str, self.keys))})"
+
+
+@dataclass(frozen=True)
+class Filter(Operation):
+    predicate: Predicate
+
+    batch_size = 1000
+
+    @property
+    def needs(self):
+        return self.predicate.needs
+
+    def apply(self, items):
+        items = iter(items)
+        batch = list(itertools.islice(items, self.batch_size))
+
+        while batch:
+            mask = self.predicate.evaluate(batch)
+            yield from (item for item, keep in zip(batch, mask) if keep)
+            batch = list(itertools.islice(items, self.batch_size))
+
+    def __str__(self):
+        return f"filter({self.predicate})"
+
+
+def _rewrite(first: Operation, second: Operation) -> List[Operation]:
+    """Rewrite a pair of adjacent operations, returning None if no rule applies"""
+
+    # Fusion
+    if isinstance(first, Filter) and isinstance(second, Filter):
+        return [Filter(first.predicate & second.predicate)]
+
+    if isinstance(first, Sort) and isinstance(second, Sort):
+        return [Sort(second.keys + first.keys)]
+
+    if isinstance(first, First) and isinstance(second, First):
+        return [First(min(first.n, second.n))]
+
+    if isinstance(first, Random) and isinstance(second, (First, Random)):
+        return [Random(min(first.n, second.n))]
+
+    # Orderings discarded by what follows them
+    if isinstance(first, (Sort, Shuffle)) and isinstance(second, (Random, Shuffle)):
+        return [second]
+
+    if isinstance(first, Shuffle) and isinstance(second, First):
+        return [Random(second.n)]
+
+    # Filters commute with orderings, and reduce what they have to order
+    if isinstance(first, (Sort, Shuffle)) and isinstance(second, Filter):
+        return [second, first]
+
+    return None
+
+
+def optimize(operations: Iterable[Operation]) -> List[Operation]:
+    """Rewrite a sequence of operations into an equivalent, cheaper one
+
+    Args:
+        operations (Iterable[Operation]): Operations, in order of application
+
+    Returns:
+        List[Operation]: Optimized operations
+    """
+    ops = list(operations)
+
+    rewritten = True
+    while rewritten:
+        rewritten = False
+        for i in range(len(ops) - 1):
+            new_ops = _rewrite(ops[i], ops[i + 1])
+            if new_ops is not None:
+                ops[i : i + 2] = new_ops
+                rewritten = True
+                break
+
+    return ops
+
+
+def split_pushable(
+    operations: List[Operation]
+) -> Tuple[List[Operation], List[Operation]]:
+    """Split operations into those which can run before hydration, and the others
+
+    Args:
+        operations (List[Operation]): Optimized operations
+
+    Returns:
+        Tuple[List[Operation], List[Operation]]: Leading pushable operations, and the
+            remaining ones
+    """
+    n_pushed = 0
+    for op in operations:
+        if not op.is_pushable:
+            break
+        n_pushed += 1
+
+    return operations[:n_pushed], operations[n_pushed:]
+
+
+def apply_operations(
+    operations: Iterable[Operation],
+    items: Iterable[Any],
+    enrich: Callable[[Iterable[Any]], Iterable[Any]] = None,
+) -> Iterable[Any]:
+    """Apply operations to items
+
+    Args:
+        operations (Iterable[Operation]): Operations, in order of application
+        items (Iterable[Any]): Input items
+        enrich (Callable[[Iterable[Any]], Iterable[Any]], optional): Function adding
+            audio features to items, called once before the first operation needing
+            them. Defaults to None (items already hold their audio features).
+
+    Returns:
+        Iterable[Any]: Output items
+    """
+    for op in operations:
+        if enrich is not None and op.needs_audio_features:
+            items = enrich(items)
+            enrich = None
+        items = op.apply(items)
+
+    return items
+
+
+@dataclass
+class CostModel:
+    """Number of API requests needed to read a collection's source
+
+    Args:
+        listing_page_size (int): Items per request when listing the source, or None
+            if the source cannot be listed before hydration
+        fetch_calls (Callable[[int], int]): Requests needed to fetch n items fully
+    """
+
+    listing_page_size: int = None
+    fetch_calls: Callable[[int], int] = lambda n: 0
+
+
+def explain(
+    source_name: str,
+    operations: List[Operation],
+    cost_model: CostModel,
+    size: int = None,
+    enriched: bool = False,
+) -> str:
+    """Describe how a plan is executed, with the estimated number of API requests
+
+    Args:
+        source_name (str): Description of the source collection
+        operations (List[Operation]): Operations, in order of application
+        cost_model (CostModel): Cost of reading the source
+        size (int, optional): Number of items of the source. Defaults to None
+            (assumed to be DEFAULT_ESTIMATED_SIZE).
+        enriched (bool, optional): Whether the source items hold their audio
+            features. Defaults to False.
+
+    Returns:
+        str: Plan description
+    """
+
+    def features_calls(n):
+        return math.ceil(n / AUDIO_FEATURES_BATCH_SIZE)
+
+    def run(ops, n, enriched):
+        steps, calls = [], 0
+        for op in ops:
+            if not enriched and op.needs_audio_features:
+                calls += features_calls(n)
+                steps.append((f"add audio features of {n} tracks", features_calls(n)))
+                enriched = True
+            n = op.estimate(n)
+            steps.append((str(op), 0))
+        return steps, calls, n
+
+    assumed = size is None
+    n = DEFAULT_ESTIMATED_SIZE if assumed else size
+
+    optimized = optimize(operations)
+    pushed, remaining = split_pushable(optimized)
+
+    # Unoptimized: fetch everything, then apply the operations as written
+    _, naive_calls, _ = run(operations, n, enriched)
+    naive_calls += cost_model.fetch_calls(n)
+
+    steps = []
+    if cost_model.listing_page_size and pushed:
+        listing_calls = math.ceil(n / cost_model.listing_page_size)
+        steps.append((f"list {n} tracks", listing_calls))
+        pushed_steps, _, n_hydrated = run(pushed, n, True)
+        steps += [(f"{step} [before hydration]", c) for step, c in pushed_steps]
+        hydration_calls = HYDRATION_CALLS_PER_TRACK * n_hydrated
+        steps.append((f"hydrate {n_hydrated} tracks", hydration_calls))
+        remaining_steps, remaining_calls, _ = run(remaining, n_hydrated, enriched)
+        steps += remaining_steps
+        total_calls = listing_calls + hydration_calls + remaining_calls
+    else:
+        steps.append((f"fetch {n} tracks", cost_model.fetch_calls(n)))
+        remaining_steps, remaining_calls, _ = run(optimized, n, enriched)
+        steps += remaining_steps
+        total_calls = cost_model.fetch_calls(n) + remaining_calls
+
+    lines = [f"{source_name} ({f'~{n} tracks, assumed' if assumed else f'{n} tracks'})"]
+    for step, calls in steps:
+        lines.append(f"  -> {step:<50} {calls:>6} calls" if calls else f"  -> {step}")
+    lines.append(
+        f"Estimated API calls: {total_calls} (without optimization: {naive_calls})"
+    )
+
+    return "\n".join(lines)
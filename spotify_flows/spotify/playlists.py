@@ -3,6 +3,8 @@
 """
 
 # Standard library imports
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import Union
 
@@ -12,11 +14,31 @@ import copy
 # Local imports
 from .login import login_if_missing
 from .classes import ExtendedSpotify
+from .resolution import resolution_cache
+from .pagination import iter_items
+from .pagination import iter_offset_items
 from .tracks import read_track_from_id
 from .data_structures import TrackItem
 from .data_structures import EpisodeItem
 
 # Main body
+@login_if_missing(scope="playlist-read-private")
+def get_user_playlists(sp: ExtendedSpotify) -> Dict[str, str]:
+    """Get all of the user's playlists, across every page of results
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+
+    Returns:
+        Dict[str, str]: Playlist ID per playlist name
+    """
+    playlists = {}
+    for playlist in iter_items(sp, sp.current_user_playlists(limit=50)):
+        playlists.setdefault(playlist["name"], playlist["id"])
+
+    return playlists
+
+
 @login_if_missing(scope="playlist-read-private playlist-modify-private")
 def get_playlist_id(sp: ExtendedSpotify, *, playlist_name: str) -> str:
     """Get ID of playlist matching the given name
@@ -28,12 +50,9 @@ def get_playlist_id(sp: ExtendedSpotify, *, playlist_name: str) -> str:
     Returns:
         str: Playlist ID
     """
-    playlists = {
-        playlist["name"]: playlist["id"]
-        for playlist in sp.current_user_playlists(limit=50).get("items")
-    }
-
-    return playlists[playlist_name]
+    return resolution_cache.resolve_playlist(
+        name=playlist_name, list_func=lambda: get_user_playlists(sp=sp)
+    )
 
 
 def import_items_to_playlist(
@@ -74,8 +93,10 @@ def make_new_playlist(
     try:
         playlist_id = get_playlist_id(sp, playlist_name=playlist_name)
     except KeyError as e:
-        sp.user_playlist_create(user=sp.me()["id"], name=playlist_name)
-        playlist_id = get_playlist_id(sp=sp, playlist_name=playlist_name)
+        playlist_id = sp.user_playlist_create(user=sp.me()["id"], name=playlist_name)[
+            "id"
+        ]
+        resolution_cache.store_playlist(name=playlist_name, id_=playlist_id)
 
     wipe_playlist(sp=sp, playlist_id=playlist_id)
     import_items_to_playlist(sp=sp, items=list(items), playlist_id=playlist_id)
@@ -83,42 +104,115 @@ def make_new_playlist(
 
 
 @login_if_missing(scope="playlist-read-private")
-def get_playlist_tracks(sp: ExtendedSpotify, *, playlist_id: str) -> List[TrackItem]:
-    """Retrieve list of tracks in a given playlist
+def get_playlist_snapshot_id(sp: ExtendedSpotify, *, playlist_id: str) -> str:
+    """Get the snapshot ID of a playlist, which changes with every edit
 
     Args:
         sp (ExtendedSpotify): Spotify object
         playlist_id (str): Playlist ID
 
     Returns:
-        List[TrackItem]: List of tracks within playlist
+        str: Snapshot ID
     """
+    return sp.playlist(playlist_id, fields="snapshot_id")["snapshot_id"]
+
 
-    all_track_ids = []
-    loaded_track_ids = []
-    offset = 0
-    limit = 50
+@login_if_missing(scope="playlist-read-private")
+def get_playlist_track_ids(
+    sp: ExtendedSpotify, *, playlist_id: str, parallel: bool = False
+) -> List[str]:
+    """Retrieve the IDs of the tracks in a given playlist, without their details
 
-    def load_track_ids(offset):
-        tracks = sp.playlist_items(
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        playlist_id (str): Playlist ID
+        parallel (bool, optional): Whether to request pages concurrently. Defaults to
+            False.
+
+    Returns:
+        List[str]: Track IDs, in playlist order
+    """
+    items = iter_offset_items(
+        lambda offset, limit: sp.playlist_items(
             playlist_id,
             offset=offset,
             limit=limit,
-            fields="items.track",
+            fields="total,items.track.id",
             additional_types=["track"],
-        ).get("items")
-        return [item["track"]["id"] for item in tracks]
+        ),
+        limit=100,
+        parallel=parallel,
+    )
 
-    while True:
-        loaded_track_ids = load_track_ids(offset)
-        offset += len(loaded_track_ids)
-        all_track_ids = all_track_ids + loaded_track_ids
+    # Local files and unavailable tracks have no ID
+    return [item["track"]["id"] for item in items if (item["track"] or {}).get("id")]
 
-        if len(loaded_track_ids) < limit:
-            break
 
-    for track_id in all_track_ids:
-        yield read_track_from_id(sp=sp, track_id=track_id)
+@login_if_missing(scope="playlist-read-private")
+def get_playlist_track_listing(
+    sp: ExtendedSpotify, *, playlist_id: str, parallel: bool = False
+) -> List[Dict[str, Any]]:
+    """Retrieve the basic information (id, name, popularity, duration) of the tracks
+    in a given playlist, yielded as each page of the playlist arrives. Unlike
+    get_playlist_tracks, albums and artists are not requested.
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        playlist_id (str): Playlist ID
+        parallel (bool, optional): Whether to request pages concurrently. Defaults to
+            False.
+
+    Returns:
+        List[Dict[str, Any]]: Track data, in playlist order
+    """
+    items = iter_offset_items(
+        lambda offset, limit: sp.playlist_items(
+            playlist_id,
+            offset=offset,
+            limit=limit,
+            fields="total,items.track(id,name,popularity,duration_ms)",
+            additional_types=["track"],
+        ),
+        limit=100,
+        parallel=parallel,
+    )
+
+    for item in items:
+        if (item["track"] or {}).get("id"):
+            yield item["track"]
+
+
+@login_if_missing(scope="playlist-read-private")
+def get_playlist_tracks(
+    sp: ExtendedSpotify, *, playlist_id: str, parallel: bool = False
+) -> List[TrackItem]:
+    """Retrieve list of tracks in a given playlist, yielded as each page of the
+    playlist arrives
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        playlist_id (str): Playlist ID
+        parallel (bool, optional): Whether to request pages concurrently. Defaults to
+            False.
+
+    Returns:
+        List[TrackItem]: List of tracks within playlist
+    """
+
+    items = iter_offset_items(
+        lambda offset, limit: sp.playlist_items(
+            playlist_id,
+            offset=offset,
+            limit=limit,
+            fields="total,items.track.id",
+            additional_types=["track"],
+        ),
+        limit=50,
+        parallel=parallel,
+    )
+
+    for item in items:
+        yield read_track_from_id(sp=sp, track_id=item["track"]["id"])
 
 
 @login_if_missing(scope="playlist-modify-private")
@@ -130,20 +224,29 @@ def wipe_playlist(sp: ExtendedSpotify, *, playlist_id: str) -> None:
         playlist_id (str): Playlist ID
     """
 
-    all_items = sp.playlist_items(
-        playlist_id, offset=0, fields="items.track.id, items.track.type"
-    ).get("items")
+    all_items = list(
+        iter_offset_items(
+            lambda offset, limit: sp.playlist_items(
+                playlist_id,
+                offset=offset,
+                limit=limit,
+                fields="total,items.track.id,items.track.type",
+            ),
+            limit=100,
+        )
+    )
 
     tracks = [item for item in all_items if item["track"]["type"] == "track"]
     episodes = [item for item in all_items if item["track"]["type"] == "episode"]
 
-    if tracks:
-        track_ids = [track["track"]["id"] for track in tracks]
-        sp.playlist_remove_all_occurrences_of_items(playlist_id, list(set(track_ids)))
+    # Removals are limited to 100 items per request
+    track_ids = list({track["track"]["id"]: None for track in tracks})
+    for i in range(0, len(track_ids), 100):
+        sp.playlist_remove_all_occurrences_of_items(playlist_id, track_ids[i : i + 100])
 
-    if episodes:
-        episode_ids = [episode["track"]["id"] for episode in episodes]
-        sp.playlist_remove_episodes(playlist_id, list(set(episode_ids)))
+    episode_ids = list({episode["track"]["id"]: None for episode in episodes})
+    for i in range(0, len(episode_ids), 100):
+        sp.playlist_remove_episodes(playlist_id, episode_ids[i : i + 100])
 
 
 @login_if_missing(scope="playlist-modify-private playlist-modify-public")
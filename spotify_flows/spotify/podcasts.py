@@ -7,7 +7,9 @@ from typing import Any
 from typing import List
 from typing import Dict
 from typing import Union
+from typing import Iterator
 from pathlib import Path
+from datetime import datetime
 
 # Third party imports
 import yaml
@@ -15,9 +17,11 @@ import yaml
 # Local imports
 from .login import login_if_missing
 from .classes import ExtendedSpotify
+from .resolution import resolution_cache
+from .pagination import iter_offset_items
 from .playlists import wipe_playlist
 from .playlists import get_playlist_id
-from .data_structures import EpisodeItem
+from spotify_flows.utils.dates import date_parsing
 
 # Main body
 @login_if_missing(scope="user-read-playback-position")
@@ -46,19 +50,58 @@ def get_show_id(sp: ExtendedSpotify, *, query: str) -> str:
     Returns:
         str: Best matching show ID
     """
-    res = sp.search(q=query, type="show", limit=1).get("shows").get("items")
-    return res[0]["id"]
+
+    def search_func(query):
+        res = sp.search(q=query, type="show", limit=1).get("shows").get("items")
+        return [{"id": show["id"], "name": show["name"]} for show in res]
+
+    return resolution_cache.resolve(kind="show", query=query, search_func=search_func)
 
 
 @login_if_missing(scope="user-read-playback-position")
-def get_show_episodes(sp: ExtendedSpotify, *, show_id: str) -> List[EpisodeItem]:
-    """Get list of episodes for a given show
+def get_shows(sp: ExtendedSpotify, *, show_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get show data for several shows, 50 per request
 
     Args:
         sp (ExtendedSpotify): Spotify object
-        show_id (str): Show ID
+        show_ids (List[str]): Show IDs
 
     Returns:
-        List[EpisodeItem]: List of episode objects for the given show
+        List[Dict[str, Any]]: Data on each show (including its total_episodes)
+    """
+    shows = []
+    for i in range(0, len(show_ids), 50):
+        shows += sp.shows(show_ids[i : i + 50]).get("shows")
+
+    return [show for show in shows if show is not None]
+
+
+@login_if_missing(scope="user-read-playback-position")
+def get_show_episodes(
+    sp: ExtendedSpotify, *, show_id: str, since: datetime = None
+) -> Iterator[Dict[str, Any]]:
+    """Get the episodes of a given show, newest first, as each page arrives
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        show_id (str): Show ID
+        since (datetime, optional): Only episodes released at or after this date are
+            returned, and no page is requested past the first older episode. Defaults
+            to None (all episodes).
+
+    Yields:
+        Dict[str, Any]: Data on each episode of the given show
     """
-    yield from sp.show_episodes(show_id, limit=50, offset=0).get("items")
+    episodes = iter_offset_items(
+        lambda offset, limit: sp.show_episodes(show_id, limit=limit, offset=offset),
+        limit=50,
+    )
+
+    for episode in episodes:
+        if episode is None:
+            continue
+
+        if since is not None and date_parsing(episode["release_date"]) < since:
+            break
+
+        yield episode
@@ -0,0 +1,333 @@
+"""
+    This module holds the predicate expressions used to filter track collections
+"""
+
+# Standard library imports
+import operator
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterable
+from typing import FrozenSet
+from dataclasses import dataclass
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from .sort_keys import KeyPath, compile_key_path, is_missing
+
+# Main body
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class Predicate:
+    """Base class for predicates on items. Predicates are combined with & (and),
+    | (or) and ~ (not), e.g. (F.audio_features.energy > 0.6) & (F.popularity >= 50).
+    Note that comparisons must be parenthesized, as & binds tighter than them."""
+
+    @property
+    def needs(self) -> FrozenSet[str]:
+        """Item fields read by the predicate, or None if unknown"""
+        raise NotImplementedError
+
+    def evaluate(self, items: List[Any]) -> np.ndarray:
+        """Evaluate the predicate on a batch of items
+
+        Args:
+            items (List[Any]): Items
+
+        Returns:
+            np.ndarray: Boolean mask of the items satisfying the predicate
+        """
+        raise NotImplementedError
+
+    def to_sql(self, columns: Dict[str, str]) -> Tuple[str, List[Any]]:
+        """Translate the predicate into a SQL condition
+
+        Args:
+            columns (Dict[str, str]): SQL column per field path
+
+        Returns:
+            Tuple[str, List[Any]]: Condition and its parameters, or None if the
+                predicate cannot be translated
+        """
+        return None
+
+    def __call__(self, item: Any) -> bool:
+        return bool(self.evaluate([item])[0])
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(_flatten(And, (self, other)))
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(_flatten(Or, (self, other)))
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+def _flatten(cls: type, predicates: Iterable[Predicate]) -> Tuple[Predicate, ...]:
+    flat = []
+    for predicate in predicates:
+        if isinstance(predicate, cls):
+            flat.extend(predicate.predicates)
+        else:
+            flat.append(predicate)
+    return tuple(flat)
+
+
+def _values(key_path: KeyPath, items: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Values of a field over items, with the mask of missing values"""
+    getter = key_path.getter
+    values = [getter(item) for item in items]
+    missing = np.array([is_missing(value) for value in values], dtype=bool)
+
+    if key_path.is_numeric:
+        try:
+            return np.array(values, dtype=float), missing
+        except (TypeError, ValueError):
+            pass
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array, missing
+
+
+@dataclass(frozen=True)
+class Comparison(Predicate):
+    key_path: KeyPath
+    op: str
+    value: Any
+
+    @property
+    def needs(self):
+        return frozenset([self.key_path.root])
+
+    def evaluate(self, items):
+        values, missing = _values(self.key_path, items)
+        result = np.zeros(len(items), dtype=bool)
+        present = ~missing
+
+        if self.op == "isin":
+            result[present] = [value in self.value for value in values[present]]
+        elif self.op == "contains":
+            result[present] = [self.value in value for value in values[present]]
+        else:
+            result[present] = _OPERATORS[self.op](values[present], self.value)
+
+        return result
+
+    def to_sql(self, columns):
+        column = columns.get(self.key_path.path)
+        if column is None:
+            return None
+
+        values = self.value if self.op == "isin" else (self.value,)
+        if not all(isinstance(value, (int, float, str)) for value in values):
+            return None
+
+        if self.op == "isin":
+            condition = f"{column} IN ({', '.join(['?'] * len(values))})"
+        elif self.op == "contains":
+            condition = f"instr({column}, ?) > 0"
+        else:
+            condition = f"{column} {self.op} ?"
+
+        # Missing values (NULL) never satisfy a comparison, as in Python
+        return f"COALESCE({condition}, 0)", list(values)
+
+    def __str__(self):
+        return f"{self.key_path.path} {self.op} {self.value!r}"
+
+
+@dataclass(frozen=True)
+class And(Predicate):
+    predicates: Tuple[Predicate, ...]
+
+    @property
+    def needs(self):
+        return _union_needs(self.predicates)
+
+    def evaluate(self, items):
+        result = np.ones(len(items), dtype=bool)
+        for predicate in self.predicates:
+            result &= predicate.evaluate(items)
+        return result
+
+    def to_sql(self, columns):
+        return _join_sql(self.predicates, columns, " AND ")
+
+    def __str__(self):
+        return " & ".join(f"({predicate})" for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class Or(Predicate):
+    predicates: Tuple[Predicate, ...]
+
+    @property
+    def needs(self):
+        return _union_needs(self.predicates)
+
+    def evaluate(self, items):
+        result = np.zeros(len(items), dtype=bool)
+        for predicate in self.predicates:
+            result |= predicate.evaluate(items)
+        return result
+
+    def to_sql(self, columns):
+        return _join_sql(self.predicates, columns, " OR ")
+
+    def __str__(self):
+        return " | ".join(f"({predicate})" for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class Not(Predicate):
+    predicate: Predicate
+
+    @property
+    def needs(self):
+        return self.predicate.needs
+
+    def evaluate(self, items):
+        return ~self.predicate.evaluate(items)
+
+    def to_sql(self, columns):
+        sql = self.predicate.to_sql(columns)
+        if sql is None:
+            return None
+        return f"NOT ({sql[0]})", sql[1]
+
+    def __str__(self):
+        return f"~({self.predicate})"
+
+
+@dataclass(frozen=True)
+class Criteria(Predicate):
+    """Predicate wrapping a plain function of an item
+
+    Args:
+        func (Callable[[Any], bool]): Criteria function
+        fields (FrozenSet[str], optional): Item fields read by the function. Defaults
+            to None (unknown: any field, including audio features, may be read).
+    """
+
+    func: Callable[[Any], bool]
+    fields: FrozenSet[str] = None
+
+    @property
+    def needs(self):
+        return self.fields
+
+    def evaluate(self, items):
+        return np.array([bool(self.func(item)) for item in items], dtype=bool)
+
+    def __str__(self):
+        return getattr(self.func, "__name__", "criteria")
+
+
+def _union_needs(predicates: Iterable[Predicate]) -> FrozenSet[str]:
+    needs = frozenset()
+    for predicate in predicates:
+        if predicate.needs is None:
+            return None
+        needs |= predicate.needs
+    return needs
+
+
+def _join_sql(
+    predicates: Iterable[Predicate], columns: Dict[str, str], separator: str
+) -> Tuple[str, List[Any]]:
+    conditions, params = [], []
+    for predicate in predicates:
+        sql = predicate.to_sql(columns)
+        if sql is None:
+            return None
+        conditions.append(f"({sql[0]})")
+        params.extend(sql[1])
+    return separator.join(conditions), params
+
+
+class FieldRef:
+    """Reference to an item field, building predicates through comparisons. Fields are
+    reached as attributes of F, e.g. F.popularity or F.audio_features.energy, and are
+    validated against the data structures once compared."""
+
+    def __init__(self, path: str = ""):
+        self._path = path
+
+    def __getattr__(self, name: str) -> "FieldRef":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return FieldRef(f"{self._path}.{name}" if self._path else name)
+
+    def __repr__(self) -> str:
+        return f"F.{self._path}" if self._path else "F"
+
+    def _compare(self, op: str, value: Any) -> Comparison:
+        return Comparison(key_path=compile_key_path(self._path), op=op, value=value)
+
+    def __lt__(self, value):
+        return self._compare("<", value)
+
+    def __le__(self, value):
+        return self._compare("<=", value)
+
+    def __gt__(self, value):
+        return self._compare(">", value)
+
+    def __ge__(self, value):
+        return self._compare(">=", value)
+
+    def __eq__(self, value):
+        return self._compare("==", value)
+
+    def __ne__(self, value):
+        return self._compare("!=", value)
+
+    __hash__ = None
+
+    def isin(self, values: Iterable[Any]) -> Comparison:
+        return self._compare("isin", tuple(values))
+
+    def contains(self, text: str) -> Comparison:
+        return self._compare("contains", text)
+
+    def between(self, low: Any, high: Any) -> Predicate:
+        """Values within [low, high]"""
+        return (self >= low) & (self <= high)
+
+
+F = FieldRef()
+
+
+def as_predicate(
+    criteria: Callable[[Any], bool], needs: Iterable[str] = None
+) -> Predicate:
+    """Wrap filter criteria into a predicate
+
+    Args:
+        criteria (Callable[[Any], bool]): Predicate, or plain function of an item
+        needs (Iterable[str], optional): Item fields read by a plain function.
+            Defaults to None (unknown).
+
+    Returns:
+        Predicate: Predicate
+    """
+    if isinstance(criteria, Predicate):
+        return criteria
+
+    return Criteria(
+        func=criteria, fields=frozenset(needs) if needs is not None else None
+    )
@@ -0,0 +1,150 @@
+"""
+    This module holds the persistent cache used to resolve names into Spotify IDs
+"""
+
+# Standard library imports
+import logging
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Callable
+from datetime import timedelta
+from dataclasses import dataclass
+
+# Third party imports
+
+# Local imports
+import spotify_flows.database as database
+from spotify_flows.utils import profiling
+
+# Main body
+logger = logging.getLogger()
+
+
+@dataclass
+class ResolutionCache:
+    """Cache of name -> ID resolutions, stored in the resolutions table of the local
+    database. Without a database, every resolution goes to the API."""
+
+    db: database.SpotifyDatabase = None
+    ttl: timedelta = timedelta(days=30)
+    playlist_ttl: timedelta = timedelta(days=1)
+
+    def is_loaded(self) -> bool:
+        return self.db is not None
+
+    def resolve(
+        self, kind: str, query: str, search_func: Callable[[str], List[Dict[str, Any]]]
+    ) -> str:
+        """Resolve a search query into the ID of its best candidate
+
+        Args:
+            kind (str): Kind of object searched (artist, album, track, show)
+            query (str): Name query
+            search_func (Callable[[str], List[Dict[str, Any]]]): Function searching the
+                API for the query, returning candidates best first
+
+        Raises:
+            KeyError: If the search returns no candidate
+
+        Returns:
+            str: ID of the best candidate
+        """
+        key = query.lower().strip()
+
+        if self.is_loaded():
+            candidates = self.db.cached_resolutions(
+                kind=kind, query=key, max_age=self.ttl
+            )
+            if candidates:
+                profiling.record_cache("resolutions", hits=1)
+                return candidates[0]["id"]
+
+        profiling.record_cache("resolutions", misses=1)
+        logger.info(f"Resolving {kind} '{query}' via API")
+        candidates = search_func(query)
+        if not candidates:
+            raise KeyError(query)
+
+        if self.is_loaded():
+            self.db.store_resolutions(kind=kind, resolutions={key: candidates})
+
+        return candidates[0]["id"]
+
+    def resolve_playlist(
+        self, name: str, list_func: Callable[[], Dict[str, str]]
+    ) -> str:
+        """Resolve a playlist name into its ID. On a miss, the complete name -> ID map
+        of the user's playlists is reloaded and stored.
+
+        Args:
+            name (str): Playlist name
+            list_func (Callable[[], Dict[str, str]]): Function listing all of the user's
+                playlists as a name -> ID map
+
+        Raises:
+            KeyError: If the user has no playlist with that name
+
+        Returns:
+            str: Playlist ID
+        """
+        if self.is_loaded():
+            candidates = self.db.cached_resolutions(
+                kind="playlist", query=name, max_age=self.playlist_ttl
+            )
+            if candidates:
+                profiling.record_cache("playlist_resolutions", hits=1)
+                return candidates[0]["id"]
+
+        profiling.record_cache("playlist_resolutions", misses=1)
+        playlists = list_func()
+
+        if self.is_loaded():
+            self.db.store_resolutions(
+                kind="playlist",
+                resolutions={
+                    playlist_name: [{"id": playlist_id, "name": playlist_name}]
+                    for playlist_name, playlist_id in playlists.items()
+                },
+                replace_kind=True,
+            )
+
+        return playlists[name]
+
+    def store_playlist(self, name: str, id_: str) -> None:
+        """Record a playlist created by the application
+
+        Args:
+            name (str): Playlist name
+            id_ (str): Playlist ID
+        """
+        if self.is_loaded():
+            self.db.store_resolutions(
+                kind="playlist", resolutions={name: [{"id": id_, "name": name}]}
+            )
+
+    def invalidate(self, kind: str = None, query: str = None) -> None:
+        """Forget stored resolutions, e.g. after renaming or deleting a playlist
+
+        Args:
+            kind (str, optional): Only forget this kind. Defaults to None (all kinds).
+            query (str, optional): Only forget this query. Defaults to None.
+        """
+        if self.is_loaded():
+            if query is not None and kind != "playlist":
+                query = query.lower().strip()
+            self.db.invalidate_resolutions(kind=kind, query=query)
+
+
+resolution_cache = ResolutionCache()
+
+
+def init_resolution_cache(db_path: str) -> None:
+    """Store name resolutions in the given database
+
+    Args:
+        db_path (str): Path to the database file
+    """
+    db = database.SpotifyDatabase(db_path, op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+    resolution_cache.db = db
@@ -0,0 +1,212 @@
+"""
+    This module holds the compiler of the sort keys used by track collections
+"""
+
+# Standard library imports
+import math
+from operator import attrgetter
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterable
+from dataclasses import dataclass, fields, is_dataclass
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from .data_structures import TrackItem, EpisodeItem, AudioFeaturesItem
+
+# Main body
+MISSING_POLICIES = ("last", "first", "error")
+
+_NUMERIC_TYPES = (int, float)
+
+
+@dataclass(frozen=True)
+class KeyPath:
+    """Validated path to an item field, e.g. "audio_features.energy"
+
+    Args:
+        path (str): Dotted path
+        types (Tuple[type, ...]): Type of each field along the path
+    """
+
+    path: str
+    types: Tuple[type, ...]
+
+    @property
+    def root(self) -> str:
+        """Field of the item read by the path"""
+        return self.path.split(".")[0]
+
+    @property
+    def needs_audio_features(self) -> bool:
+        return self.types[0] is AudioFeaturesItem
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.types[-1] in _NUMERIC_TYPES
+
+    @property
+    def getter(self) -> Callable[[Any], Any]:
+        return attrgetter(self.path)
+
+
+def _resolve(path: str, schema: type) -> Tuple[type, ...]:
+    """Types of the fields along a path, or None if the schema has no such path"""
+    types = []
+    cls = schema
+
+    for name in path.split("."):
+        if not is_dataclass(cls):
+            return None
+
+        field_types = {field_.name: field_.type for field_ in fields(cls)}
+        if name not in field_types:
+            return None
+
+        cls = field_types[name]
+        types.append(cls)
+
+    return tuple(types)
+
+
+def compile_key_path(
+    path: str, schemas: Iterable[type] = (TrackItem, EpisodeItem)
+) -> KeyPath:
+    """Validate a dotted field path against the item data structures
+
+    Args:
+        path (str): Dotted path, e.g. "popularity" or "audio_features.energy"
+        schemas (Iterable[type], optional): Data structures the items can be.
+            Defaults to tracks and episodes.
+
+    Raises:
+        ValueError: If no data structure has a field at that path
+
+    Returns:
+        KeyPath: Compiled path
+    """
+    for schema in schemas:
+        types = _resolve(path, schema)
+        if types is not None:
+            return KeyPath(path=path, types=types)
+
+    valid_paths = sorted(
+        {
+            f"{field_.name}.{sub_field.name}"
+            if is_dataclass(field_.type)
+            else field_.name
+            for schema in schemas
+            for field_ in fields(schema)
+            for sub_field in (
+                fields(field_.type) if is_dataclass(field_.type) else [None]
+            )
+        }
+    )
+    raise ValueError(f"Unknown field '{path}'. Valid fields: {', '.join(valid_paths)}")
+
+
+def is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Sort criteria on an item field
+
+    Args:
+        key_path (KeyPath): Field sorted on
+        ascending (bool, optional): Ascending order. Defaults to True.
+        missing (str, optional): Placement of missing values (None or NaN), one of
+            "last", "first" or "error". Defaults to "last".
+    """
+
+    key_path: KeyPath
+    ascending: bool = True
+    missing: str = "last"
+
+    def __post_init__(self):
+        if self.missing not in MISSING_POLICIES:
+            raise ValueError(f"missing must be one of {', '.join(MISSING_POLICIES)}")
+
+    @classmethod
+    def compile(
+        cls, by: str, ascending: bool = True, missing: str = "last"
+    ) -> "SortKey":
+        return cls(key_path=compile_key_path(by), ascending=ascending, missing=missing)
+
+    def __str__(self):
+        return self.key_path.path if self.ascending else f"-{self.key_path.path}"
+
+    def values(self, items: List[Any]) -> List[Any]:
+        getter = self.key_path.getter
+        values = [getter(item) for item in items]
+
+        if self.missing == "error" and any(is_missing(value) for value in values):
+            raise ValueError(f"Missing values for sort key '{self.key_path.path}'")
+
+        return values
+
+
+def _sort_columnar(items: List[Any], keys: Tuple[SortKey, ...]) -> List[Any]:
+    """Sort on numeric keys through numpy, with np.lexsort (stable)"""
+    columns = []
+
+    for key in keys:
+        values = np.array(
+            [np.nan if is_missing(value) else value for value in key.values(items)],
+            dtype=float,
+        )
+        missing = np.isnan(values)
+        values = np.where(missing, 0.0, values)
+
+        # np.lexsort sorts on its last column first
+        columns.append(missing if key.missing == "last" else ~missing)
+        columns.append(values if key.ascending else -values)
+
+    order = np.lexsort(columns[::-1])
+    return [items[i] for i in order]
+
+
+def _sort_python(items: List[Any], keys: Tuple[SortKey, ...]) -> List[Any]:
+    """Sort on any keys, through successive stable sorts"""
+    for key in reversed(keys):
+        # Reversed sorts also reverse the placement of missing values
+        missing_rank = (key.missing == "last") != (not key.ascending)
+        decorated = [
+            (
+                (missing_rank, 0) if is_missing(value) else (not missing_rank, value),
+                item,
+            )
+            for value, item in zip(key.values(items), items)
+        ]
+        decorated.sort(key=lambda pair: pair[0], reverse=not key.ascending)
+        items = [item for _, item in decorated]
+
+    return items
+
+
+def sort_items(items: Iterable[Any], keys: Tuple[SortKey, ...]) -> List[Any]:
+    """Sort items on several keys, the first being the most significant. Items with
+    equal keys keep their order.
+
+    Args:
+        items (Iterable[Any]): Items to sort
+        keys (Tuple[SortKey, ...]): Sort keys
+
+    Returns:
+        List[Any]: Sorted items
+    """
+    items = list(items)
+
+    if len(items) > 1 and all(key.key_path.is_numeric for key in keys):
+        try:
+            return _sort_columnar(items, keys)
+        except (TypeError, ValueError):
+            # Values not matching their declared type
+            pass
+
+    return _sort_python(items, keys)
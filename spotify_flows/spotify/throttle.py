@@ -0,0 +1,359 @@
+"""
+    This module holds the scheduler pacing the requests made to the Spotify API
+"""
+
+# Standard library imports
+import time
+import random
+import logging
+import itertools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+from typing import Dict
+from typing import Tuple
+from typing import Callable
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+# Third party imports
+import requests
+from spotipy.exceptions import SpotifyException
+
+# Local imports
+from spotify_flows.utils import profiling
+
+# Main body
+logger = logging.getLogger()
+
+INTERACTIVE = 0
+"""Priority of requests a user is waiting for, e.g. CLI commands"""
+
+BACKGROUND = 1
+"""Priority of requests of background jobs and crawls, served after interactive ones"""
+
+_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Set the priority of the requests made within the context
+
+    Args:
+        priority (int): INTERACTIVE or BACKGROUND
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def background(func: Callable) -> Callable:
+    """Make the requests of a function (e.g. a scheduled job) in the background lane"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_priority(BACKGROUND):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def with_request_priority(func: Callable) -> Callable:
+    """Bind a function to the current request priority (and profile, see
+    utils.profiling), e.g. before handing it to worker threads, which do not
+    inherit them"""
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # A context can only be entered by one thread at a time
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Sustained rate of requests, with the burst allowed above it
+
+    Args:
+        per_second (float): Requests per second
+        burst (int): Requests which can be made at once after an idle period
+    """
+
+    per_second: float
+    burst: int
+
+
+GLOBAL_RATE = Rate(per_second=10, burst=20)
+"""Rate of all requests of the application, Spotify's limit being per application"""
+
+ENDPOINT_RATES = {
+    "default": Rate(per_second=5, burst=10),
+    "search": Rate(per_second=2, burst=5),
+}
+"""Rate per endpoint class, see endpoint_class"""
+
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 60.0
+METRICS_WINDOW = 60.0
+
+
+def endpoint_class(url: str) -> str:
+    """Class of an API endpoint, rate-limited together: its first path segment,
+    e.g. "artists" for artists/{id}/related-artists, or "me/tracks"
+
+    Args:
+        url (str): Full or relative endpoint URL
+
+    Returns:
+        str: Endpoint class
+    """
+    path = urlparse(url).path if url.startswith("http") else url
+    segments = [segment for segment in path.split("/") if segment]
+    if segments and segments[0] == "v1":
+        segments = segments[1:]
+
+    if not segments:
+        return "default"
+    if segments[0] == "me" and len(segments) > 1:
+        return f"me/{segments[1]}"
+    return segments[0]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff delay with jitter, so that clients retrying together
+    spread out"""
+    return random.uniform(0.5, 1) * min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+
+
+class TokenBucket:
+    """Token bucket, refilled at a constant rate. Not thread safe: accesses are
+    serialized by the RequestScheduler."""
+
+    def __init__(self, rate: Rate):
+        self.rate = rate
+        self.tokens = float(rate.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.rate.burst, self.tokens + elapsed * self.rate.per_second)
+        self.updated = now
+
+    def time_until_token(self, now: float) -> float:
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate.per_second
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RequestScheduler:
+    """Scheduler of API requests, shared by all threads. Requests wait for a token
+    of the application bucket and of the bucket of their endpoint class, by order
+    of priority then arrival. A 429 response pauses every request for its
+    Retry-After delay, and failed requests are retried with jittered backoff.
+
+    Args:
+        global_rate (Rate, optional): Rate of all requests. Defaults to GLOBAL_RATE.
+        endpoint_rates (Dict[str, Rate], optional): Rate per endpoint class, with a
+            "default" entry. Defaults to ENDPOINT_RATES.
+        max_retries (int, optional): Retries of a failed request. Defaults to
+            MAX_RETRIES.
+    """
+
+    def __init__(
+        self,
+        global_rate: Rate = GLOBAL_RATE,
+        endpoint_rates: Dict[str, Rate] = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.endpoint_rates = endpoint_rates or ENDPOINT_RATES
+        self.max_retries = max_retries
+
+        self._condition = threading.Condition()
+        self._global_bucket = TokenBucket(global_rate)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+
+        self._started = time.monotonic()
+        self._recent = deque()
+        self._n_requests = 0
+        self._n_by_endpoint: Dict[str, int] = {}
+        self._n_rate_limited = 0
+        self._n_retries = 0
+        self._throttled_seconds = 0.0
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self._buckets:
+            rate = self.endpoint_rates.get(endpoint, self.endpoint_rates["default"])
+            self._buckets[endpoint] = TokenBucket(rate)
+        return self._buckets[endpoint]
+
+    def _is_next(self, ticket: Tuple[int, int, str]) -> bool:
+        """Whether no request should be served before this one: earlier requests of
+        the same endpoint class, and requests of higher priority"""
+        priority, _, endpoint = ticket
+        return not any(
+            other < ticket and (other[2] == endpoint or other[0] < priority)
+            for other in self._waiting
+        )
+
+    def acquire(self, endpoint: str, priority: int = None) -> float:
+        """Wait until a request to an endpoint class can be made
+
+        Args:
+            endpoint (str): Endpoint class
+            priority (int, optional): Priority of the request. Defaults to None (the
+                priority set by request_priority).
+
+        Returns:
+            float: Time waited, in seconds
+        """
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+
+        with self._condition:
+            bucket = self._bucket(endpoint)
+            ticket = (priority, next(self._sequence), endpoint)
+            self._waiting.append(ticket)
+
+            try:
+                while True:
+                    timeout = None
+                    if self._is_next(ticket):
+                        now = time.monotonic()
+                        timeout = max(
+                            self._paused_until - now,
+                            self._global_bucket.time_until_token(now),
+                            bucket.time_until_token(now),
+                        )
+                        if timeout <= 0:
+                            self._global_bucket.take(now)
+                            bucket.take(now)
+                            break
+
+                    self._condition.wait(timeout)
+
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self._throttled_seconds += waited
+
+        profiling.record_throttle(waited)
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for a while, e.g. as asked by a Retry-After header"""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def _record(self, endpoint: str) -> None:
+        with self._condition:
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - METRICS_WINDOW:
+                self._recent.popleft()
+
+            self._n_requests += 1
+            self._n_by_endpoint[endpoint] = self._n_by_endpoint.get(endpoint, 0) + 1
+
+    def call(
+        self, endpoint: str, request: Callable[[], Any], priority: int = None
+    ) -> Any:
+        """Make a request once the scheduler allows it, retrying it on rate limiting
+        (429), server errors (5xx) and connection errors
+
+        Args:
+            endpoint (str): Endpoint class
+            request (Callable[[], Any]): Function making the request
+            priority (int, optional): Priority of the request. Defaults to None (the
+                priority set by request_priority).
+
+        Returns:
+            Any: Result of the request
+        """
+        for attempt in itertools.count():
+            self.acquire(endpoint, priority=priority)
+
+            try:
+                result = request()
+
+            except SpotifyException as e:
+                if e.http_status != 429 and e.http_status < 500:
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = backoff_delay(attempt)
+                if e.http_status == 429:
+                    retry_after = (e.headers or {}).get("Retry-After")
+                    delay = float(retry_after) if retry_after else delay
+                    logger.warning(
+                        f"Rate limited on {endpoint}, pausing for {delay:.1f}s"
+                    )
+                    with self._condition:
+                        self._n_rate_limited += 1
+                    self.pause(delay)
+                else:
+                    self._sleep(delay)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(backoff_delay(attempt))
+
+            else:
+                self._record(endpoint)
+                return result
+
+            with self._condition:
+                self._n_retries += 1
+
+    def _sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+        with self._condition:
+            self._throttled_seconds += seconds
+        profiling.record_throttle(seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Live metrics of the requests made
+
+        Returns:
+            Dict[str, Any]: Number of requests (in total and per endpoint class),
+                requests/sec achieved over the last METRICS_WINDOW seconds, number
+                of 429 responses and of retries, and time spent throttled (waiting
+                for tokens, pauses or backoff, summed over threads)
+        """
+        with self._condition:
+            now = time.monotonic()
+            while self._recent and self._recent[0] < now - METRICS_WINDOW:
+                self._recent.popleft()
+            window = max(1e-9, min(METRICS_WINDOW, now - self._started))
+
+            return {
+                "requests": self._n_requests,
+                "requests_per_sec": len(self._recent) / window,
+                "by_endpoint": dict(self._n_by_endpoint),
+                "rate_limited": self._n_rate_limited,
+                "retries": self._n_retries,
+                "throttled_seconds": self._throttled_seconds,
+                "waiting": len(self._waiting),
+            }
+
+
+request_scheduler = RequestScheduler()
+"""Scheduler shared by all clients, the rate limits being per application"""
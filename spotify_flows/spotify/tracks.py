@@ -7,14 +7,17 @@ import copy
 from typing import Dict
 from typing import List
 from typing import Any
+from typing import Callable
 from dataclasses import asdict
 
 # Third party imports
 
 # Local imports
 from .albums import get_album_info
+from .albums import get_albums_info
 from .login import login_if_missing
 from .classes import ExtendedSpotify
+from .resolution import resolution_cache
 from .artists import read_artists_from_id
 
 # Main body
@@ -32,6 +35,84 @@ def read_track_from_id(sp: ExtendedSpotify, *, track_id: str) -> Dict[str, Any]:
     return track_dict
 
 
+@login_if_missing(scope=None)
+def read_tracks_from_ids(
+    sp: ExtendedSpotify,
+    *,
+    track_ids: List[str],
+    stored_album_ids: Callable[[List[str]], List[str]] = None,
+    stored_artist_ids: Callable[[List[str]], List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Read several tracks as read_track_from_id does, with batched requests: tracks
+    50 per request, then their distinct albums 20 per request, then the distinct
+    artists of those albums 50 per request. Albums and artists already stored
+    are not requested, and are left as found in the track (simplified).
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        track_ids (List[str]): Track IDs
+        stored_album_ids (Callable[[List[str]], List[str]], optional): Returns
+            those of the album IDs which need not be requested. Defaults to None.
+        stored_artist_ids (Callable[[List[str]], List[str]], optional): Returns
+            those of the artist IDs which need not be requested. Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: Track information, in the order of the IDs
+    """
+    track_dicts = []
+    for i in range(0, len(track_ids), 50):
+        track_dicts += sp.tracks(track_ids[i : i + 50]).get("tracks")
+
+    album_ids = list(dict.fromkeys(track["album"]["id"] for track in track_dicts))
+    if stored_album_ids is not None:
+        skipped = set(stored_album_ids(album_ids))
+        album_ids = [album_id for album_id in album_ids if album_id not in skipped]
+    albums = {
+        album["id"]: album for album in get_albums_info(sp=sp, album_ids=album_ids)
+    }
+
+    artist_ids = list(
+        dict.fromkeys(
+            artist["id"] for album in albums.values() for artist in album["artists"]
+        )
+    )
+    if stored_artist_ids is not None:
+        skipped = set(stored_artist_ids(artist_ids))
+        artist_ids = [artist_id for artist_id in artist_ids if artist_id not in skipped]
+    artists = {
+        artist["id"]: artist
+        for artist in read_artists_from_id(sp=sp, artist_ids=artist_ids)
+    }
+
+    for album in albums.values():
+        album["artists"] = [
+            artists.get(artist["id"], artist) for artist in album["artists"]
+        ]
+    for track in track_dicts:
+        track["album"] = albums.get(track["album"]["id"], track["album"])
+
+    return track_dicts
+
+
+@login_if_missing(scope=None)
+def search_tracks(sp: ExtendedSpotify, *, track_name: str) -> List[Dict[str, Any]]:
+    """Search tracks matching the track name
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        track_name (str): Track name
+
+    Returns:
+        List[Dict[str, Any]]: Candidates (id, name, popularity), most popular first
+    """
+    results = sp.search(track_name, type="track", limit=10).get("tracks").get("items")
+    sorted_results = sorted(results, key=lambda x: x["popularity"], reverse=True)
+    return [
+        {"id": res["id"], "name": res["name"], "popularity": res["popularity"]}
+        for res in sorted_results
+    ]
+
+
 @login_if_missing(scope=None)
 def get_track_id(sp: ExtendedSpotify, *, track_name: str) -> str:
     """Get ID of track that best matches track name
@@ -43,9 +124,11 @@ def get_track_id(sp: ExtendedSpotify, *, track_name: str) -> str:
     Returns:
         str: Best matching ID
     """
-    results = sp.search(track_name, type="track", limit=10).get("tracks").get("items")
-    sorted_results = sorted(results, key=lambda x: x["popularity"], reverse=True)
-    return sorted_results[0]["id"]
+    return resolution_cache.resolve(
+        kind="track",
+        query=track_name,
+        search_func=lambda query: search_tracks(sp=sp, track_name=query),
+    )
 
 
 @login_if_missing(scope=None)
@@ -7,6 +7,7 @@ import copy
 from typing import Any
 from typing import List
 from typing import Dict
+from typing import Tuple
 
 # Third party imports
 
@@ -14,6 +15,7 @@ from typing import Dict
 from .login import login_if_missing
 from .classes import ExtendedSpotify
 from .data_structures import TrackItem
+from .pagination import iter_offset_items
 
 # Main body
 @login_if_missing(scope="playlist-read-private")
@@ -76,30 +78,63 @@ def get_recommendations_for_genre(
 
 
 @login_if_missing(scope="user-library-read")
-def get_all_saved_tracks(sp: ExtendedSpotify) -> List[TrackItem]:
-    """Retrieve all of the user's saved tracks
+def get_all_saved_tracks(
+    sp: ExtendedSpotify, *, parallel: bool = False
+) -> List[TrackItem]:
+    """Retrieve all of the user's saved tracks, yielded as each page arrives
 
     Args:
         sp (ExtendedSpotify): Spotify object
+        parallel (bool, optional): Whether to request pages concurrently. Defaults to
+            False.
 
     Returns:
         List[TrackItem]: Saved tracks
     """
 
-    raw_results = sp.current_user_saved_tracks(limit=50)
-    next = raw_results.get("next")
-    all_results = raw_results.get("items")
-
-    while next:
-        raw_results = sp.next(raw_results)
-        next = raw_results.get("next")
-        new_results = raw_results.get("items")
-        all_results = all_results + new_results
+    results = iter_offset_items(
+        lambda offset, limit: sp.current_user_saved_tracks(limit=limit, offset=offset),
+        limit=50,
+        parallel=parallel,
+    )
 
-    for result in all_results:
+    for result in results:
         yield TrackItem.from_dict(
             {
                 **result.get("track"),
                 "release_date": result["track"]["album"]["release_date"],
             }
         )
+
+
+@login_if_missing(scope="user-library-read")
+def get_saved_tracks_since(
+    sp: ExtendedSpotify, *, added_after: str = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Retrieve the tracks saved by the user after a given date. Saved tracks come
+    newest first, so pages stop being requested as soon as an older track is reached.
+
+    Args:
+        sp (ExtendedSpotify): Spotify object
+        added_after (str, optional): Watermark, as the "added_at" timestamp of the
+            most recent track already known. Defaults to None (all tracks).
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: Saved track results (with their "added_at"
+            timestamp), newest first, and the total number of saved tracks
+    """
+    first_page = sp.current_user_saved_tracks(limit=50)
+    total = first_page.get("total")
+
+    def fetch_page(offset, limit):
+        if offset == 0:
+            return first_page
+        return sp.current_user_saved_tracks(limit=limit, offset=offset)
+
+    results = []
+    for result in iter_offset_items(fetch_page, limit=50):
+        if added_after is not None and result["added_at"] <= added_after:
+            break
+        results.append(result)
+
+    return results, total
@@ -1,4 +1,5 @@
 # Standard library imports
+import functools
 from datetime import datetime
 
 # Third party imports
@@ -6,6 +7,7 @@ from datetime import datetime
 # Local imports
 
 # Main body
+@functools.lru_cache(maxsize=4096)
 def date_parsing(date_str: str) -> datetime:
     """Parse string of varying length to datetime object
 
@@ -18,6 +20,6 @@ def date_parsing(date_str: str) -> datetime:
     if len(date_str) == 4:
         return datetime(int(date_str), 1, 1)
     elif len(date_str) == 10:
-        return datetime.strptime(date_str, "%Y-%m-%d")
+        return datetime.fromisoformat(date_str)
     else:
         return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,280 @@
+"""
+    This module holds the instrumentation of the application: API requests per
+    endpoint (count, latency histogram, bytes), cache hit rates and database time per
+    method, aggregated per profile (e.g. a CLI invocation or a scheduler job).
+
+    Measures are recorded into the profile of the current context, and dropped when
+    there is none.
+"""
+
+# Standard library imports
+import json
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+# Third party imports
+
+# Local imports
+
+# Main body
+logger = logging.getLogger()
+
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+"""Upper bounds of the latency histogram buckets, the last bucket being unbounded"""
+
+_current_profile = contextvars.ContextVar("profile", default=None)
+_db_timer_depth = contextvars.ContextVar("db_timer_depth", default=0)
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0
+    errors: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+
+    def add(self, seconds: float, n_bytes: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += int(error)
+        self.bytes += n_bytes
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile_ms(self, q: float) -> float:
+        """Upper bound of the histogram bucket holding the q-th quantile"""
+        rank, seen = q * self.calls, 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + [float("inf")], self.histogram):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class TimerStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Profile:
+    """Measures aggregated over a unit of work. Thread safe: threads working for the
+    same unit record into the same profile.
+
+    Args:
+        label (str): Name of the unit of work, e.g. the CLI action
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.now(timezone.utc)
+        self.wall_seconds = 0.0
+        self.throttled_seconds = 0.0
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.caches: Dict[str, CacheStats] = {}
+        self.db_methods: Dict[str, TimerStats] = {}
+        self._lock = threading.Lock()
+
+    def record_request(
+        self, endpoint: str, seconds: float, n_bytes: int, error: bool = False
+    ) -> None:
+        with self._lock:
+            self.endpoints.setdefault(endpoint, EndpointStats()).add(
+                seconds, n_bytes, error
+            )
+
+    def record_throttle(self, seconds: float) -> None:
+        with self._lock:
+            self.throttled_seconds += seconds
+
+    def record_cache(self, cache: str, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            stats = self.caches.setdefault(cache, CacheStats())
+            stats.hits += hits
+            stats.misses += misses
+
+    def record_db(self, method: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.db_methods.setdefault(method, TimerStats())
+            stats.calls += 1
+            stats.seconds += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "label": self.label,
+                "started_at": str(self.started_at),
+                "wall_seconds": self.wall_seconds,
+                "throttled_seconds": self.throttled_seconds,
+                "latency_buckets_ms": LATENCY_BUCKETS_MS,
+                "endpoints": {
+                    endpoint: {
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "bytes": stats.bytes,
+                        "seconds": stats.seconds,
+                        "max_seconds": stats.max_seconds,
+                        "histogram": list(stats.histogram),
+                    }
+                    for endpoint, stats in self.endpoints.items()
+                },
+                "caches": {
+                    cache: {
+                        "hits": stats.hits,
+                        "misses": stats.misses,
+                        "hit_rate": stats.hit_rate,
+                    }
+                    for cache, stats in self.caches.items()
+                },
+                "db_methods": {
+                    method: {"calls": stats.calls, "seconds": stats.seconds}
+                    for method, stats in self.db_methods.items()
+                },
+            }
+
+    def export_json(self, file_path: str) -> None:
+        with open(file_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        """Human-readable summary of the profile"""
+        with self._lock:
+            n_calls = sum(stats.calls for stats in self.endpoints.values())
+            lines = [
+                f"Profile {self.label}: {self.wall_seconds:.2f}s, {n_calls} API calls, "
+                f"{self.throttled_seconds:.2f}s throttled"
+            ]
+
+            if self.endpoints:
+                lines.append(
+                    f"  {'endpoint':<24}{'calls':>7}{'errors':>7}{'mean ms':>9}"
+                    f"{'p95 ms':>9}{'max ms':>9}{'KB':>9}"
+                )
+            for endpoint, stats in sorted(
+                self.endpoints.items(), key=lambda item: -item[1].seconds
+            ):
+                lines.append(
+                    f"  {endpoint:<24}{stats.calls:>7}{stats.errors:>7}"
+                    f"{1000 * stats.seconds / stats.calls:>9.0f}"
+                    f"{'<=' + format(stats.percentile_ms(0.95), '.0f'):>9}"
+                    f"{1000 * stats.max_seconds:>9.0f}{stats.bytes / 1024:>9.1f}"
+                )
+
+            if self.caches:
+                lines.append(f"  {'cache':<24}{'hits':>7}{'misses':>7}{'rate':>9}")
+            for cache, stats in sorted(self.caches.items()):
+                lines.append(
+                    f"  {cache:<24}{stats.hits:>7}{stats.misses:>7}"
+                    f"{stats.hit_rate:>9.0%}"
+                )
+
+            if self.db_methods:
+                lines.append(f"  {'database method':<40}{'calls':>7}{'seconds':>9}")
+            for method, stats in sorted(
+                self.db_methods.items(), key=lambda item: -item[1].seconds
+            ):
+                lines.append(f"  {method:<40}{stats.calls:>7}{stats.seconds:>9.3f}")
+
+        return "\n".join(lines)
+
+
+def current_profile() -> Profile:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile(label: str):
+    """Record the measures made within the context into a new profile. Threads started
+    within the context keep recording into it if their function is bound with
+    spotify.throttle.with_request_priority.
+
+    Args:
+        label (str): Name of the unit of work
+
+    Yields:
+        Profile: Profile of the context
+    """
+    profile_ = Profile(label)
+    token = _current_profile.set(profile_)
+    start = time.perf_counter()
+    try:
+        yield profile_
+    finally:
+        profile_.wall_seconds = time.perf_counter() - start
+        _current_profile.reset(token)
+
+
+def profiled(func: Callable) -> Callable:
+    """Profile each run of a function, e.g. a scheduled job, and log the profile"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile(func.__name__) as profile_:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                logger.info(profile_.report())
+
+    return wrapper
+
+
+def record_request(
+    endpoint: str, seconds: float, n_bytes: int, error: bool = False
+) -> None:
+    profile_ = _current_profile.get()
+    if profile_ is not None:
+        profile_.record_request(endpoint, seconds, n_bytes, error)
+
+
+def record_throttle(seconds: float) -> None:
+    profile_ = _current_profile.get()
+    if profile_ is not None:
+        profile_.record_throttle(seconds)
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    profile_ = _current_profile.get()
+    if profile_ is not None:
+        profile_.record_cache(cache, hits=hits, misses=misses)
+
+
+@contextmanager
+def db_timer(method: str):
+    """Record the time spent in a database method, nested calls included. Methods
+    called by a timed method are not recorded, so that time is only counted once."""
+    profile_ = _current_profile.get()
+    depth = _db_timer_depth.get()
+    token = _db_timer_depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _db_timer_depth.reset(token)
+        if profile_ is not None and depth == 0:
+            profile_.record_db(method, time.perf_counter() - start)
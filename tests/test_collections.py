@@ -2,6 +2,9 @@ import pytest
 import hypothesis
 
 import spotify_flows.spotify.collections as spocol
+from spotify_flows.spotify.predicates import F
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.fake import FakeSpotify, SyntheticCatalog, offline_spotify
 
 collection_classes = [
     spocol.TrackCollection,
@@ -10,13 +13,21 @@ collection_classes = [
     spocol.Playlist,
     spocol.Genre,
     spocol.ArtistCollection,
-    spocol.AlbumCollection,
 ]
 
 
+@pytest.fixture(autouse=True)
+def sp():
+    with offline_spotify(
+        FakeSpotify(SyntheticCatalog(n_tracks=500, n_saved=120))
+    ) as sp:
+        yield sp
+
+
 @pytest.mark.parametrize("cls", collection_classes)
-def test_empty(cls):
-    assert len(cls().items) == 0
+def test_empty(cls, sp):
+    assert len(list(cls().items)) == 0
+    assert sp.n_calls == 0
 
 
 def test_return_types():
@@ -31,3 +42,154 @@ def test_return_types():
 
     col = col - spocol.Genre()
     assert isinstance(col, spocol.TrackCollection)
+
+
+def test_playlist_items(sp):
+    items = list(spocol.Playlist.from_id("playlist0").items)
+
+    assert [item.id for item in items] == [
+        f"track{i}" for i in sp.catalog.playlist_track_indices(0)
+    ]
+    assert sp.calls["playlist_items"] == 2
+
+
+def test_artist_items_from_albums(sp):
+    artist = spocol.Artist.from_name("Artist 3")
+    items = list(artist.items)
+
+    assert artist.id_ == "artist3"
+    assert len(items) == 3 * sp.catalog.tracks_per_album
+    assert all(item.album.artists[0].id == "artist3" for item in items)
+
+
+def test_set_operations():
+    album_1 = spocol.Album.from_id("album1")
+    album_2 = spocol.Album.from_id("album2")
+
+    both = album_1 + album_2
+    assert len(list(both.items)) == 20
+    assert list((both - album_1).items) == list(album_2.items)
+    assert list((both / album_1).items) == list(album_1.items)
+    assert len(list((album_1 % album_2).items)) == 20
+
+
+def test_playlist_audio_features_filter_and_sort(sp):
+    collection = (
+        spocol.Playlist.from_id("playlist0")
+        .filter(F.audio_features.energy >= 0.5)
+        .sort(by="audio_features.danceability", ascending=False)
+    )
+    items = list(collection.items)
+
+    assert sp.calls["audio_features"] > 0
+    assert all(item.audio_features.energy >= 0.5 for item in items)
+    assert [item.id for item in items] == [
+        f"track{i}"
+        for i in sorted(
+            (
+                i
+                for i in sp.catalog.playlist_track_indices(0)
+                if sp.catalog.audio_features(i)["energy"] >= 0.5
+            ),
+            key=lambda i: sp.catalog.audio_features(i)["danceability"],
+            reverse=True,
+        )
+    ]
+
+
+def test_plans_over_a_playlist_share_its_listing(sp):
+    list(spocol.Playlist.from_id("playlist0").sort(by="popularity").items)
+    n_listing_calls = sp.calls["playlist_items"]
+    sp.reset_calls()
+
+    playlist = spocol.Playlist.from_id("playlist0")
+    most_popular = list(playlist.sort(by="popularity", ascending=False).first(5).items)
+    first = list(playlist.first(3).items)
+
+    assert [item.id for item in first] == [
+        f"track{i}" for i in sp.catalog.playlist_track_indices(0)[:3]
+    ]
+    assert sp.calls["playlist_items"] == n_listing_calls
+    assert sp.calls["track"] == len({item.id for item in most_popular + first})
+
+
+def test_genre_items_are_memoized(sp):
+    genre = spocol.Genre(sp.catalog.genres[0])
+    items = list(genre.items)
+
+    assert items and list(genre.items) == items
+    assert sp.calls["recommendations"] == 1
+
+
+def test_artists_without_top_tracks_are_empty(sp, tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    db.store_artist_top_tracks(top_tracks={"artist1": []})
+
+    top_tracks = spocol.Artist.top_tracks(artist_ids=["artist1"], db=db)
+
+    assert list(top_tracks["artist1"].items) == []
+    assert sp.n_calls == 0
+
+
+def test_playlist_sync_fetches_new_tracks_only(sp, tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+
+    listed = sp.catalog.playlist_track_indices(0)
+    n_albums = len({i // sp.catalog.tracks_per_album for i in listed})
+
+    playlist = spocol.Playlist.from_id("playlist0")
+    playlist.sync(db=db)
+    assert sp.calls["track"] == 0 and sp.calls["tracks"] == 2
+    assert sp.calls["albums"] == -(-n_albums // 20)
+    assert len(db.table_contents("albums")) == n_albums
+
+    sp.reset_calls()
+    playlist.sync(db=db)
+    assert sp.calls["tracks"] == 0 and sp.calls["playlist_items"] == 0
+
+    # A new track of an album already stored
+    album_track_indices = sp.catalog.album_track_indices(
+        listed[0] // sp.catalog.tracks_per_album
+    )
+    new_track_id = next(f"track{i}" for i in album_track_indices if i not in listed)
+    sp.playlist_add_items("playlist0", [new_track_id], position=0)
+    sp.reset_calls()
+    playlist.sync(db=db)
+    assert sp.calls["tracks"] == 1
+    assert sp.calls["albums"] == 0 and sp.calls["artists"] == 0
+    assert db.collection_track_ids(id_="playlist0")[0] == new_track_id
+
+
+def test_saved_tracks_sync_keeps_api_order(sp, tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+
+    saved_tracks = spocol.SavedTracks()
+    saved_tracks.sync(db=db)
+
+    saved = set(sp.catalog.saved_track_indices)
+    new_ids = [f"track{i}" for i in range(500) if i not in saved][:3]
+    sp.current_user_saved_tracks_add(tracks=new_ids[:2])
+    saved_tracks.sync(db=db)
+    sp.current_user_saved_tracks_add(tracks=new_ids[2:])
+    sp.reset_calls()
+    saved_tracks.sync(db=db)
+    assert sp.calls["current_user_saved_tracks"] == 1
+
+    api_ids = [
+        item["track"]["id"]
+        for item in sp.current_user_saved_tracks(limit=1000)["items"]
+    ]
+    assert api_ids[:3] == [new_ids[2], new_ids[1], new_ids[0]]
+    assert db.collection_track_ids(id_="Saved tracks") == api_ids
+
+
+def test_from_query_checks_ascending(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+
+    with pytest.raises(ValueError):
+        spocol.TrackCollection.from_query(
+            order_by=["popularity", "name"], ascending=[False], db=db
+        )
@@ -0,0 +1,73 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.database.connection import FIFOLock
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    yield db
+    db.close()
+
+
+def test_wal_mode(db):
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_concurrent_writers_and_readers(db):
+    def work(i):
+        db.add_collection_track_ids(id_="c", track_ids=[f"t{i}"])
+        db.store_show_states(states={f"s{i}": {"total_episodes": i}})
+        return db.collection_size(id_="c")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sizes = list(executor.map(work, range(64)))
+
+    assert db.collection_size(id_="c") == 64
+    assert len(db.show_states(show_ids=[f"s{i}" for i in range(64)])) == 64
+    assert all(1 <= size <= 64 for size in sizes)
+
+
+def test_write_session_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.connections.writer() as conn:
+            conn.execute(
+                "INSERT INTO collections (id, snapshot_id, position, track_id) "
+                "VALUES ('c', '', 0, 't')"
+            )
+            raise RuntimeError
+
+    assert db.collection_size(id_="c") == 0
+
+
+def test_fifo_lock_is_reentrant_and_ordered():
+    lock = FIFOLock()
+    order = []
+
+    lock.acquire()
+    lock.acquire()
+    assert lock.depth == 2
+
+    threads = []
+    for i in range(3):
+        thread = threading.Thread(
+            target=lambda i=i: (lock.acquire(), order.append(i), lock.release())
+        )
+        thread.start()
+        threads.append(thread)
+        while len(lock._queue) < i + 1:
+            time.sleep(0.001)
+
+    lock.release()
+    lock.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2]
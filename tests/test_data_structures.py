@@ -0,0 +1,144 @@
+import copy
+import pickle
+import dataclasses
+
+import pytest
+
+from spotify_flows.spotify.data_structures import (
+    AlbumItem,
+    ArtistItem,
+    AudioFeaturesItem,
+    SpotifyDataStructure,
+    TrackItem,
+    slotted,
+)
+
+
+def track_dict(id_: str, album_id: str = "a1") -> dict:
+    return {
+        "id": id_,
+        "name": f"Track {id_}",
+        "popularity": 10,
+        "duration_ms": 1000,
+        "album": {
+            "id": album_id,
+            "name": f"Album {album_id}",
+            "release_date": "2020-01-02",
+            "artists": [{"id": "ar1", "name": "Artist", "genres": ["pop"]}],
+        },
+    }
+
+
+def test_items_are_slotted():
+    track = TrackItem.from_dict(track_dict("t1"))
+    assert not hasattr(track, "__dict__")
+    assert not hasattr(track.album, "__dict__")
+    assert not hasattr(track.audio_features, "__dict__")
+
+
+def test_albums_and_artists_are_interned():
+    track_1 = TrackItem.from_dict(track_dict("t1"))
+    track_2 = TrackItem.from_dict(track_dict("t2"))
+    track_3 = TrackItem.from_dict(track_dict("t3", album_id="a2"))
+
+    assert track_1.album is track_2.album
+    assert track_1.album is not track_3.album
+    assert track_1.album.artists[0] is track_3.album.artists[0]
+
+
+def test_changed_album_is_not_merged():
+    changed = track_dict("t2")
+    changed["album"]["name"] = "Deluxe edition"
+
+    track_1 = TrackItem.from_dict(track_dict("t1"))
+    track_2 = TrackItem.from_dict(changed)
+
+    assert track_2.album.name == "Deluxe edition"
+    assert track_1.album.name == "Album a1"
+
+
+def test_pickle_and_copy_round_trip():
+    track = TrackItem.from_dict(track_dict("t1"))
+    track.audio_features = AudioFeaturesItem(energy=0.7)
+
+    for clone in [pickle.loads(pickle.dumps(track)), copy.deepcopy(track)]:
+        assert clone == track
+        assert clone.audio_features.energy == 0.7
+
+
+def test_audio_features_array_round_trip():
+    audio_features = AudioFeaturesItem(energy=0.7, tempo=120)
+    values = audio_features.to_array()
+
+    assert values.typecode == "d"
+    assert AudioFeaturesItem.from_array(values) == audio_features
+
+
+def test_from_dict_does_not_mutate_input():
+    raw = track_dict("t1")
+    snapshot = copy.deepcopy(raw)
+
+    first = TrackItem.from_dict(raw)
+    second = TrackItem.from_dict(raw)
+
+    assert raw == snapshot
+    assert first == second
+    assert first.album.release_date.year == 2020
+
+
+def test_from_dicts():
+    raws = [track_dict(f"t{i}") for i in range(3)]
+    tracks = TrackItem.from_dicts(raws)
+
+    assert [track.id for track in tracks] == ["t0", "t1", "t2"]
+    assert AudioFeaturesItem.from_dicts([{"energy": 0.1}, None]) == [
+        AudioFeaturesItem(energy=0.1),
+        AudioFeaturesItem(),
+    ]
+
+
+def test_from_dicts_builds_shared_albums_once():
+    changed = track_dict("t2")
+    changed["album"]["name"] = "Deluxe edition"
+    tracks = TrackItem.from_dicts([track_dict("t0"), track_dict("t1"), changed])
+
+    assert tracks[0].album is tracks[1].album
+    assert tracks[2].album.name == "Deluxe edition"
+    assert tracks[0].album.name == "Album a1"
+    assert tracks[0].album.artists[0] is tracks[2].album.artists[0]
+    assert tracks == [
+        TrackItem.from_dict(raw)
+        for raw in [track_dict("t0"), track_dict("t1"), changed]
+    ]
+
+
+def test_interned_albums_are_immutable():
+    track_1 = TrackItem.from_dict(track_dict("t1"))
+    track_2 = TrackItem.from_dict(track_dict("t2"))
+
+    assert isinstance(track_1.album.artists, tuple)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        track_1.album.artists = ()
+    assert track_2.album.artists[0].id == "ar1"
+    assert AlbumItem(artists=[ArtistItem(id="ar1")]).artists == (ArtistItem(id="ar1"),)
+
+
+def test_interned_artists_are_hashable():
+    artist = TrackItem.from_dict(track_dict("t1")).album.artists[0]
+
+    assert artist.genres == ("pop",)
+    assert hash(artist) == hash(ArtistItem(id="ar1", name="Artist", genres=["pop"]))
+    assert {artist, ArtistItem.from_dict({"id": "ar1"})}
+
+
+def test_slotted_rejects_zero_argument_super():
+    with pytest.raises(TypeError):
+
+        @slotted
+        @dataclasses.dataclass
+        class Item(SpotifyDataStructure):
+            id: str = ""
+
+            @classmethod
+            def from_dict(cls, dict_):
+                return super().from_dict(dict_)
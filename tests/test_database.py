@@ -0,0 +1,351 @@
+import pytest
+import pandas as pd
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.data_structures import (
+    AlbumItem,
+    ArtistItem,
+    AudioFeaturesItem,
+    TrackItem,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    return db
+
+
+def make_track(id_: str, album_id: str = "album", energy: float = 0.5) -> TrackItem:
+    return TrackItem(
+        id=id_,
+        name=f"Track {id_}",
+        popularity=50,
+        duration_ms=180000,
+        audio_features=AudioFeaturesItem(energy=energy),
+        album=AlbumItem(id=album_id, name=f"Album {album_id}"),
+    )
+
+
+def test_artist_top_tracks_round_trip(db):
+    db.store_artist_top_tracks(
+        top_tracks={"a1": [make_track("t1"), make_track("t2", energy=0.8)]}
+    )
+
+    top_tracks = db.load_artist_top_tracks(artist_ids=["a1", "a2"])
+
+    assert list(top_tracks) == ["a1"]
+    assert [track.id for track in top_tracks["a1"]] == ["t1", "t2"]
+    assert top_tracks["a1"][1].audio_features.energy == 0.8
+
+
+def test_artist_top_tracks_refresh_replaces_rows(db):
+    db.store_artist_top_tracks(top_tracks={"a1": [make_track("t1"), make_track("t2")]})
+    db.store_artist_top_tracks(top_tracks={"a1": [make_track("t3")]})
+
+    top_tracks = db.load_artist_top_tracks(artist_ids=["a1"])
+    assert [track.id for track in top_tracks["a1"]] == ["t3"]
+
+
+def test_genre_top_artists(db):
+    db.run_query(
+        "INSERT INTO artists (id, name, popularity) VALUES "
+        "('a1', 'A1', 10), ('a2', 'A2', 80), ('a3', 'A3', 50)"
+    )
+    db.run_query(
+        "INSERT INTO genres (artist_id, genre) VALUES "
+        "('a1', 'rock'), ('a2', 'rock'), ('a3', 'rock'), ('a3', 'pop')"
+    )
+
+    # Served through the genres index before any refresh
+    assert db.genre_top_artists(genres=["rock"], k=2) == {"rock": ["a2", "a3"]}
+
+    db.refresh_genre_top_artists(k=2)
+    assert db.genre_top_artists(genres=["rock", "pop"], k=2) == {
+        "rock": ["a2", "a3"],
+        "pop": ["a3"],
+    }
+    assert db.genre_top_artists(genres=["rock"]) == {"rock": ["a2"]}
+
+
+def test_show_states_round_trip(db):
+    assert db.show_states(show_ids=["s1"]) == {}
+
+    db.store_show_states(
+        states={
+            "s1": {
+                "total_episodes": 10,
+                "last_episode_id": "e10",
+                "last_release_date": "2021-01-01 00:00:00",
+            }
+        }
+    )
+    db.store_show_states(
+        states={"s1": {"total_episodes": 11, "last_episode_id": "e11"}}
+    )
+
+    state = db.show_states(show_ids=["s1", "s2"])["s1"]
+    assert state["total_episodes"] == 11
+    assert state["last_episode_id"] == "e11"
+
+
+def test_collection_state_and_tracks(db):
+    assert db.collection_state(id_="Saved tracks") is None
+
+    db.add_collection_track_ids(id_="Saved tracks", track_ids=["t1", "t2"])
+    db.add_collection_track_ids(id_="Saved tracks", track_ids=["t2", "t3"])
+    db.store_collection_state(
+        id_="Saved tracks", watermark="2021-01-02T10:00:00Z", total=3
+    )
+
+    assert db.collection_size(id_="Saved tracks") == 3
+    assert (
+        db.collection_state(id_="Saved tracks")["watermark"] == "2021-01-02T10:00:00Z"
+    )
+
+    db.remove_collection(id_="Saved tracks")
+
+    assert db.collection_size(id_="Saved tracks") == 0
+    assert db.collection_state(id_="Saved tracks") is None
+
+
+def test_playlist_versions_keep_order(db):
+    assert db.playlist_snapshot(playlist_id="p1") is None
+
+    db.store_collection_version(
+        id_="p1", snapshot_id="s1", track_ids=["t3", "t1", "t2"]
+    )
+    db.store_playlist_snapshot(playlist_id="p1", snapshot_id="s1")
+    assert db.collection_track_ids(id_="p1") == ["t3", "t1", "t2"]
+
+    db.store_collection_version(
+        id_="p1", snapshot_id="s2", track_ids=["t2", "t3", "t2"]
+    )
+    db.store_playlist_snapshot(playlist_id="p1", snapshot_id="s2")
+
+    assert db.collection_track_ids(id_="p1") == ["t2", "t3", "t2"]
+    assert db.collection_track_ids(id_="p1", snapshot_id="s1") == ["t3", "t1", "t2"]
+    assert db.collection_size(id_="p1") == 2
+    assert db.playlist_snapshot(playlist_id="p1") == "s2"
+
+    db.remove_collection(id_="p1")
+    assert not db.playlist_exists(id_="p1")
+    assert db.playlist_snapshot(playlist_id="p1") is None
+
+
+def test_load_playlist_in_stored_order(db):
+    tracks = [make_track(f"t{i}") for i in range(5)]
+    db.ingest_tracks(tracks=tracks)
+    db.store_collection_version(
+        id_="p1", snapshot_id="s1", track_ids=["t4", "t0", "unknown", "t2"]
+    )
+    db.store_playlist_snapshot(playlist_id="p1", snapshot_id="s1")
+
+    assert [track.id for track in db.load_playlist(playlist_id="p1")] == [
+        "t4",
+        "t0",
+        "t2",
+    ]
+
+
+def populate_catalog(db):
+    with db.connect():
+        db.conn.executemany(
+            "INSERT INTO tracks (id, name, popularity, album_id, duration_ms) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(f"t{i}", f"Track {i}", i * 10, f"al{i % 2}", 1000 * i) for i in range(6)],
+        )
+        db.conn.executemany(
+            "INSERT INTO audio_features (track_id, energy) VALUES (?, ?)",
+            [(f"t{i}", i / 10) for i in range(6)],
+        )
+        db.conn.executemany(
+            "INSERT INTO albums (id, name, release_date) VALUES (?, ?, ?)",
+            [("al0", "Old", "2001-05-01 00:00:00"), ("al1", "New", "2021-05-01")],
+        )
+        db.conn.executemany(
+            "INSERT INTO artists (id, name, popularity) VALUES (?, ?, ?)",
+            [("ar0", "Artist 0", 10), ("ar1", "Artist 1", 90)],
+        )
+        db.conn.executemany(
+            "INSERT INTO albums_artists (album_id, artist_id) VALUES (?, ?)",
+            [("al0", "ar0"), ("al1", "ar1")],
+        )
+        db.conn.executemany(
+            "INSERT INTO genres (artist_id, genre) VALUES (?, ?)",
+            [("ar0", "rock"), ("ar1", "pop"), ("ar1", "dance pop")],
+        )
+        db.conn.commit()
+
+
+def test_query_track_ids(db):
+    populate_catalog(db)
+
+    assert db.query_track_ids(genres=["pop"], order_by=[("t.popularity", False)]) == [
+        "t5",
+        "t3",
+        "t1",
+    ]
+    assert db.query_track_ids(
+        conditions=[
+            ("af.energy > ?", [0.15]),
+            ("al.release_date >= ?", ["2001-05-01"]),
+        ],
+        artist_ids=["ar0"],
+    ) == ["t2", "t4"]
+    assert len(db.query_track_ids(random=True, limit=4)) == 4
+
+
+def test_iter_tracks_in_chunks(db):
+    populate_catalog(db)
+
+    tracks = list(db.iter_tracks(track_ids=["t3", "missing", "t0"], chunk_size=2))
+
+    assert [track.id for track in tracks] == ["t3", "t0"]
+    assert tracks[0].audio_features.energy == 0.3
+    assert tracks[0].album.release_date.year == 2021
+    assert sorted(tracks[0].album.artists[0].genres) == ["dance pop", "pop"]
+    assert tracks[1].album.artists[0].name == "Artist 0"
+
+
+def test_lookups_accept_quotes(db):
+    db.add_collection_track_ids(id_="it's", track_ids=["t1"])
+
+    assert db.playlist_exists(id_="it's")
+    assert not db.playlist_exists(id_="it''s")
+    db._record_operation(op_type="quote's")
+
+
+def test_transaction_rolls_back_as_a_unit(db):
+    df = pd.DataFrame(
+        {
+            "id": ["c1", "c1"],
+            "snapshot_id": ["", ""],
+            "position": [0, 1],
+            "track_id": ["t1", "t2"],
+        }
+    )
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.write_dataframe(df, "collections", if_exists="append", index=False)
+            db._record_operation(op_type="collection_addition")
+            raise RuntimeError
+
+    assert not db.playlist_exists(id_="c1")
+
+    with db.transaction():
+        db.write_dataframe(df, "collections", if_exists="append", index=False)
+    assert db.collection_track_ids(id_="c1") == ["t1", "t2"]
+
+
+def test_ingest_tracks_dedupes(db):
+    artist = ArtistItem(id="a1", name="A1", popularity=10, genres=["rock", "pop"])
+    album = AlbumItem(id="al1", name="Album", artists=[artist])
+    tracks = [
+        TrackItem(
+            id="t1",
+            name="T1",
+            album=album,
+            audio_features=AudioFeaturesItem(energy=0.7),
+        ),
+        TrackItem(id="t2", name="T2", album=album),
+        TrackItem(id="t1", name="T1", album=album),
+    ]
+
+    db.ingest_tracks(tracks=tracks, collection_id="c1")
+    db.ingest_tracks(tracks=tracks[:1], collection_id="c1")
+
+    counts = {
+        table: len(db.table_contents(table))
+        for table in ["tracks", "albums", "artists", "albums_artists", "genres"]
+    }
+    assert counts == {
+        "tracks": 2,
+        "albums": 1,
+        "artists": 1,
+        "albums_artists": 1,
+        "genres": 2,
+    }
+    assert db.audio_features_track_ids(["t1", "t2"]) == ["t1"]
+    assert sorted(db.collection_track_ids(id_="c1")) == ["t1", "t2"]
+
+    (track,) = db.iter_tracks(["t1"])
+    assert track.audio_features.energy == 0.7
+    assert sorted(track.album.artists[0].genres) == ["pop", "rock"]
+
+
+def test_streamed_reads(db):
+    db.insert_rows(
+        "artists",
+        columns=["id", "name", "popularity"],
+        rows=[(f"a{i}", f"A{i}", i) for i in range(25)],
+    )
+    db.insert_rows(
+        "genres",
+        columns=["artist_id", "genre"],
+        rows=[(f"a{i}", "rock" if i % 2 else "pop") for i in range(25)],
+    )
+
+    chunks = list(db.table_contents("genres", chunksize=10, typed=True))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[0]["genre"].dtype == "category"
+
+    rows = list(
+        db.iter_rows(
+            "artists",
+            columns=["id", "popularity"],
+            where="popularity >= ?",
+            params=[20],
+            order_by=["popularity DESC"],
+            chunksize=2,
+        )
+    )
+    assert rows == [("a24", 24), ("a23", 23), ("a22", 22), ("a21", 21), ("a20", 20)]
+
+    df = db.select("SELECT id, popularity FROM artists", dtypes={"popularity": "Int64"})
+    assert str(df["popularity"].dtype) == "Int64"
+
+
+def test_store_tracks_requests_outside_write_session(db):
+    class Collection:
+        id_ = "c1"
+
+        def add_missing_audio_features(self, db):
+            assert not db.connections._write_lock.is_owned()
+            return [make_track("t1")]
+
+    db.store_tracks_in_database(collection=Collection())
+    assert db.collection_track_ids(id_="c1") == ["t1"]
+
+
+def test_filter_track_ids_keeps_duplicates(db):
+    populate_catalog(db)
+
+    track_ids = ["t3", "t1", "t3", "t0", "t1"]
+    assert db.filter_track_ids(track_ids, "t.popularity >= ?", [10]) == [
+        "t3",
+        "t1",
+        "t3",
+        "t1",
+    ]
+    assert [track.id for track in db.iter_tracks(track_ids)] == track_ids
+
+
+def test_artist_top_tracks_keep_album_artists_and_empty_refreshes(db):
+    artists = [ArtistItem(id="a1", name="A1"), ArtistItem(id="a2", name="A2")]
+    collaboration = TrackItem(
+        id="t1", name="T1", album=AlbumItem(id="al1", name="Al1", artists=artists)
+    )
+    db.store_artist_top_tracks(top_tracks={"a2": [collaboration], "a3": []})
+
+    top_tracks = db.load_artist_top_tracks(artist_ids=["a2", "a3", "a4"])
+
+    assert top_tracks["a3"] == []
+    assert "a4" not in top_tracks
+    (track,) = top_tracks["a2"]
+    assert sorted((artist.id, artist.name) for artist in track.album.artists) == [
+        ("a1", "A1"),
+        ("a2", "A2"),
+    ]
@@ -0,0 +1,52 @@
+import pytest
+
+from spotify_flows.database import GenreIndex, SpotifyDatabase, load_genre_index
+
+GENRES = ["deep house", "house", "tech house", "rock", "suomi rock", "indie rock"]
+
+
+@pytest.fixture
+def genre_index():
+    return GenreIndex.from_genres(GENRES)
+
+
+def test_matches_ranks_closest_first(genre_index):
+    matches = genre_index.matches("suomi rok")
+    assert matches[0][0] == "suomi rock"
+    assert all(score >= 0.4 for _, score in matches)
+
+
+def test_contains(genre_index):
+    assert genre_index.contains("house") == ["deep house", "house", "tech house"]
+    assert genre_index.contains("ho") == ["deep house", "house", "tech house"]
+    assert genre_index.contains("jazz") == []
+
+
+def test_resolve(genre_index):
+    assert genre_index.resolve("rock") == "rock"
+    assert genre_index.resolve("tech hose") == "tech house"
+
+    with pytest.raises(KeyError):
+        genre_index.resolve("zzzzzz")
+
+
+def test_save_and_load(genre_index, tmp_path):
+    file_path = str(tmp_path / "genre_index.p")
+    genre_index.save(file_path)
+    assert GenreIndex.load(file_path) == genre_index
+
+
+def test_load_rebuilds_when_genres_change(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    file_path = str(tmp_path / "genre_index.p")
+    add_genres = "INSERT INTO genres (artist_id, genre, op_index) VALUES (?, ?, ?)"
+
+    with db.connect():
+        db.conn.executemany(add_genres, [("a1", "rock", 1), ("a2", "house", 1)])
+    assert load_genre_index(db, file_path).genres == ["house", "rock"]
+
+    with db.connect():
+        db.conn.execute(add_genres, ("a3", "suomi rock", 2))
+    assert "suomi rock" in load_genre_index(db, file_path)
+    assert GenreIndex.load(file_path).version == (3, 2)
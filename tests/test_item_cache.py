@@ -0,0 +1,50 @@
+import itertools
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.data_structures import TrackItem
+from spotify_flows.spotify.item_cache import ItemCache, SpillSettings
+
+
+class CountingSource:
+    def __init__(self, n_items):
+        self.n_items = n_items
+        self.n_pulled = 0
+
+    def __iter__(self):
+        for i in range(self.n_items):
+            self.n_pulled += 1
+            yield i
+
+
+def test_source_is_consumed_once_and_lazily():
+    source = CountingSource(10)
+    cache = ItemCache(iter(source))
+
+    assert list(itertools.islice(cache, 3)) == [0, 1, 2]
+    assert source.n_pulled == 3
+
+    assert list(cache) == list(range(10))
+    assert list(cache) == list(range(10))
+    assert source.n_pulled == 10
+
+
+def test_interleaved_iterators_share_the_buffer():
+    source = CountingSource(5)
+    cache = ItemCache(iter(source))
+
+    pairs = list(zip(cache, cache))
+
+    assert pairs == [(i, i) for i in range(5)]
+    assert source.n_pulled == 5
+
+
+def test_items_spill_to_database(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    tracks = [TrackItem(id=f"t{i}", name=f"Track {i}") for i in range(25)]
+
+    cache = ItemCache(iter(tracks), spill=SpillSettings(max_items=10, db=db))
+
+    assert list(cache) == tracks
+    assert len(cache._buffer) == 5
+    assert list(cache) == tracks
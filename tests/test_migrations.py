@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+import spotify_flows.database.migrations as migrations
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.database.migrations import LATEST_VERSION, schema_version
+
+
+def make_legacy_database(file_path: str) -> None:
+    conn = sqlite3.connect(file_path)
+    conn.executescript(
+        """
+        CREATE TABLE operations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date DATE, op_type TEXT
+        );
+        CREATE TABLE tracks (
+            id TEXT PRIMARY KEY, name TEXT, popularity INTEGER, album_id TEXT,
+            duration_ms INTEGER, op_index INTEGER
+        );
+        CREATE TABLE albums_artists (artist_id TEXT, album_id TEXT, op_index INTEGER);
+        CREATE TABLE genres (artist_id TEXT, genre TEXT, op_index INTEGER);
+        CREATE TABLE related (artist_id TEXT, related_artist_id TEXT);
+        CREATE TABLE collections (id TEXT, track_id TEXT);
+        CREATE TABLE playlist_snapshots (
+            playlist_id TEXT PRIMARY KEY, snapshot_id TEXT, synced_at DATE
+        );
+
+        INSERT INTO albums_artists VALUES ('a1', 'al1', 1), ('a1', 'al1', 2);
+        INSERT INTO genres VALUES ('a1', 'rock', 1), ('a1', 'rock', 2), ('a1', 'pop', 2);
+        INSERT INTO related VALUES ('a1', 'a2'), ('a1', 'a2');
+        INSERT INTO collections VALUES ('c1', 't2'), ('c1', 't1'), ('c1', 't2'), ('p1', 't1');
+        INSERT INTO playlist_snapshots VALUES ('p1', 's1', '2021-01-01');
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_migrated_in_place(tmp_path):
+    file_path = str(tmp_path / "spotify.db")
+    make_legacy_database(file_path)
+
+    db = SpotifyDatabase(file_path, op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    assert schema_version(db.conn) == LATEST_VERSION
+    assert len(db.table_contents("albums_artists")) == 1
+    assert len(db.table_contents("genres")) == 2
+    assert len(db.table_contents("related")) == 1
+    assert db.collection_track_ids(id_="c1") == ["t2", "t1"]
+    assert db.collection_track_ids(id_="p1", snapshot_id="s1") == ["t1"]
+
+    # Tables missing from the legacy database are created
+    assert db.collection_state(id_="c1") is None
+
+    # Keys now dedupe on the database side, and collections keep their order
+    db.add_collection_track_ids(id_="c1", track_ids=["t3", "t1"])
+    assert db.collection_track_ids(id_="c1") == ["t2", "t1", "t3"]
+
+    db.ensure_schema("data/db_schemas.yaml")
+    assert schema_version(db.conn) == LATEST_VERSION
+
+
+def test_new_database_is_created_at_latest_version(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+
+    assert schema_version(db.conn) == LATEST_VERSION
+    op_types = db.table_contents("operations")["op_type"].tolist()
+    assert not any(op_type.startswith("migration") for op_type in op_types)
+
+
+def test_legacy_database_without_tracks_is_migrated(tmp_path):
+    file_path = str(tmp_path / "spotify.db")
+    conn = sqlite3.connect(file_path)
+    conn.execute(
+        "CREATE TABLE operations "
+        "(id INTEGER PRIMARY KEY AUTOINCREMENT, date DATE, op_type TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+    db = SpotifyDatabase(file_path, op_table="operations")
+    db.ensure_schema("data/db_schemas.yaml")
+
+    assert schema_version(db.conn) == LATEST_VERSION
+    assert len(db.table_contents("tracks")) == 0
+
+
+def test_failed_migration_keeps_previous_ones(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "spotify.db")
+    make_legacy_database(file_path)
+
+    def fail(c):
+        c.execute("DROP TABLE collections")
+        raise RuntimeError("Failed migration")
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        [
+            migrations.MIGRATIONS[0],
+            migrations.Migration(version=2, description="Failing", apply=fail),
+        ],
+    )
+    db = SpotifyDatabase(file_path, op_table="operations")
+    with pytest.raises(RuntimeError):
+        db.ensure_schema("data/db_schemas.yaml")
+
+    assert schema_version(db.conn) == 1
+    assert db.table_contents("collections").columns.tolist() == [
+        "id",
+        "position",
+        "track_id",
+    ]
+    op_types = db.table_contents("operations")["op_type"].tolist()
+    assert op_types == ["migration_(v1)"]
@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+from spotify_flows.spotify.pagination import iter_items, iter_offset_items
+
+
+class PagedEndpoint:
+    def __init__(self, n_items, with_total=True):
+        self.data = list(range(n_items))
+        self.with_total = with_total
+        self.requested_offsets = []
+
+    def __call__(self, offset, limit):
+        self.requested_offsets.append(offset)
+        page = {"items": self.data[offset : offset + limit]}
+        if self.with_total:
+            page["total"] = len(self.data)
+        return page
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+@pytest.mark.parametrize("with_total", [False, True])
+def test_offset_items_in_order(parallel, with_total):
+    endpoint = PagedEndpoint(n_items=237, with_total=with_total)
+    items = list(iter_offset_items(endpoint, limit=50, parallel=parallel))
+    assert items == endpoint.data
+
+
+def test_offset_items_stream_lazily():
+    endpoint = PagedEndpoint(n_items=500)
+    first_items = list(itertools.islice(iter_offset_items(endpoint, limit=50), 60))
+
+    assert first_items == list(range(60))
+    assert endpoint.requested_offsets == [0, 50]
+
+
+def test_items_follow_next_links():
+    pages = {"p2": {"items": [3, 4], "next": "p3"}, "p3": {"items": [5], "next": None}}
+
+    class FakeSpotify:
+        def next(self, page):
+            return pages[page["next"]]
+
+    first_page = {"items": [1, 2], "next": "p2"}
+    assert list(iter_items(FakeSpotify(), first_page)) == [1, 2, 3, 4, 5]
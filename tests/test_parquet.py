@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.database.parquet import export_catalog, import_catalog, read_table
+from spotify_flows.spotify.data_structures import (
+    AlbumItem,
+    ArtistItem,
+    AudioFeaturesItem,
+    TrackItem,
+)
+
+
+def make_database(file_path: str) -> SpotifyDatabase:
+    db = SpotifyDatabase(file_path, op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    return db
+
+
+def test_export_import_round_trip(tmp_path):
+    db = make_database(str(tmp_path / "source.db"))
+    artist = ArtistItem(id="a1", name="A1", popularity=10, genres=["rock"])
+    album = AlbumItem(
+        id="al1", name="Album", release_date="2020-01-02", artists=[artist]
+    )
+    db.ingest_tracks(
+        tracks=[
+            TrackItem(
+                id=f"t{i}",
+                name=f"T{i}",
+                popularity=i,
+                album=album,
+                audio_features=AudioFeaturesItem(energy=i / 10),
+            )
+            for i in range(5)
+        ]
+    )
+
+    n_rows = export_catalog(db, str(tmp_path / "catalog"), rows_per_file=2)
+    assert n_rows["tracks"] == 5
+    assert n_rows["related"] == 0
+    assert len(list((tmp_path / "catalog" / "tracks").glob("*.parquet"))) == 3
+
+    energy = read_table(str(tmp_path / "catalog"), "audio_features", ["energy"])
+    assert sorted(energy.column("energy").to_numpy()) == pytest.approx(
+        [0, 0.1, 0.2, 0.3, 0.4]
+    )
+
+    target = make_database(str(tmp_path / "target.db"))
+    import_catalog(target, str(tmp_path / "catalog"))
+    import_catalog(target, str(tmp_path / "catalog"))
+
+    tracks = list(target.iter_tracks([f"t{i}" for i in range(5)]))
+    assert [track.popularity for track in tracks] == list(range(5))
+    assert tracks[3].audio_features.energy == pytest.approx(0.3)
+    assert tracks[0].album.artists[0].genres == ("rock",)
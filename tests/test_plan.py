@@ -0,0 +1,87 @@
+from spotify_flows.spotify.data_structures import TrackItem
+from spotify_flows.spotify.plan import (
+    CostModel,
+    Filter,
+    First,
+    Random,
+    Shuffle,
+    Sort,
+    apply_operations,
+    explain,
+    optimize,
+    split_pushable,
+)
+from spotify_flows.spotify.predicates import F
+from spotify_flows.spotify.sort_keys import SortKey
+
+
+IS_POPULAR = F.popularity > 50
+HAS_NAME = F.name != ""
+
+
+def test_random_absorbs_orderings():
+    ops = optimize(
+        [Sort(keys=(SortKey.compile("popularity"),)), Shuffle(), Random(10), First(5)]
+    )
+    assert ops == [Random(5)]
+
+
+def test_shuffle_then_first_is_random():
+    assert optimize([Shuffle(), First(3)]) == [Random(3)]
+
+
+def test_adjacent_sorts_and_filters_fuse():
+    ops = optimize(
+        [
+            Sort(keys=(SortKey.compile("name"),)),
+            Filter(IS_POPULAR),
+            Sort(keys=(SortKey.compile("popularity", ascending=False),)),
+            Filter(HAS_NAME),
+        ]
+    )
+
+    assert ops == [
+        Filter(IS_POPULAR & HAS_NAME),
+        Sort(
+            keys=(
+                SortKey.compile("popularity", ascending=False),
+                SortKey.compile("name"),
+            )
+        ),
+    ]
+
+
+def test_fused_sort_matches_chained_sorts():
+    items = [TrackItem(id=str(i), popularity=i % 3, duration_ms=i) for i in range(9)]
+    sort_duration = Sort(keys=(SortKey.compile("duration_ms", ascending=False),))
+    sort_popularity = Sort(keys=(SortKey.compile("popularity"),))
+
+    chained = list(sort_popularity.apply(sort_duration.apply(items)))
+    fused = list(apply_operations(optimize([sort_duration, sort_popularity]), items))
+
+    assert fused == chained
+
+
+def test_listing_level_operations_are_pushed_down():
+    ops = [
+        Filter(IS_POPULAR),
+        Random(10),
+        Sort(keys=(SortKey.compile("audio_features.energy"),)),
+        First(3),
+    ]
+    pushed, remaining = split_pushable(optimize(ops))
+
+    assert pushed == ops[:2]
+    assert remaining == ops[2:]
+
+
+def test_explain_estimates_calls():
+    description = explain(
+        source_name="Playlist p",
+        operations=[Random(100)],
+        cost_model=CostModel(listing_page_size=100, fetch_calls=lambda n: 3 * n),
+        size=5000,
+    )
+
+    assert "hydrate 100 tracks" in description
+    assert "Estimated API calls: 350 (without optimization: 15000)" in description
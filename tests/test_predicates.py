@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from spotify_flows.database.database import TRACK_QUERY_COLUMNS
+from spotify_flows.spotify.data_structures import AudioFeaturesItem, TrackItem
+from spotify_flows.spotify.predicates import F, as_predicate
+
+
+def make_tracks():
+    return [
+        TrackItem(
+            id="a",
+            name="Intro",
+            popularity=70,
+            audio_features=AudioFeaturesItem(energy=0.9),
+        ),
+        TrackItem(
+            id="b",
+            name="Remix",
+            popularity=20,
+            audio_features=AudioFeaturesItem(energy=0.7),
+        ),
+        TrackItem(
+            id="c",
+            name="Outro",
+            popularity=None,
+            audio_features=AudioFeaturesItem(energy=0.2),
+        ),
+    ]
+
+
+def test_predicates_declare_needed_fields():
+    predicate = (F.audio_features.energy > 0.6) & (F.popularity >= 50)
+
+    assert predicate.needs == {"audio_features", "popularity"}
+    assert as_predicate(lambda track: True).needs is None
+    assert as_predicate(lambda track: True, needs=["name"]).needs == {"name"}
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError):
+        F.audio_features.loudnesss > 0
+
+
+def test_batch_evaluation():
+    tracks = make_tracks()
+
+    assert list((F.audio_features.energy > 0.6).evaluate(tracks)) == [True, True, False]
+    assert list(((F.popularity >= 50) | F.name.contains("Remix")).evaluate(tracks)) == [
+        True,
+        True,
+        False,
+    ]
+    assert list((~(F.popularity < 50)).evaluate(tracks)) == [True, False, True]
+    assert F.id.isin(["a", "c"])(tracks[2])
+
+
+def test_sql_matches_python_evaluation():
+    tracks = make_tracks()
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE tracks (id, name, popularity, album_id, duration_ms)")
+    conn.execute("CREATE TABLE albums (id, name, release_date)")
+    conn.execute("CREATE TABLE audio_features (track_id, energy)")
+    conn.executemany(
+        "INSERT INTO tracks VALUES (?, ?, ?, NULL, NULL)",
+        [(track.id, track.name, track.popularity) for track in tracks],
+    )
+    conn.executemany(
+        "INSERT INTO audio_features VALUES (?, ?)",
+        [(track.id, track.audio_features.energy) for track in tracks],
+    )
+
+    predicate = ~((F.audio_features.energy > 0.6) & (F.popularity >= 50)) | F.name.isin(
+        ["Intro"]
+    )
+    condition, params = predicate.to_sql(TRACK_QUERY_COLUMNS)
+    rows = conn.execute(
+        f"""
+        SELECT t.id FROM tracks t
+        LEFT JOIN albums al ON al.id = t.album_id
+        LEFT JOIN audio_features af ON af.track_id = t.id
+        WHERE {condition} ORDER BY t.id
+        """,
+        params,
+    ).fetchall()
+
+    expected = [
+        track.id for track, keep in zip(tracks, predicate.evaluate(tracks)) if keep
+    ]
+    assert [row[0] for row in rows] == expected
+    assert as_predicate(lambda track: True).to_sql(TRACK_QUERY_COLUMNS) is None
@@ -0,0 +1,64 @@
+import json
+import threading
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.throttle import with_request_priority
+from spotify_flows.utils import profiling
+
+
+def test_measures_recorded_into_current_profile():
+    profiling.record_cache("dropped", hits=1)
+
+    with profiling.profile("test") as profile_:
+        profiling.record_request("artists", seconds=0.03, n_bytes=2048)
+        profiling.record_request("artists", seconds=0.2, n_bytes=1024, error=True)
+        profiling.record_cache("resolutions", hits=3, misses=1)
+
+    stats = profile_.to_dict()
+    assert stats["endpoints"]["artists"]["calls"] == 2
+    assert stats["endpoints"]["artists"]["errors"] == 1
+    assert stats["endpoints"]["artists"]["bytes"] == 3072
+    assert sum(stats["endpoints"]["artists"]["histogram"]) == 2
+    assert stats["caches"] == {
+        "resolutions": {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    }
+    assert profile_.endpoints["artists"].percentile_ms(0.5) == 50
+    assert "artists" in profile_.report()
+
+
+def test_worker_threads_record_into_profile():
+    with profiling.profile("test") as profile_:
+        record = with_request_priority(
+            lambda: profiling.record_cache("items", misses=1)
+        )
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert profile_.caches["items"].misses == 4
+
+
+def test_database_time_per_method(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+
+    with profiling.profile("test") as profile_:
+        db.add_collection_track_ids(id_="collection", track_ids=["a", "b"])
+        db.collection_track_ids(id_="collection")
+        db.collection_track_ids(id_="collection")
+
+    assert profile_.db_methods["SpotifyDatabase.collection_track_ids"].calls == 2
+    assert "SpotifyDatabase.add_collection_track_ids" in profile_.db_methods
+
+    with profiling.profile("nested") as nested_profile:
+        db.create_spotify_database("data/db_schemas.yaml")
+
+    assert list(nested_profile.db_methods) == [
+        "SpotifyDatabase.create_spotify_database"
+    ]
+
+    profile_.export_json(str(tmp_path / "profile.json"))
+    with open(tmp_path / "profile.json") as f:
+        assert json.load(f)["label"] == "test"
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+
+from spotify_flows.database import SpotifyDatabase
+from spotify_flows.spotify.resolution import ResolutionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    db = SpotifyDatabase(str(tmp_path / "spotify.db"), op_table="operations")
+    db.create_spotify_database("data/db_schemas.yaml")
+    return ResolutionCache(db=db)
+
+
+class CountingSearch:
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.calls = 0
+
+    def __call__(self, query):
+        self.calls += 1
+        return self.candidates
+
+
+def test_resolve_hits_cache_on_repeat(cache):
+    search = CountingSearch([{"id": "a2", "name": "Dua Lipa", "popularity": 90}])
+
+    assert cache.resolve("artist", "Dua Lipa", search) == "a2"
+    assert cache.resolve("artist", "dua lipa ", search) == "a2"
+    assert search.calls == 1
+
+
+def test_resolve_expired_and_invalidated(cache):
+    search = CountingSearch([{"id": "a1", "name": "A", "popularity": 1}])
+    cache.resolve("artist", "a", search)
+
+    cache.ttl = timedelta(seconds=-1)
+    cache.resolve("artist", "a", search)
+    assert search.calls == 2
+
+    cache.ttl = timedelta(days=1)
+    cache.invalidate(kind="artist", query="A")
+    cache.resolve("artist", "a", search)
+    assert search.calls == 3
+
+
+def test_resolve_without_candidates(cache):
+    with pytest.raises(KeyError):
+        cache.resolve("track", "nothing", CountingSearch([]))
+
+
+def test_resolve_playlist_stores_full_map(cache):
+    calls = []
+
+    def list_func():
+        calls.append(1)
+        return {"Mix": "p1", "Chill": "p2"}
+
+    assert cache.resolve_playlist("Mix", list_func) == "p1"
+    assert cache.resolve_playlist("Chill", list_func) == "p2"
+    assert len(calls) == 1
+
+    with pytest.raises(KeyError):
+        cache.resolve_playlist("New", list_func)
+
+    cache.store_playlist(name="New", id_="p3")
+    assert cache.resolve_playlist("New", list_func) == "p3"
+    assert len(calls) == 2
@@ -0,0 +1,73 @@
+import pytest
+
+from spotify_flows.spotify.data_structures import AudioFeaturesItem, TrackItem
+from spotify_flows.spotify.sort_keys import SortKey, compile_key_path, sort_items
+
+
+def make_tracks():
+    return [
+        TrackItem(id="a", name="b", popularity=1, duration_ms=3),
+        TrackItem(id="b", name="a", popularity=2, duration_ms=None),
+        TrackItem(id="c", name="c", popularity=1, duration_ms=1),
+        TrackItem(id="d", name="a", popularity=2, duration_ms=2),
+    ]
+
+
+def ids(items):
+    return [item.id for item in items]
+
+
+def test_key_paths_are_validated():
+    assert compile_key_path("audio_features.energy").needs_audio_features
+    assert compile_key_path("album.name").root == "album"
+    assert compile_key_path("release_date").types == (str,)
+
+    with pytest.raises(ValueError):
+        compile_key_path("__class__.__init__")
+
+    with pytest.raises(ValueError):
+        compile_key_path("audio_features.energy.real")
+
+
+@pytest.mark.parametrize("missing, expected", [("last", "cadb"), ("first", "bcda")])
+def test_missing_values_placement(missing, expected):
+    for ascending in (True, False):
+        key = SortKey.compile("duration_ms", ascending=ascending, missing=missing)
+        result = "".join(ids(sort_items(make_tracks(), (key,))))
+        values = result.replace("b", "")
+        assert result.index("b") == (3 if missing == "last" else 0)
+        assert values == ("cda" if ascending else "adc")
+
+
+def test_missing_values_error():
+    with pytest.raises(ValueError):
+        sort_items(make_tracks(), (SortKey.compile("duration_ms", missing="error"),))
+
+
+def test_columnar_and_python_sorts_agree():
+    tracks = [
+        TrackItem(
+            id=str(i),
+            name=str(i % 4),
+            popularity=i % 3,
+            audio_features=AudioFeaturesItem(energy=(i * 7 % 5) / 5),
+        )
+        for i in range(30)
+    ]
+    numeric = (
+        SortKey.compile("popularity", ascending=False),
+        SortKey.compile("audio_features.energy"),
+    )
+    mixed = numeric + (SortKey.compile("name"),)
+
+    expected = sorted(
+        tracks, key=lambda track: (-track.popularity, track.audio_features.energy)
+    )
+
+    expected_mixed = sorted(
+        tracks,
+        key=lambda track: (-track.popularity, track.audio_features.energy, track.name),
+    )
+
+    assert ids(sort_items(tracks, numeric)) == ids(expected)
+    assert ids(sort_items(tracks, mixed)) == ids(expected_mixed)
@@ -0,0 +1,139 @@
+import time
+import threading
+
+import pytest
+from spotipy.exceptions import SpotifyException
+
+from spotify_flows.spotify import throttle
+from spotify_flows.spotify.throttle import (
+    BACKGROUND,
+    INTERACTIVE,
+    Rate,
+    RequestScheduler,
+    endpoint_class,
+    request_priority,
+    with_request_priority,
+)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://api.spotify.com/v1/artists/abc/related-artists", "artists"),
+        ("https://api.spotify.com/v1/me/tracks?offset=50", "me/tracks"),
+        ("search", "search"),
+        ("playlists/abc/tracks", "playlists"),
+    ],
+)
+def test_endpoint_class(url, expected):
+    assert endpoint_class(url) == expected
+
+
+def test_bucket_paces_requests_after_burst():
+    scheduler = RequestScheduler(
+        global_rate=Rate(per_second=1000, burst=1000),
+        endpoint_rates={"default": Rate(per_second=50, burst=5)},
+    )
+
+    start = time.monotonic()
+    for _ in range(15):
+        scheduler.call("artists", lambda: None)
+    elapsed = time.monotonic() - start
+
+    # 5 requests in the burst, then 10 at 50/s
+    assert 0.15 < elapsed < 0.5
+    metrics = scheduler.metrics()
+    assert metrics["requests"] == 15
+    assert metrics["by_endpoint"] == {"artists": 15}
+    assert metrics["throttled_seconds"] > 0.1
+
+
+def test_retry_after_pauses_all_threads():
+    scheduler = RequestScheduler(
+        global_rate=Rate(per_second=1000, burst=1000),
+        endpoint_rates={"default": Rate(per_second=1000, burst=1000)},
+    )
+    calls = []
+
+    def rate_limited():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise SpotifyException(
+                429, -1, "Too many requests", headers={"Retry-After": "0.3"}
+            )
+
+    thread = threading.Thread(target=scheduler.call, args=("albums", rate_limited))
+    thread.start()
+    time.sleep(0.05)
+
+    # Another thread, another endpoint class: held by the same pause
+    start = time.monotonic()
+    scheduler.call("tracks", lambda: None)
+    assert time.monotonic() - start > 0.2
+    thread.join()
+
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.3
+    metrics = scheduler.metrics()
+    assert metrics["rate_limited"] == 1
+    assert metrics["retries"] == 1
+
+
+def test_errors_retried_with_backoff(monkeypatch):
+    monkeypatch.setattr(throttle, "BACKOFF_BASE", 0.001)
+    scheduler = RequestScheduler(max_retries=2)
+    attempts = []
+
+    def failing(status):
+        attempts.append(status)
+        raise SpotifyException(status, -1, "Error")
+
+    with pytest.raises(SpotifyException):
+        scheduler.call("albums", lambda: failing(502))
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(SpotifyException):
+        scheduler.call("albums", lambda: failing(404))
+    assert len(attempts) == 1
+
+
+def test_interactive_requests_preempt_background():
+    scheduler = RequestScheduler(
+        global_rate=Rate(per_second=20, burst=1),
+        endpoint_rates={"default": Rate(per_second=1000, burst=1000)},
+    )
+    scheduler.acquire("artists")  # Empty the global bucket
+    served = []
+
+    def request(label, priority):
+        with request_priority(priority):
+            scheduler.call("artists", lambda: served.append(label))
+
+    threads = [
+        threading.Thread(target=request, args=(f"background_{i}", BACKGROUND))
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+
+    interactive = threading.Thread(target=request, args=("interactive", INTERACTIVE))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    assert served.index("interactive") <= 1
+
+
+def test_priority_carried_to_worker_threads():
+    priorities = []
+
+    with request_priority(BACKGROUND):
+        func = with_request_priority(
+            lambda: priorities.append(throttle._priority.get())
+        )
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join()
+
+    assert priorities == [BACKGROUND]